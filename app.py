@@ -1,57 +1,96 @@
 import sys
 import argparse
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from main_window import MainWindow
-from database import DatabaseManager, load_data_from_file
+import instrumentation
+import cli
+from database import DEFAULT_COMMIT_INTERVAL
 
-class App(QApplication):
-    def __init__(self, argv, db_manager):
-        super().__init__(argv)
-        self.db_manager = db_manager
-
-    def notify(self, receiver, event):
-        """Sobrescreve notify para capturar exceções e evitar travamentos."""
-        try:
-            return super().notify(receiver, event)
-        except Exception as e:
-            print(f"Erro no ciclo de eventos: {e}")
-            return False
+def legacy_command(args):
+    """Converte as opções antigas (-load, -report...) nos argumentos do comando equivalente do cli."""
+    options = ["-commit-interval", str(args.commit_interval)]
+    if args.campus:
+        options += ["-campus", args.campus]
+    if args.load:
+        return options + ["load", args.load]
+    if args.update:
+        return options + ["update", args.update]
+    if args.scanlog:
+        return options + ["scanlog", *args.scanlog]
+    if args.rebuild:
+        return options + ["rebuild"]
+    if args.report:
+        return options + ["report"] + (["-full"] if args.full else [])
+    if args.serve is not None:
+        return options + ["serve"] + ([args.serve] if args.serve else []) + (["-token", args.token] if args.token else [])
+    return None
 
 if __name__ == "__main__":
+    # Comandos da linha de comando (python app.py load arquivo.csv): sem importar o Qt
+    if len(sys.argv) > 1 and sys.argv[1] in cli.COMMANDS:
+        sys.exit(cli.main(sys.argv[1:]))
+
     # Parsear argumentos da linha de comando
     parser = argparse.ArgumentParser(description="SUAP-CD - Coletor de Dados")
     parser.add_argument("-load", type=str, help="Caminho do arquivo CSV para carregar dados")
+    parser.add_argument("-update", type=str, help="Caminho do arquivo CSV para atualizar dados preservando as leituras")
+    parser.add_argument("-scanlog", type=str, nargs="+", metavar="ARQUIVO",
+                        help="Arquivos de leituras da pistola (um número por linha) para aplicar em lote")
+    parser.add_argument("-rebuild", action="store_true",
+                        help="Refazer as leituras do banco a partir do diário de leituras")
+    parser.add_argument("-report", action="store_true", help="Gerar os relatórios sem abrir a interface")
+    parser.add_argument("-full", action="store_true", help="Com -report, reescrever os relatórios de todas as salas")
+    parser.add_argument("-commit-interval", type=float, default=DEFAULT_COMMIT_INTERVAL,
+                        help="Segundos máximos entre a leitura e a gravação definitiva de um escaneamento")
+    parser.add_argument("-serve", type=str, nargs="?", const="", metavar="[HOST:]PORTA",
+                        help="Atender estações de escaneamento pela rede, sem abrir a interface")
+    parser.add_argument("-connect", type=str, metavar="HOST[:PORTA]",
+                        help="Abrir a interface usando o banco de um servidor de escaneamento")
+    parser.add_argument("-token", type=str,
+                        help="Token compartilhado do servidor de escaneamento, com -serve ou -connect (padrão: SUAPCD_TOKEN)")
+    parser.add_argument("-profile", type=float, nargs="?", const=instrumentation.DEFAULT_SLOW_MS, metavar="MS",
+                        help="Medir as operações do banco e da interface, registrando as que passarem de MS")
+    parser.add_argument("-campus", type=str, metavar="NOME",
+                        help="Banco do campus registrado a usar (padrão: o campus ativo)")
     args = parser.parse_args()
+    if args.profile is not None:
+        instrumentation.enable(args.profile)
 
-    # Inicializar o gerenciador de banco de dados
-    db_manager = DatabaseManager()
+    command = legacy_command(args)
+    if command is not None:
+        # Modo não gráfico: executar o comando e sair
+        sys.exit(cli.main(command))
 
-    if args.load:
-        # Modo não gráfico: apenas carregar o CSV e sair
-        load_data_from_file(db_manager.cursor, db_manager.conn, args.load)
-        db_manager.close()
-        sys.exit(0)
-
-    # Modo gráfico: abrir a interface
-    # Habilitar suporte a High DPI
-    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, False)
-    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
-
-    app = App(sys.argv, db_manager)
-    window = MainWindow(db_manager)
-    
-    # Ajustar tamanho da janela para a tela do cliente
-    screen = app.primaryScreen()
-    size = screen.size()
-    window.resize(size)
-    
-    # Maximizar a janela
-    window.showMaximized()
-    
-    try:
-        sys.exit(app.exec_())
-    except Exception as e:
-        print(f"Erro ao executar a aplicação: {e}")
-    finally:
-        db_manager.close()  # Garantir que o banco seja fechado
\ No newline at end of file
+    # Modo gráfico: somente aqui o Qt é importado
+    from gui import run_gui
+    if args.connect:
+        # Estação conectada a um servidor de escaneamento: o banco fica no servidor
+        from scan_server import ScanClient, parse_address, get_token
+        try:
+            client = ScanClient(*parse_address(args.connect, default_host="localhost"), token=get_token(args.token))
+        except OSError as e:
+            print(f"Erro ao conectar ao servidor {args.connect}: {e}")
+            sys.exit(1)
+        run_gui(client)
+    else:
+        # O banco é acessado somente pelas threads do DatabaseWorker
+        from db_worker import DatabaseWorker
+        from database import get_campus_registry
+        registry = get_campus_registry()
+        if args.campus:
+            if args.campus not in registry.campi:
+                print(f"Campus não registrado: {args.campus}")
+                sys.exit(1)
+            db_path = registry.get_db_path(args.campus)
+        else:
+            # Banco do campus ativo, ou suap.db se não há campi registrados
+            try:
+                db_path = registry.get_default_db_path()
+            except ValueError as e:
+                print(f"Erro: {e}")
+                sys.exit(1)
+        try:
+            worker = DatabaseWorker(db_path, commit_interval=args.commit_interval)
+        except RuntimeError as e:
+            # Outra interface ou um servidor já grava as leituras deste banco
+            print(f"Erro: {e}")
+            sys.exit(1)
+        run_gui(worker)
@@ -0,0 +1,217 @@
+import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import argparse
+import platform
+import tempfile
+import subprocess
+import contextlib
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from database import DatabaseManager, get_peak_memory_mb, load_data_from_file
+from synthetic_data import generate_suap_csv, ITENS, MARCAS
+
+# Etapas medidas, na ordem de execução; cada uma roda num processo novo
+STAGES = ["gerar", "carregar", "escanear", "consultar_sala", "buscar", "listar_salas", "relatorio", "iniciar_cli"]
+
+def stage_gerar(workdir, params):
+    total = generate_suap_csv(workdir / "suap.csv", params["itens"], params["salas"], params["seed"])
+    return {"itens": total}
+
+def stage_carregar(workdir, params):
+    db_manager = DatabaseManager(db_path=workdir / "suap.db")
+    total = load_data_from_file(db_manager.cursor, db_manager.conn, workdir / "suap.csv")
+    salas = db_manager.count_salas()
+    db_manager.close()
+    return {"itens": total, "salas": salas}
+
+def stage_escanear(workdir, params):
+    db_manager = DatabaseManager(db_path=workdir / "suap.db")
+    rng = random.Random(params["seed"])
+    sala_ids = [sala_id for sala_id, _ in db_manager.get_all_salas()]
+    db_manager.cursor.execute("SELECT numero FROM patrimonios")
+    numeros = [numero for numero, in db_manager.cursor.fetchall()]
+    scans = [(rng.choice(numeros) if rng.random() < 0.98 else f"X{index}", rng.choice(sala_ids))
+             for index in range(params["leituras"])]
+    start = time.perf_counter()
+    encontrados = sum(1 for numero, sala_id in scans if db_manager.process_scan(numero, sala_id))
+    db_manager.flush()
+    elapsed = time.perf_counter() - start
+    db_manager.close()
+    return {"leituras": len(scans), "encontrados": encontrados,
+            "us_por_leitura": round(elapsed / len(scans) * 1e6, 1)}
+
+def stage_consultar_sala(workdir, params):
+    db_manager = DatabaseManager(db_path=workdir / "suap.db", read_only=True)
+    rng = random.Random(params["seed"])
+    sala_ids = [sala_id for sala_id, _ in db_manager.get_all_salas()]
+    consultas = [rng.choice(sala_ids) for _ in range(params["consultas"])]
+    start = time.perf_counter()
+    linhas = sum(len(db_manager.get_patrimonios_by_sala(sala_id)) for sala_id in consultas)
+    elapsed = time.perf_counter() - start
+    db_manager.close()
+    return {"consultas": len(consultas), "linhas": linhas,
+            "ms_por_consulta": round(elapsed / len(consultas) * 1e3, 3)}
+
+def stage_buscar(workdir, params):
+    db_manager = DatabaseManager(db_path=workdir / "suap.db", read_only=True)
+    rng = random.Random(params["seed"])
+    db_manager.cursor.execute("SELECT numero FROM patrimonios")
+    numeros = [numero for numero, in db_manager.cursor.fetchall()]
+    # Descrições, descrição e marca, e números completos ou pela metade
+    buscas = [rng.choice([rng.choice(ITENS).split()[0],
+                          f"{rng.choice(ITENS).split()[0]} {rng.choice(MARCAS)}",
+                          rng.choice(numeros)[:rng.choice([4, 6])]])
+              for _ in range(params["consultas"])]
+    tempos = []
+    linhas = 0
+    for texto in buscas:
+        start = time.perf_counter()
+        linhas += len(db_manager.search_patrimonios(texto) or [])
+        tempos.append(time.perf_counter() - start)
+    db_manager.close()
+    tempos.sort()
+    return {"buscas": len(buscas), "linhas": linhas,
+            "ms_mediana": round(tempos[len(tempos) // 2] * 1e3, 2),
+            "ms_maximo": round(tempos[-1] * 1e3, 2)}
+
+def stage_listar_salas(workdir, params):
+    # A interface roda sem janela, para medir também em servidores sem tela
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from main_window import MainWindow
+    from db_bridge import DatabaseBridge
+    from db_worker import DatabaseWorker
+    app = QApplication.instance() or QApplication([])
+
+    def wait(condition):
+        while not condition():
+            app.processEvents()
+            time.sleep(0.0005)
+
+    bridge = DatabaseBridge(DatabaseWorker(workdir / "suap.db"))
+    start = time.perf_counter()
+    window = MainWindow(bridge)
+    wait(lambda: window.sala_model.rowCount() > 0)
+    carregar = time.perf_counter() - start
+
+    filtros = ["LAB", "sala de aula 01", "coordenacao", "informática bloco a", ""]
+    start = time.perf_counter()
+    for texto in filtros:
+        window.filter_input.setText(texto)
+        window.filter_salas()
+    filtrar = time.perf_counter() - start
+
+    window.close()
+    bridge.close()
+    return {"salas": window.sala_model.rowCount(), "ms_carregar": round(carregar * 1e3, 1),
+            "ms_por_filtro": round(filtrar / len(filtros) * 1e3, 2)}
+
+def stage_relatorio(workdir, params):
+    from report_generator import ReportGenerator
+    db_manager = DatabaseManager(db_path=workdir / "suap.db")
+    versoes = ReportGenerator(db_manager, report_dir=workdir / "report").generate_report(full=True)
+    db_manager.close()
+    return {"salas": len(versoes or {})}
+
+def stage_iniciar_cli(workdir, params):
+    # Tempo de um comando da linha de comando num interpretador novo, incluindo as importações
+    repo = Path(__file__).resolve().parent
+    command = [sys.executable, "-c",
+               "import sys, cli; cli.main(sys.argv[1:]); print('PyQt5' in sys.modules)",
+               "-db", str(workdir / "suap.db"), "stats", "-salas", "0"]
+    tempos = []
+    for _ in range(5):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=repo, check=True, capture_output=True, text=True)
+        tempos.append(time.perf_counter() - start)
+    return {"ms_inicio": round(min(tempos) * 1e3, 1),
+            "importou_qt": result.stdout.strip().endswith("True")}
+
+def run_stage(name, workdir, params):
+    """Executa uma etapa no processo atual e retorna tempo, pico de memória e métricas."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        metrics = globals()[f"stage_{name}"](Path(workdir), params)
+        elapsed = time.perf_counter() - start
+    peak = get_peak_memory_mb()
+    return {"segundos": round(elapsed, 3),
+            "pico_memoria_mb": round(peak, 1) if peak is not None else None, **metrics}
+
+def git_commit():
+    """Retorna o commit atual do repositório, marcado com + se houver alterações não gravadas."""
+    repo = Path(__file__).resolve().parent
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo,
+                               check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("+" if dirty else "")
+
+def run_benchmark(params, workdir):
+    """Executa todas as etapas, cada uma num processo novo, e retorna os resultados."""
+    context = multiprocessing.get_context("spawn")
+    etapas = {}
+    for name in STAGES:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            etapas[name] = executor.submit(run_stage, name, str(workdir), params).result()
+        print(f"{name:<16} {etapas[name]['segundos']:>9.3f} s  "
+              f"{etapas[name]['pico_memoria_mb'] or 0:>8.1f} MB  "
+              + "  ".join(f"{key}={value}" for key, value in etapas[name].items()
+                          if key not in ("segundos", "pico_memoria_mb")))
+    return {
+        "commit": git_commit(),
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "parametros": params,
+        "etapas": etapas,
+    }
+
+def print_comparison(atual, anterior):
+    """Exibe a razão entre os tempos desta execução e os de um resultado anterior."""
+    if atual["parametros"] != anterior["parametros"]:
+        print("Aviso: os parâmetros das execuções são diferentes")
+    print(f"Comparação com {anterior.get('commit')} ({anterior.get('data')}):")
+    for name, etapa in atual["etapas"].items():
+        antes = anterior["etapas"].get(name)
+        if not antes or not antes["segundos"]:
+            continue
+        print(f"{name:<16} {antes['segundos']:>9.3f} s -> {etapa['segundos']:>9.3f} s  "
+              f"({etapa['segundos'] / antes['segundos']:.2f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o desempenho do SUAP-CD com dados sintéticos")
+    parser.add_argument("-itens", type=int, default=100000, help="Quantidade de patrimônios")
+    parser.add_argument("-salas", type=int, default=3000, help="Quantidade de salas")
+    parser.add_argument("-leituras", type=int, default=20000, help="Escaneamentos simulados")
+    parser.add_argument("-consultas", type=int, default=500, help="Consultas de patrimônios por sala")
+    parser.add_argument("-seed", type=int, default=0, help="Semente dos dados e das leituras")
+    parser.add_argument("-output", type=str, help="Arquivo JSON para gravar os resultados")
+    parser.add_argument("-compare", type=str, help="Arquivo JSON de uma execução anterior para comparar")
+    parser.add_argument("-workdir", type=str, help="Diretório de trabalho (padrão: temporário, apagado ao final)")
+    args = parser.parse_args()
+
+    params = {"itens": args.itens, "salas": args.salas, "leituras": args.leituras,
+              "consultas": args.consultas, "seed": args.seed}
+    if args.workdir:
+        Path(args.workdir).mkdir(parents=True, exist_ok=True)
+        resultados = run_benchmark(params, Path(args.workdir))
+    else:
+        with tempfile.TemporaryDirectory(prefix="suapcd-benchmark-") as workdir:
+            resultados = run_benchmark(params, Path(workdir))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(resultados, output, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as previous:
+            print_comparison(resultados, json.load(previous))
@@ -0,0 +1,50 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from patrimonio_model import ENCONTRADO_BRUSH
+
+HEADERS = [
+    "Sala Atual", "Número", "Descrição", "Número de Série", "Rótulos", "Fornecedor", "Encontrado"
+]
+
+# Posições em cada linha retornada por DatabaseManager.search_patrimonios
+COL_SALA_ID = 0
+COL_ENCONTRADO = 7
+
+class BuscaTableModel(QAbstractTableModel):
+    """Modelo dos resultados da busca de patrimônios, na ordem de relevância.
+
+    Qt.UserRole devolve o id da sala atual do patrimônio.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        row = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            if index.column() == len(HEADERS) - 1:
+                return "Lido" if row[COL_ENCONTRADO] == 1 else "Não Lido"
+            return str(row[index.column() + 1] or "")
+        if role == Qt.UserRole:
+            return row[COL_SALA_ID]
+        if role == Qt.BackgroundRole and row[COL_ENCONTRADO] == 1:
+            return ENCONTRADO_BRUSH
+        return QVariant()
@@ -0,0 +1,98 @@
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+# Arquivo do registro de campi, no diretório de dados
+REGISTRY_NAME = "campi.json"
+
+# Subdiretório dos bancos de campi arquivados
+ARCHIVE_DIR = "arquivados"
+
+def campus_slug(texto):
+    """Nome de arquivo de um campus: minúsculas, sem acentos, com hífens no lugar de espaços e pontuação."""
+    texto = unicodedata.normalize('NFKD', texto or "").encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r"[^a-z0-9]+", "-", texto.lower()).strip("-")
+
+def campus_from_db_path(db_path):
+    """Nome do campus de um banco suap-<nome>.db, ou None para outros bancos."""
+    match = re.fullmatch(r"suap-(.+)\.db", Path(db_path).name)
+    return match.group(1) if match else None
+
+class CampusRegistry:
+    """Registro dos bancos de cada campus (ou sessão de inventário) no diretório de dados.
+
+    Cada campus tem seu próprio arquivo suap-<nome>.db, com seu diário de leituras,
+    e o registro guarda qual deles é o ativo, isto é, o aberto quando nenhum banco é
+    indicado. Sem campi registrados, vale o suap.db de sempre. campus_carga, quando
+    definido, é o valor de CAMPUS DA CARGA que filtra as linhas do CSV ao importar.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = Path(data_dir)
+        self.path = self.data_dir / REGISTRY_NAME
+        self.ativo = None
+        self.campi = {}  # nome -> {"campus_carga": ..., "arquivado": ...}
+        if self.path.exists():
+            with open(self.path, encoding='utf-8') as registry:
+                data = json.load(registry)
+            self.ativo = data.get("ativo")
+            self.campi = data.get("campi", {})
+
+    def save(self):
+        """Grava o registro substituindo o arquivo de uma vez, para nunca deixá-lo pela metade."""
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding='utf-8') as registry:
+            json.dump({"ativo": self.ativo, "campi": self.campi}, registry, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def get_db_path(self, nome):
+        """Caminho do banco de um campus, dentro de arquivados se ele foi arquivado."""
+        directory = self.data_dir / ARCHIVE_DIR if self.campi[nome].get("arquivado") else self.data_dir
+        return directory / f"suap-{nome}.db"
+
+    def get_default_db_path(self):
+        """Banco aberto quando nenhum é indicado: o do campus ativo, ou suap.db se não há campi.
+
+        Com campi registrados e nenhum ativo (ex.: o ativo foi arquivado), falha com
+        ValueError em vez de abrir um suap.db vazio.
+        """
+        if not self.campi:
+            return self.data_dir / "suap.db"
+        if self.ativo not in self.campi:
+            raise ValueError("Nenhum campus ativo: indique -campus NOME ou escolha um com campus -ativar NOME")
+        return self.get_db_path(self.ativo)
+
+    def register(self, nome, campus_carga=None):
+        """Registra um campus (ou atualiza seu filtro) e o torna o ativo."""
+        campus = self.campi.setdefault(nome, {"campus_carga": None, "arquivado": False})
+        if campus_carga is not None:
+            campus["campus_carga"] = campus_carga
+        self.ativo = nome
+        self.save()
+
+    def activate(self, nome):
+        """Torna um campus o ativo, trazendo-o de volta se estava arquivado."""
+        if self.campi[nome].get("arquivado"):
+            self.move_files(nome, arquivado=False)
+        self.ativo = nome
+        self.save()
+
+    def archive(self, nome):
+        """Move o banco e o diário de um campus para arquivados; ele deixa de ser o ativo."""
+        if not self.campi[nome].get("arquivado"):
+            (self.data_dir / ARCHIVE_DIR).mkdir(exist_ok=True)
+            self.move_files(nome, arquivado=True)
+        if self.ativo == nome:
+            self.ativo = None
+        self.save()
+
+    def move_files(self, nome, arquivado):
+        """Move os arquivos do banco de um campus entre o diretório de dados e arquivados."""
+        source = self.get_db_path(nome)
+        self.campi[nome]["arquivado"] = arquivado
+        target = self.get_db_path(nome)
+        # O diário e os arquivos do WAL (suap-<nome>.db-wal, suap-<nome>.journal...) acompanham o banco
+        for path in source.parent.glob(f"{source.stem}.*"):
+            path.rename(target.parent / path.name)
@@ -0,0 +1,371 @@
+import sys
+import sqlite3
+import argparse
+import instrumentation
+from database import DatabaseManager, DEFAULT_COMMIT_INTERVAL
+
+# Os comandos importam somente o que usam: nenhum deles carrega o Qt
+
+def open_database(args, read_only=False):
+    """Abre o banco indicado; consultas usam read_only e não tocam no diário de leituras."""
+    return DatabaseManager(db_path=args.db, read_only=read_only, commit_interval=args.commit_interval,
+                           campus=None if args.db else args.campus)
+
+def open_journal_owner(args):
+    """Abre o banco para gravar leituras, ou retorna None se o diário está em uso por outro processo."""
+    db_manager = open_database(args)
+    try:
+        db_manager.require_journal()
+    except RuntimeError as e:
+        db_manager.close()
+        print(f"Erro: {e}")
+        return None
+    return db_manager
+
+def get_campus_carga(db_manager):
+    """Filtro de CAMPUS DA CARGA registrado para o campus do banco, ou None."""
+    if db_manager.campus is None:
+        return None
+    from database import get_campus_registry
+    campus = get_campus_registry().campi.get(db_manager.campus)
+    return campus["campus_carga"] if campus else None
+
+def cmd_load(args):
+    """Zera o banco e importa um CSV do SUAP, inteiro, de um campus ou separado por campus."""
+    from database import load_data_from_file
+    if args.por_campus:
+        if args.db:
+            print("Erro: -por-campus cria um banco por campus no diretório de dados e não pode ser usado com -db")
+            return 1
+        return load_por_campus(args)
+    if not args.db and (args.campus or args.campus_carga):
+        from database import get_campus_registry
+        from campus_registry import campus_slug
+        args.campus = args.campus or campus_slug(args.campus_carga)
+        get_campus_registry().register(args.campus, args.campus_carga)
+    db_manager = open_database(args)
+    # -campus-carga vale também com -db, em que o campus do registro não é consultado
+    total = load_data_from_file(db_manager.cursor, db_manager.conn, args.arquivo,
+                                args.campus_carga or get_campus_carga(db_manager))
+    db_manager.close()
+    return 0 if total is not None else 1
+
+def load_por_campus(args):
+    """Importa o CSV num banco por CAMPUS DA CARGA, registrando os campi novos."""
+    from database import get_campus_registry, list_campus_carga, load_data_from_file
+    from campus_registry import campus_slug
+    campi = list_campus_carga(args.arquivo)
+    if campi is None:
+        return 1
+    sem_campus = campi.pop("", 0)
+    if sem_campus:
+        print(f"Itens sem CAMPUS DA CARGA, não importados: {sem_campus}")
+    if not campi:
+        print("Nenhum CAMPUS DA CARGA no arquivo.")
+        return 1
+    registry = get_campus_registry()
+    ativo = registry.ativo
+    for campus_carga, itens in sorted(campi.items()):
+        nome = campus_slug(campus_carga)
+        print(f"Campus {campus_carga} ({itens} itens): banco {nome}")
+        registry.register(nome, campus_carga)
+        db_manager = DatabaseManager(campus=nome, commit_interval=args.commit_interval)
+        total = load_data_from_file(db_manager.cursor, db_manager.conn, args.arquivo, campus_carga)
+        db_manager.close()
+        if total is None:
+            return 1
+    # O campus ativo continua o mesmo; sem um, passa a ser o primeiro importado
+    registry.ativo = ativo if ativo in registry.campi else campus_slug(min(campi))
+    registry.save()
+    print(f"Campus ativo: {registry.ativo}")
+    return 0
+
+def cmd_update(args):
+    """Atualiza o banco com um CSV mais novo preservando as leituras."""
+    from database import update_data_from_file
+    db_manager = open_database(args)
+    total = update_data_from_file(db_manager.cursor, db_manager.conn, args.arquivo,
+                                  get_campus_carga(db_manager))
+    db_manager.close()
+    return 0 if total is not None else 1
+
+def cmd_scanlog(args):
+    """Aplica em lote arquivos de leituras das pistolas."""
+    from database import ingest_scan_logs
+    db_manager = open_journal_owner(args)
+    if db_manager is None:
+        return 1
+    total = ingest_scan_logs(db_manager.cursor, db_manager.conn, args.arquivos, db_manager.journal)
+    db_manager.close()
+    return 0 if total is not None else 1
+
+def cmd_rebuild(args):
+    """Refaz o estado das leituras a partir do diário."""
+    db_manager = open_journal_owner(args)
+    if db_manager is None:
+        return 1
+    db_manager.rebuild_from_journal()
+    db_manager.close()
+    return 0
+
+def cmd_report(args):
+    """Gera os relatórios CSV."""
+    from report_generator import ReportGenerator
+    if args.campi:
+        return report_campi()
+    db_manager = open_database(args, read_only=True)
+    versoes = ReportGenerator(db_manager).generate_report(
+        full=args.full, archive=args.archive is not None, archive_path=args.archive or None,
+        geral_only=args.geral)
+    db_manager.close()
+    if versoes is None:
+        return 1
+    if versoes:
+        # Como na interface: o relatório é lido à parte e só as versões são gravadas
+        db_manager = open_database(args)
+        db_manager.mark_salas_reportadas(versoes)
+        db_manager.close()
+    return 0
+
+def report_campi():
+    """Gera os relatórios conjuntos de todos os campi registrados, anexando seus bancos."""
+    from database import get_campus_registry, CampiDatabase
+    from report_generator import ReportGenerator
+    registry = get_campus_registry()
+    campi = {nome: registry.get_db_path(nome) for nome in sorted(registry.campi)
+             if registry.get_db_path(nome).exists()}
+    if not campi:
+        print("Nenhum campus registrado.")
+        return 1
+    try:
+        campi_db = CampiDatabase(campi)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        return 1
+    try:
+        totais = ReportGenerator(None).generate_campi_report(campi_db)
+    finally:
+        campi_db.close()
+    return 0 if totais is not None else 1
+
+def cmd_stats(args):
+    """Exibe o andamento do inventário a partir do resumo por sala."""
+    db_manager = open_database(args, read_only=True)
+    _, salas, _ = db_manager.get_salas_resumo()
+    db_manager.close()
+
+    total = sum(row[2] for row in salas)
+    encontrados = sum(row[3] for row in salas)
+    concluidas = sum(1 for row in salas if row[3] == row[2])
+    print(f"Salas: {len(salas)} (concluídas: {concluidas})")
+    print(f"Patrimônios: {total}")
+    print(f"Encontrados: {encontrados} ({encontrados / total:.1%})" if total else "Encontrados: 0")
+    print(f"Não encontrados: {total - encontrados}")
+    print(f"Divergentes: {sum(row[4] for row in salas)}")
+    print(f"Não cadastrados: {sum(row[5] for row in salas)}")
+
+    pendentes = sorted((row for row in salas if row[3] < row[2]), key=lambda row: (row[3] / row[2], row[1]))
+    if pendentes and args.salas:
+        print("Salas menos concluídas:")
+        for _, sala, sala_total, sala_encontrados, _, _ in pendentes[:args.salas]:
+            print(f"  {sala_encontrados / sala_total:>6.1%}  {sala_encontrados:>6}/{sala_total:<6}  {sala}")
+    return 0
+
+def cmd_search(args):
+    """Busca patrimônios em todas as salas pelo índice de texto."""
+    db_manager = open_database(args, read_only=True)
+    rows = db_manager.search_patrimonios(" ".join(args.texto), args.limite)
+    db_manager.close()
+    if rows is None:
+        print("Busca indisponível: o SQLite instalado não tem FTS5.")
+        return 1
+    for _, sala, numero, descricao, numero_de_serie, _, _, encontrado in rows:
+        print(f"{numero:<12} {'Lido' if encontrado == 1 else 'Não Lido':<9} {descricao or '':<45} "
+              f"{numero_de_serie or '':<14} {sala or ''}")
+    print(f"Resultados: {len(rows)}")
+    return 0
+
+def cmd_snapshot(args):
+    """Cria, lista ou apaga retratos do inventário."""
+    db_manager = open_database(args)
+    try:
+        if args.delete:
+            if not db_manager.delete_snapshot(args.delete):
+                print(f"Retrato não encontrado: {args.delete}")
+                return 1
+            print(f"Retrato apagado: {args.delete}")
+        elif args.list:
+            for nome, criado_em, total, encontrados in db_manager.get_snapshots():
+                print(f"{nome:<24} {criado_em}  {encontrados:>7}/{total:<7} encontrados")
+        else:
+            try:
+                nome = db_manager.create_snapshot(args.nome)
+            except sqlite3.IntegrityError:
+                print(f"Já existe um retrato com o nome {args.nome}")
+                return 1
+            print(f"Retrato criado: {nome}")
+    finally:
+        db_manager.close()
+    return 0
+
+def cmd_delta(args):
+    """Gera o relatório de diferenças entre dois retratos, ou entre um retrato e o estado atual."""
+    from report_generator import ReportGenerator
+    db_manager = open_database(args, read_only=True)
+    totais = ReportGenerator(db_manager).generate_delta_report(args.de, args.para)
+    db_manager.close()
+    if totais is None:
+        return 1
+    print(f"Novos encontrados: {totais['encontrado']}")
+    print(f"Movidos: {totais['movido']}")
+    print(f"Novos não cadastrados: {totais['nao_cadastrado']}")
+    return 0
+
+def cmd_serve(args):
+    """Atende estações de escaneamento pela rede."""
+    from scan_server import ScanServer, DEFAULT_PORT, TOKEN_ENV, parse_address, get_token, is_loopback
+    address = parse_address(args.endereco or str(DEFAULT_PORT))
+    token = get_token(args.token)
+    if not token and not is_loopback(address[0]):
+        # As estações gravam no banco sem outra autenticação: na rede, exigir o token
+        print(f"Para atender na rede ({address[0]}), indique -token ou defina {TOKEN_ENV}")
+        return 1
+    from database import resolve_db_path
+    # O banco só é aberto pelo servidor, dono do diário; aqui apenas se descobre qual é
+    db_path = args.db or resolve_db_path(args.campus)
+    try:
+        server = ScanServer(address, db_path, commit_interval=args.commit_interval, token=token)
+    except RuntimeError as e:
+        print(f"Erro: {e}")
+        return 1
+    server.run()
+    return 0
+
+def cmd_campus(args):
+    """Lista os campi registrados, escolhe o ativo ou arquiva um campus concluído."""
+    from database import get_campus_registry
+    registry = get_campus_registry()
+    nome = args.ativar or args.arquivar
+    if nome is not None and nome not in registry.campi:
+        print(f"Campus não registrado: {nome}")
+        return 1
+    if args.ativar:
+        registry.activate(nome)
+        print(f"Campus ativo: {nome}")
+    elif args.arquivar:
+        registry.archive(nome)
+        print(f"Campus arquivado: {nome} ({registry.get_db_path(nome)})")
+        if registry.ativo is None:
+            print("Nenhum campus ativo; escolha um com campus -ativar NOME")
+    elif not registry.campi:
+        print("Nenhum campus registrado; os dados ficam em suap.db.")
+    else:
+        for nome, campus in sorted(registry.campi.items()):
+            marca = "*" if nome == registry.ativo else " "
+            situacao = "arquivado" if campus.get("arquivado") else ""
+            print(f"{marca} {nome:<24} {campus.get('campus_carga') or '(todos)':<32} {situacao}")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="suapcd", description="SUAP-CD - Coletor de Dados (linha de comando)")
+    parser.add_argument("-db", type=str, help="Caminho do banco (padrão: diretório de dados do sistema)")
+    parser.add_argument("-commit-interval", type=float, default=DEFAULT_COMMIT_INTERVAL,
+                        help="Segundos máximos entre a leitura e a gravação definitiva de um escaneamento")
+    parser.add_argument("-profile", type=float, nargs="?", const=instrumentation.DEFAULT_SLOW_MS, metavar="MS",
+                        help="Medir as operações do banco, registrando as que passarem de MS")
+    parser.add_argument("-campus", type=str, metavar="NOME",
+                        help="Banco do campus registrado a usar (padrão: o campus ativo)")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMANDO")
+
+    command = commands.add_parser("load", help="Zerar o banco e importar um CSV do SUAP")
+    command.add_argument("arquivo", type=str, help="Caminho do arquivo CSV")
+    command.add_argument("-campus-carga", type=str, metavar="CAMPUS",
+                         help="Importar só os itens deste CAMPUS DA CARGA, num banco próprio")
+    command.add_argument("-por-campus", action="store_true",
+                         help="Importar cada CAMPUS DA CARGA no seu próprio banco")
+    command.set_defaults(func=cmd_load)
+
+    command = commands.add_parser("update", help="Atualizar com um CSV mais novo preservando as leituras")
+    command.add_argument("arquivo", type=str, help="Caminho do arquivo CSV")
+    command.set_defaults(func=cmd_update)
+
+    command = commands.add_parser("scanlog", help="Aplicar arquivos de leituras das pistolas")
+    command.add_argument("arquivos", type=str, nargs="+", metavar="ARQUIVO",
+                         help="Arquivos com um número por linha")
+    command.set_defaults(func=cmd_scanlog)
+
+    command = commands.add_parser("rebuild", help="Refazer as leituras a partir do diário")
+    command.set_defaults(func=cmd_rebuild)
+
+    command = commands.add_parser("report", help="Gerar os relatórios CSV")
+    command.add_argument("-full", action="store_true", help="Reescrever os relatórios de todas as salas")
+    command.add_argument("-archive", type=str, nargs="?", const="", metavar="ARQUIVO",
+                         help="Gravar todos os relatórios num único ZIP (padrão: relatorio.zip)")
+    command.add_argument("-geral", action="store_true", help="Gerar somente os relatórios do _GERAL_")
+    command.add_argument("-campi", action="store_true", help="Gerar o relatório conjunto de todos os campi")
+    command.set_defaults(func=cmd_report)
+
+    command = commands.add_parser("stats", help="Exibir o andamento do inventário")
+    command.add_argument("-salas", type=int, default=10, help="Quantidade de salas menos concluídas a listar")
+    command.set_defaults(func=cmd_stats)
+
+    command = commands.add_parser("search", help="Buscar patrimônios em todas as salas")
+    command.add_argument("texto", type=str, nargs="+", help="Palavras do número, descrição, série, rótulos ou fornecedor")
+    command.add_argument("-limite", type=int, help="Quantidade máxima de resultados (padrão: 200)")
+    command.set_defaults(func=cmd_search)
+
+    command = commands.add_parser("snapshot", help="Criar, listar ou apagar retratos do inventário")
+    command.add_argument("nome", type=str, nargs="?", help="Nome do retrato (padrão: data e hora)")
+    command.add_argument("-list", action="store_true", help="Listar os retratos")
+    command.add_argument("-delete", type=str, metavar="NOME", help="Apagar o retrato")
+    command.set_defaults(func=cmd_snapshot)
+
+    command = commands.add_parser("delta", help="Relatório do que mudou desde um retrato")
+    command.add_argument("de", type=str, help="Retrato de partida")
+    command.add_argument("para", type=str, nargs="?", help="Retrato de chegada (padrão: estado atual)")
+    command.set_defaults(func=cmd_delta)
+
+    command = commands.add_parser("serve", help="Atender estações de escaneamento pela rede")
+    command.add_argument("endereco", type=str, nargs="?", metavar="[HOST:]PORTA",
+                         help="Endereço (padrão: 127.0.0.1:8765; para a rede, ex.: 0.0.0.0:8765)")
+    command.add_argument("-token", type=str, help="Token que as estações devem enviar (padrão: SUAPCD_TOKEN)")
+    command.set_defaults(func=cmd_serve)
+
+    command = commands.add_parser("campus", help="Listar, ativar ou arquivar os bancos de cada campus")
+    command.add_argument("-ativar", type=str, metavar="NOME", help="Usar este campus quando nenhum for indicado")
+    command.add_argument("-arquivar", type=str, metavar="NOME", help="Mover o banco do campus para arquivados")
+    command.set_defaults(func=cmd_campus)
+    return parser
+
+# Nomes aceitos como primeiro argumento do app.py para usar a linha de comando
+COMMANDS = ["load", "update", "scanlog", "rebuild", "report", "stats", "search", "snapshot", "delta", "serve",
+            "campus"]
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile is not None:
+        instrumentation.enable(args.profile)
+    if not args.db and args.command != "campus":
+        from database import get_campus_registry
+        registry = get_campus_registry()
+        if args.campus:
+            if args.command != "load" and args.campus not in registry.campi:
+                print(f"Campus não registrado: {args.campus}")
+                return 1
+        elif not (args.command == "load" and (args.por_campus or args.campus_carga)) \
+                and not (args.command == "report" and args.campi):
+            # O banco padrão: com campi registrados, só o do campus ativo
+            try:
+                registry.get_default_db_path()
+            except ValueError as e:
+                print(f"Erro: {e}")
+                return 1
+    try:
+        return args.func(args)
+    except FileNotFoundError as e:
+        # Consultas abrem o banco somente para leitura e não o criam
+        print(f"Erro: {e}")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QTableView, QHeaderView, QPushButton, QApplication
+from PyQt5.QtCore import Qt, QTimer, QSortFilterProxyModel
+from PyQt5.QtGui import QFont
+from resumo_model import ResumoTableModel, VIEW_COL_CONCLUIDO
+
+# Intervalo entre as consultas das salas alteradas
+REFRESH_INTERVAL_MS = 1000
+
+class DashboardWindow(QDialog):
+    """Painel com o andamento do inventário em todas as salas, ordenado por percentual concluído.
+
+    A primeira consulta traz todas as salas; as seguintes trazem somente as salas
+    alteradas desde a anterior, pelo contador de salas_resumo. Se a quantidade de
+    salas do painel deixa de bater com a do banco (ex.: salas removidas numa nova
+    carga), todas são recarregadas.
+    """
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Painel de Salas")
+        self.db = db  # DatabaseBridge
+        self.alteracao = 0  # Última alteração de salas_resumo já exibida
+        self.loading = False
+        self.reload = True  # Recarregar todas as salas na próxima consulta
+
+        screen = QApplication.primaryScreen().size()
+        self.resize(int(screen.width() * 0.6), int(screen.height() * 0.7))
+
+        layout = QVBoxLayout()
+
+        self.totais_label = QLabel("")
+        self.totais_label.setFont(QFont("Arial", 12))
+        layout.addWidget(self.totais_label)
+
+        self.model = ResumoTableModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(Qt.UserRole)
+        self.proxy.setDynamicSortFilter(True)
+        self.table = QTableView(self)
+        self.table.setModel(self.proxy)
+        self.table.setFont(QFont("Arial", 10))
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)  # Impedir edição
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(VIEW_COL_CONCLUIDO, Qt.AscendingOrder)
+        layout.addWidget(self.table)
+
+        close_button = QPushButton("Fechar")
+        close_button.setFont(QFont("Arial", 12))
+        close_button.clicked.connect(self.close)
+        layout.addWidget(close_button, alignment=Qt.AlignCenter)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def refresh(self):
+        """Busca as salas alteradas desde a última consulta."""
+        if self.loading:
+            return
+        self.loading = True
+        self.db.read("get_salas_resumo", 0 if self.reload else self.alteracao, callback=self.resumo_loaded)
+
+    def resumo_loaded(self, result):
+        """Aplica ao modelo as salas alteradas e atualiza os totais do campus."""
+        self.loading = False
+        alteracao, rows, salas = result
+        if self.reload:
+            self.model.replace(rows)
+            self.reload = False
+        elif rows:
+            self.model.apply(rows)
+        if self.model.rowCount() != salas or alteracao < self.alteracao:
+            # Salas removidas ou banco trocado: as alterações não bastam
+            self.reload = True
+            QTimer.singleShot(0, self.refresh)
+        self.alteracao = alteracao
+        total, encontrados, divergentes, nao_cadastrados = self.model.totais
+        percentual = f"{encontrados / total:.1%}" if total else "-"
+        self.totais_label.setText(
+            f"Salas: {self.model.rowCount()}  |  Patrimônios: {total}  |  Encontrados: {encontrados} ({percentual})"
+            f"  |  Divergentes: {divergentes}  |  Não cadastrados: {nao_cadastrados}")
+
+    def closeEvent(self, event):
+        """Interrompe as consultas enquanto o painel está fechado."""
+        self.refresh_timer.stop()
+        event.accept()
@@ -1,42 +1,90 @@
 import sqlite3
 import os
+import re
 import csv
 import hashlib
 import platform
+import time
+import instrumentation
 from pathlib import Path
+from scan_journal import ScanJournal, lock_journal, ENCONTRADO, NAO_CADASTRADO, CANCELADO, TIMESTAMP_FORMAT
+from numero_matcher import NumeroMatcher
+from campus_registry import CampusRegistry, campus_from_db_path
+
+# Janela de durabilidade dos escaneamentos: as leituras são gravadas em grupo a cada
+# DEFAULT_COMMIT_INTERVAL segundos ou DEFAULT_COMMIT_BATCH leituras, o que vier antes
+DEFAULT_COMMIT_INTERVAL = 0.5
+DEFAULT_COMMIT_BATCH = 50
+
+# Versão mínima do SQLite: os não cadastrados são gravados com upsert (INSERT ... ON CONFLICT)
+MIN_SQLITE_VERSION = (3, 24, 0)
+
+def check_sqlite_version():
+    """Falha com RuntimeError se o SQLite do Python for anterior a MIN_SQLITE_VERSION."""
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        minimo = ".".join(map(str, MIN_SQLITE_VERSION))
+        raise RuntimeError(f"O SUAP-CD requer SQLite {minimo} ou superior; este Python usa o {sqlite3.sqlite_version}")
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, db_path=None, read_only=False,
+                 commit_interval=DEFAULT_COMMIT_INTERVAL, commit_batch=DEFAULT_COMMIT_BATCH, campus=None):
         self.conn = None
         self.cursor = None
+        self.db_path = db_path
+        self.campus = campus  # Nome do campus no registro; sem db_path nem campus, vale o ativo
+        self.read_only = read_only
+        self.commit_interval = commit_interval
+        self.commit_batch = commit_batch
+        self.pending_scans = 0
+        self.first_pending_at = None
+        self.journal = None
+        self.journal_lock = None  # Trava do diário; None se outro processo é o dono das leituras
+        self.sala_codigos = {}  # Cache de sala_id -> código, usado no diário
+        self.numero_matcher = None  # Índice de números para sugestões, criado na primeira leitura errada
+        self.numero_matcher_versao = None
+        # Leituras já feitas, para reconhecer repetições sem consultar o banco
+        self.salas_lidas = {}  # numero -> sala em que o patrimônio já foi marcado como encontrado
+        self.numeros_desconhecidos = set()  # Números lidos que não estão cadastrados
+        self.leituras_versao = None  # data_version em que os dois caches acima valem
         self.init_database()
 
     def get_data_dir(self):
         """Retorna o diretório de dados apropriado com base no sistema operacional."""
-        if platform.system() == "Windows":
-            # Usar %APPDATA%\SUAP-CD no Windows
-            data_dir = Path(os.getenv("APPDATA")) / "SUAP-CD"
-        else:
-            # Usar /var/lib/suapcd no Linux
-            data_dir = Path("/var/lib/suapcd")
-        
-        # Criar o diretório se não existir
-        data_dir.mkdir(parents=True, exist_ok=True)
-        return data_dir
+        return get_data_dir()
 
     def init_database(self):
         """Inicializa o banco de dados e armazena a conexão e o cursor."""
-        data_dir = self.get_data_dir()
-        db_path = data_dir / "suap.db"
-        
-        self.conn = sqlite3.connect(db_path, check_same_thread=True)
+        if self.db_path is None:
+            # Somente o banco do campus escolhido (ou do ativo) é aberto
+            self.db_path = resolve_db_path(self.campus)
+        self.campus = campus_from_db_path(self.db_path)
+        check_sqlite_version()
+
+        if self.read_only:
+            if not Path(self.db_path).exists():
+                raise FileNotFoundError(f"Banco não encontrado: {self.db_path}")
+            # Conexão somente leitura, usada fora da thread da interface (ex.: relatórios)
+            self.conn = instrumentation.wrap_connection(
+                sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro", uri=True,
+                                check_same_thread=True))
+            self.cursor = self.conn.cursor()
+            return
+
+        self.conn = instrumentation.wrap_connection(sqlite3.connect(self.db_path, check_same_thread=True))
         self.cursor = self.conn.cursor()
-        
+
+        # WAL permite que leitores em outras conexões não bloqueiem os escaneamentos;
+        # com synchronous NORMAL o commit não força fsync, apenas os checkpoints
+        self.cursor.execute("PRAGMA journal_mode = WAL")
+        self.cursor.execute("PRAGMA synchronous = NORMAL")
+
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS salas (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 sala TEXT NOT NULL UNIQUE,
-                codigo TEXT NOT NULL UNIQUE
+                codigo TEXT NOT NULL UNIQUE,
+                versao INTEGER DEFAULT 1,
+                versao_relatorio INTEGER DEFAULT 0
             )
         ''')
         
@@ -62,6 +110,7 @@ class DatabaseManager:
                 estado_de_conservacao TEXT,
                 encontrado INTEGER DEFAULT 0,
                 sala_id_original INTEGER,
+                removido INTEGER DEFAULT 0,
                 FOREIGN KEY (sala_id) REFERENCES salas(id),
                 FOREIGN KEY (sala_id_original) REFERENCES salas(id)
             )
@@ -72,9 +121,47 @@ class DatabaseManager:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 numero TEXT NOT NULL,
                 sala_id INTEGER,
+                quantidade INTEGER NOT NULL DEFAULT 1,
+                primeira_leitura TEXT,
+                ultima_leitura TEXT,
                 FOREIGN KEY (sala_id) REFERENCES salas(id)
             )
         ''')
+
+        # Uma linha por número e sala: bancos antigos tinham uma linha por leitura
+        self.cursor.execute("PRAGMA table_info(patrimonios_nao_cadastrados)")
+        columns = [col[1] for col in self.cursor.fetchall()]
+        if 'quantidade' not in columns:
+            self.cursor.execute('''
+                ALTER TABLE patrimonios_nao_cadastrados
+                ADD COLUMN quantidade INTEGER NOT NULL DEFAULT 1
+            ''')
+            self.cursor.execute("ALTER TABLE patrimonios_nao_cadastrados ADD COLUMN primeira_leitura TEXT")
+            self.cursor.execute("ALTER TABLE patrimonios_nao_cadastrados ADD COLUMN ultima_leitura TEXT")
+            self.cursor.execute('''
+                UPDATE patrimonios_nao_cadastrados
+                SET quantidade = (
+                    SELECT COUNT(*) FROM patrimonios_nao_cadastrados d
+                    WHERE d.numero = patrimonios_nao_cadastrados.numero
+                      AND d.sala_id IS patrimonios_nao_cadastrados.sala_id
+                )
+                WHERE id IN (
+                    SELECT MIN(id) FROM patrimonios_nao_cadastrados
+                    GROUP BY numero, sala_id
+                    HAVING COUNT(*) > 1
+                )
+            ''')
+            self.cursor.execute('''
+                DELETE FROM patrimonios_nao_cadastrados
+                WHERE id NOT IN (
+                    SELECT MIN(id) FROM patrimonios_nao_cadastrados GROUP BY numero, sala_id
+                )
+            ''')
+            self.conn.commit()
+        self.cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_nao_cadastrados_numero_sala
+            ON patrimonios_nao_cadastrados (numero, sala_id)
+        ''')
         
         self.cursor.execute("PRAGMA table_info(patrimonios)")
         columns = [col[1] for col in self.cursor.fetchall()]
@@ -95,95 +182,1016 @@ class DatabaseManager:
                 WHERE sala_id_original IS NULL
             ''')
             self.conn.commit()
-        
+
+        if 'removido' not in columns:
+            self.cursor.execute('''
+                ALTER TABLE patrimonios
+                ADD COLUMN removido INTEGER DEFAULT 0
+            ''')
+
+        self.cursor.execute("PRAGMA table_info(salas)")
+        columns = [col[1] for col in self.cursor.fetchall()]
+        if 'versao' not in columns:
+            self.cursor.execute('''
+                ALTER TABLE salas
+                ADD COLUMN versao INTEGER DEFAULT 1
+            ''')
+            self.cursor.execute('''
+                ALTER TABLE salas
+                ADD COLUMN versao_relatorio INTEGER DEFAULT 0
+            ''')
+
+        # Toda alteração de patrimônios ou não cadastrados incrementa a versão das salas
+        # afetadas, para que o relatório reescreva apenas as salas modificadas
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_patrimonios_versao_sala
+            AFTER UPDATE ON patrimonios
+            BEGIN
+                UPDATE salas SET versao = versao + 1 WHERE id IN (OLD.sala_id, NEW.sala_id);
+            END
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_nao_cadastrados_versao_sala
+            AFTER INSERT ON patrimonios_nao_cadastrados
+            BEGIN
+                UPDATE salas SET versao = versao + 1 WHERE id = NEW.sala_id;
+            END
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_nao_cadastrados_versao_sala_update
+            AFTER UPDATE ON patrimonios_nao_cadastrados
+            BEGIN
+                UPDATE salas SET versao = versao + 1 WHERE id IN (OLD.sala_id, NEW.sala_id);
+            END
+        ''')
+        self.cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_nao_cadastrados_versao_sala_delete
+            AFTER DELETE ON patrimonios_nao_cadastrados
+            BEGIN
+                UPDATE salas SET versao = versao + 1 WHERE id = OLD.sala_id;
+            END
+        ''')
+
+        # Contadores por sala mantidos pelos gatilhos de create_resumo_triggers; alteracao
+        # cresce a cada mudança, para que o painel busque só as salas alteradas
+        self.cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'salas_resumo'")
+        resumo_exists = self.cursor.fetchone() is not None
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS salas_resumo (
+                sala_id INTEGER PRIMARY KEY,
+                total INTEGER NOT NULL DEFAULT 0,
+                encontrados INTEGER NOT NULL DEFAULT 0,
+                divergentes INTEGER NOT NULL DEFAULT 0,
+                nao_cadastrados INTEGER NOT NULL DEFAULT 0,
+                alteracao INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (sala_id) REFERENCES salas(id)
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_salas_resumo_alteracao
+            ON salas_resumo (alteracao)
+        ''')
+        # Gatilhos de versões anteriores contavam também os itens removidos do SUAP
+        self.cursor.execute('''
+            SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_patrimonios_resumo_update'
+        ''')
+        trigger = self.cursor.fetchone()
+        if trigger is not None and "removido" not in trigger[0]:
+            drop_resumo_triggers(self.cursor)
+            resumo_exists = False
+        create_resumo_triggers(self.cursor)
+        if not resumo_exists:
+            rebuild_salas_resumo(self.cursor)
+
+        # Até que posição do diário de leituras o banco está atualizado (linha única)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS diario_leituras (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                identificador TEXT NOT NULL,
+                posicao INTEGER NOT NULL
+            )
+        ''')
+
+        # Retratos do inventário: o estado de cada patrimônio é guardado pelo número e pelo
+        # código da sala, que se mantêm entre importações; o -load não apaga os retratos
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL UNIQUE,
+                criado_em TEXT NOT NULL
+            )
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS snapshot_salas (
+                snapshot_id INTEGER NOT NULL,
+                codigo TEXT NOT NULL,
+                sala TEXT NOT NULL,
+                PRIMARY KEY (snapshot_id, codigo)
+            ) WITHOUT ROWID
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS snapshot_patrimonios (
+                snapshot_id INTEGER NOT NULL,
+                numero TEXT NOT NULL,
+                sala TEXT,
+                encontrado INTEGER NOT NULL,
+                PRIMARY KEY (snapshot_id, numero)
+            ) WITHOUT ROWID
+        ''')
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS snapshot_nao_cadastrados (
+                snapshot_id INTEGER NOT NULL,
+                numero TEXT NOT NULL,
+                sala TEXT NOT NULL,
+                PRIMARY KEY (snapshot_id, numero, sala)
+            ) WITHOUT ROWID
+        ''')
+
+        # Índice de texto da busca de patrimônios, lido de patrimonios (conteúdo externo)
+        if not busca_exists(self.cursor):
+            try:
+                create_busca_index(self.cursor)
+                rebuild_busca_index(self.cursor)
+            except sqlite3.OperationalError as e:
+                print(f"Aviso: busca de patrimônios indisponível ({e})")
+        if busca_exists(self.cursor):
+            create_busca_triggers(self.cursor)
+
+        create_numero_index(self.cursor)
+        self.cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_patrimonios_sala_id
+            ON patrimonios (sala_id)
+        ''')
         self.conn.commit()
+        self.recover_journal()
+
+    def get_journal_path(self):
+        """Retorna o caminho do diário de leituras, ao lado do banco."""
+        return Path(self.db_path).with_suffix(".journal")
+
+    def recover_journal(self):
+        """Abre o diário de leituras e reaplica as leituras gravadas após o último checkpoint.
+
+        Só a conexão que consegue a trava do diário o abre: com a interface ou o
+        servidor em execução, as leituras depois do checkpoint podem ser apenas as
+        que eles ainda não gravaram, e reaplicá-las aqui as duplicaria.
+        """
+        self.journal_lock = lock_journal(self.get_journal_path())
+        if self.journal_lock is None:
+            return
+        # O checkpoint é lido já com a trava, depois do último commit do dono anterior
+        self.cursor.execute("SELECT identificador, posicao FROM diario_leituras WHERE id = 1")
+        checkpoint = self.cursor.fetchone()
+        self.journal = ScanJournal(self.get_journal_path(), checkpoint[0] if checkpoint else None)
+
+        if checkpoint is None:
+            # Banco novo, recém-carregado ou anterior ao diário: o diário começa pelo estado atual
+            seeded = self.write_journal_state()
+            self.journal.sync()
+            self.journal.checkpoint(self.cursor)
+            self.conn.commit()
+            if seeded:
+                print(f"Diário de leituras iniciado com {seeded} leituras já existentes")
+            return
+
+        if self.journal.recreated:
+            print(f"Aviso: diário de leituras não encontrado em {self.journal.path}; iniciando um novo")
+            self.journal.checkpoint(self.cursor)
+            self.conn.commit()
+            return
+
+        if checkpoint[1] < self.journal.position:
+            start = time.perf_counter()
+            total, _, _ = self.replay_journal(checkpoint[1])
+            print(f"Leituras recuperadas do diário: {total} ({time.perf_counter() - start:.2f} s)")
+
+    def write_journal_state(self):
+        """Registra no diário as leituras que produzem o estado atual do banco."""
+        self.cursor.execute('''
+            SELECT s.codigo, p.numero
+            FROM patrimonios p
+            JOIN salas s ON s.id = p.sala_id
+            WHERE p.encontrado = 1
+            ORDER BY p.id
+        ''')
+        total = 0
+        for codigo, numero in self.cursor.fetchall():
+            self.journal.append(codigo, numero, ENCONTRADO, timestamp="")
+            total += 1
+        # Uma linha por leitura contada, com a primeira e a última data e hora
+        self.cursor.execute('''
+            SELECT s.codigo, u.numero, u.quantidade, u.primeira_leitura, u.ultima_leitura
+            FROM patrimonios_nao_cadastrados u
+            JOIN salas s ON s.id = u.sala_id
+            ORDER BY u.id
+        ''')
+        for codigo, numero, quantidade, primeira, ultima in self.cursor.fetchall():
+            for leitura in range(quantidade):
+                timestamp = primeira if leitura == 0 else ultima
+                self.journal.append(codigo, numero, NAO_CADASTRADO, timestamp=timestamp or "")
+            total += quantidade
+        return total
+
+    def replay_journal(self, position):
+        """Aplica as leituras do diário a partir da posição dada e registra o checkpoint."""
+        self.cursor.execute("SELECT codigo, id FROM salas")
+        sala_ids = dict(self.cursor.fetchall())
+        ignoradas = 0
+        cancelamentos = []
+
+        def scans():
+            nonlocal ignoradas
+            for timestamp, codigo, numero, resultado in self.journal.read_from(position):
+                sala_id = sala_ids.get(codigo)
+                if sala_id is None:
+                    ignoradas += 1
+                elif resultado == CANCELADO:
+                    cancelamentos.append((numero, sala_id))
+                else:
+                    yield numero, sala_id, timestamp or None
+
+        try:
+            result = apply_scans(self.cursor, scans())
+            for numero, sala_id in cancelamentos:
+                delete_unfound_patrimonio(self.cursor, numero, sala_id)
+            self.journal.checkpoint(self.cursor)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        if ignoradas:
+            print(f"Leituras do diário ignoradas (sala desconhecida): {ignoradas}")
+        return result
+
+    def require_journal(self):
+        """Falha com RuntimeError se esta conexão não é a dona do diário e, portanto, não grava leituras."""
+        if self.journal is None:
+            raise RuntimeError(f"O diário de leituras {self.get_journal_path()} está em uso por outro processo "
+                               "(interface ou servidor de escaneamento)")
+
+    def rebuild_from_journal(self):
+        """Refaz as leituras de patrimonios e patrimonios_nao_cadastrados a partir do diário inteiro."""
+        self.require_journal()
+        self.flush()
+        start = time.perf_counter()
+        self.cursor.execute('''
+            UPDATE patrimonios
+            SET sala_id = sala_id_original, encontrado = 0
+            WHERE encontrado = 1 OR sala_id IS NOT sala_id_original
+        ''')
+        self.cursor.execute("DELETE FROM patrimonios_nao_cadastrados")
+        self.leituras_versao = None
+        total, encontrados, nao_cadastrados = self.replay_journal(0)
+        print(f"Leituras reaplicadas do diário: {total}")
+        print(f"Patrimônios encontrados: {encontrados}")
+        print(f"Não cadastrados (por sala): {nao_cadastrados}")
+        print(f"Tempo: {time.perf_counter() - start:.2f} s")
+        return total
 
     def close(self):
         """Fecha a conexão com o banco de dados de forma segura."""
         try:
             if self.conn is not None:
+                self.flush()
                 self.conn.commit()
                 self.conn.close()
                 self.conn = None
                 self.cursor = None
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            if self.journal_lock is not None:
+                self.journal_lock.close()
+                self.journal_lock = None
         except Exception as e:
             print(f"Erro ao fechar a conexão com o banco: {e}")
 
+    def begin_read(self):
+        """Abre uma transação de leitura para que as consultas seguintes vejam o mesmo estado do banco."""
+        self.flush()
+        self.conn.commit()
+        self.cursor.execute("BEGIN")
+
+    def end_read(self):
+        """Encerra a transação aberta por begin_read."""
+        self.conn.rollback()
+
+    def count_salas(self):
+        """Retorna a quantidade de salas."""
+        self.cursor.execute("SELECT COUNT(*) FROM salas")
+        return self.cursor.fetchone()[0]
+
     def get_all_salas(self):
         """Retorna uma lista de todas as salas (id, nome)."""
         self.cursor.execute("SELECT id, sala FROM salas ORDER BY sala")
         return self.cursor.fetchall()
 
-    def get_patrimonios_by_sala(self, sala_id):
-        """Retorna todos os patrimônios associados a uma sala específica."""
-        self.cursor.execute('''
+    def get_patrimonios_by_sala(self, sala_id, filter_mode="all"):
+        """Retorna os patrimônios de uma sala, com o nome da sala original.
+
+        filter_mode pode ser "all", "encontrados" ou "nao_encontrados".
+        """
+        filtro = {
+            "all": "",
+            "encontrados": "AND p.encontrado = 1",
+            "nao_encontrados": "AND p.encontrado = 0",
+        }[filter_mode]
+        self.cursor.execute(f'''
             SELECT p.numero, p.status, p.ed, p.descricao, p.rotulos, p.carga_atual,
                    p.setor_responsavel, p.campus_carga, p.numero_de_serie,
-                   p.estado_de_conservacao, p.encontrado, p.sala_id_original
+                   p.estado_de_conservacao, p.encontrado, p.sala_id_original, o.sala
             FROM patrimonios p
-            WHERE p.sala_id = ?
+            LEFT JOIN salas o ON o.id = p.sala_id_original
+            WHERE p.sala_id = ? AND p.removido IS NOT 1 {filtro}
         ''', (sala_id,))
         return self.cursor.fetchall()
 
+    def get_sala_nome(self, sala_id):
+        """Retorna o nome de uma sala, ou None se não existir."""
+        self.cursor.execute("SELECT sala FROM salas WHERE id = ?", (sala_id,))
+        result = self.cursor.fetchone()
+        return result[0] if result else None
+
+    def get_patrimonio(self, numero):
+        """Retorna (sala_id, linha) de um patrimônio, com a linha no formato de get_patrimonios_by_sala."""
+        self.cursor.execute('''
+            SELECT p.sala_id, p.numero, p.status, p.ed, p.descricao, p.rotulos, p.carga_atual,
+                   p.setor_responsavel, p.campus_carga, p.numero_de_serie,
+                   p.estado_de_conservacao, p.encontrado, p.sala_id_original, o.sala
+            FROM patrimonios p
+            LEFT JOIN salas o ON o.id = p.sala_id_original
+            WHERE p.numero = ? AND p.removido IS NOT 1
+        ''', (numero,))
+        result = self.cursor.fetchone()
+        return (result[0], result[1:]) if result else None
+
     def mark_patrimonio_encontrado(self, numero, sala_id):
-        """Marca um patrimônio como encontrado e atualiza sala_id se necessário."""
+        """Marca um patrimônio como encontrado e atualiza sala_id se necessário.
+
+        Itens removidos do SUAP não são marcados: a leitura conta como não cadastrada.
+        """
+        self.require_journal()
+        # Uma única busca pelo índice de numero; as atualizações usam a chave primária
         self.cursor.execute('''
-            SELECT sala_id, sala_id_original
+            SELECT id, sala_id
             FROM patrimonios
-            WHERE numero = ?
+            WHERE numero = ? AND removido IS NOT 1
         ''', (numero,))
-        result = self.cursor.fetchone()
-        
+        result = self.cursor.fetchall()
+
         if result:
-            current_sala_id, current_sala_id_original = result
-            if current_sala_id_original is None:
-                self.cursor.execute('''
-                    UPDATE patrimonios
-                    SET sala_id_original = ?
-                    WHERE numero = ?
-                ''', (current_sala_id, numero))
-            
-            self.cursor.execute('''
+            self.cursor.executemany('''
                 UPDATE patrimonios
-                SET sala_id = ?, encontrado = 1
-                WHERE numero = ?
-            ''', (sala_id, numero))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+                SET sala_id = ?, encontrado = 1,
+                    sala_id_original = COALESCE(sala_id_original, ?)
+                WHERE id = ?
+            ''', [(sala_id, current_sala_id, patrimonio_id)
+                  for patrimonio_id, current_sala_id in result])
+            updated = self.cursor.rowcount > 0
+            self.salas_lidas[numero] = sala_id
+            self.scan_written(numero, sala_id, ENCONTRADO)
+            return updated
+        self.numeros_desconhecidos.add(numero)
         return False
 
     def record_unfound_patrimonio(self, numero, sala_id):
-        """Registra um patrimônio não cadastrado na tabela patrimonios_nao_cadastrados."""
-        self.cursor.execute('''
-            INSERT INTO patrimonios_nao_cadastrados (numero, sala_id)
-            VALUES (?, ?)
-        ''', (numero, sala_id))
-        self.conn.commit()
-        return self.cursor.rowcount > 0
+        """Registra a leitura de um patrimônio não cadastrado: uma linha por número e sala, com a contagem."""
+        self.require_journal()
+        lida_em = time.strftime(TIMESTAMP_FORMAT)
+        self.cursor.execute(UPSERT_NAO_CADASTRADO.format(source="VALUES (?, ?, 1, ?, ?)"),
+                            (numero, sala_id, lida_em, lida_em))
+        recorded = self.cursor.rowcount > 0
+        self.scan_written(numero, sala_id, NAO_CADASTRADO, lida_em)
+        return recorded
+
+    def refresh_leituras(self):
+        """Esvazia os caches de leituras se outra conexão alterou o banco desde a última leitura."""
+        self.cursor.execute("PRAGMA data_version")
+        data_version = self.cursor.fetchone()[0]
+        if data_version != self.leituras_versao:
+            self.salas_lidas.clear()
+            self.numeros_desconhecidos.clear()
+            self.leituras_versao = data_version
 
-    def get_unfound_patrimonios(self):
-        """Retorna todos os patrimônios não cadastrados com suas salas."""
+    def get_numero_matcher(self):
+        """Retorna o índice de números cadastrados, refeito se outra conexão alterou patrimonios."""
+        self.cursor.execute("PRAGMA data_version")
+        data_version = self.cursor.fetchone()[0]
+        if self.numero_matcher is not None and self.numero_matcher_versao[0] == data_version:
+            return self.numero_matcher
+        # A soma dos ids removidos muda quando uma atualização do SUAP remove ou traz de volta um item
         self.cursor.execute('''
-            SELECT s.id, s.sala, u.numero
+            SELECT MAX(id), COUNT(*), TOTAL(CASE WHEN removido IS 1 THEN id END) FROM patrimonios
+        ''')
+        versao = (data_version, self.cursor.fetchone())
+        if self.numero_matcher is None or self.numero_matcher_versao[1] != versao[1]:
+            self.cursor.execute("SELECT numero FROM patrimonios WHERE removido IS NOT 1")
+            self.numero_matcher = NumeroMatcher(numero for numero, in self.cursor)
+        self.numero_matcher_versao = versao
+        return self.numero_matcher
+
+    def find_similar_numeros(self, numero, limite=3):
+        """Sugere patrimônios cadastrados cujo número parece uma leitura errada do número dado.
+
+        Cobre zeros à esquerda, sufixos lidos a mais ou a menos, dígitos vizinhos
+        trocados e um dígito a mais, a menos ou diferente. Retorna linhas
+        (numero, motivo, sala_id, sala, descricao), das mais prováveis às menos.
+        """
+        similares = self.get_numero_matcher().similar(numero, limite)
+        result = []
+        for candidate, motivo in similares:
+            self.cursor.execute('''
+                SELECT p.sala_id, s.sala, p.descricao
+                FROM patrimonios p
+                LEFT JOIN salas s ON s.id = p.sala_id
+                WHERE p.numero = ? AND p.removido IS NOT 1
+            ''', (candidate,))
+            row = self.cursor.fetchone()
+            if row:
+                result.append((candidate, motivo) + row)
+        return result
+
+    def confirm_similar(self, numero_lido, numero, sala_id):
+        """Troca a última leitura não cadastrada de numero_lido na sala pelo patrimônio sugerido.
+
+        A remoção da leitura errada vai para o diário como cancelada. Retorna True se
+        o patrimônio foi marcado como encontrado.
+        """
+        self.require_journal()
+        if delete_unfound_patrimonio(self.cursor, numero_lido, sala_id):
+            self.scan_written(numero_lido, sala_id, CANCELADO)
+        return self.mark_patrimonio_encontrado(numero, sala_id)
+
+    def process_scan(self, numero, sala_id):
+        """Marca o patrimônio como encontrado ou, se não existir, registra-o como não cadastrado.
+
+        Repetições (patrimônio já encontrado nesta sala, número já visto como não
+        cadastrado) são reconhecidas pelos caches, sem buscar o número no banco.
+        Retorna True se o patrimônio estava cadastrado.
+        """
+        self.require_journal()
+        self.refresh_leituras()
+        if self.salas_lidas.get(numero) == sala_id:
+            self.scan_written(numero, sala_id, ENCONTRADO)
+            return True
+        if numero in self.numeros_desconhecidos:
+            self.record_unfound_patrimonio(numero, sala_id)
+            return False
+        if self.mark_patrimonio_encontrado(numero, sala_id):
+            return True
+        self.record_unfound_patrimonio(numero, sala_id)
+        return False
+
+    def get_sala_codigo(self, sala_id):
+        """Retorna o código de uma sala, consultando o banco só na primeira vez."""
+        codigo = self.sala_codigos.get(sala_id)
+        if codigo is None:
+            self.cursor.execute("SELECT codigo FROM salas WHERE id = ?", (sala_id,))
+            result = self.cursor.fetchone()
+            codigo = result[0] if result else ""
+            self.sala_codigos[sala_id] = codigo
+        return codigo
+
+    def scan_written(self, numero, sala_id, resultado, timestamp=None):
+        """Registra no diário um escaneamento gravado e faz o commit do grupo quando ele completa.
+
+        A linha do diário é entregue ao sistema operacional a cada leitura; assim,
+        leituras ainda sem commit no banco sobrevivem a uma queda do programa.
+        """
+        self.journal.append(self.get_sala_codigo(sala_id), numero, resultado, timestamp)
+        self.pending_scans += 1
+        if self.first_pending_at is None:
+            self.first_pending_at = time.monotonic()
+        if self.pending_scans >= self.commit_batch:
+            self.flush()
+        else:
+            self.flush_expired()
+
+    def flush_expired(self):
+        """Faz o commit dos escaneamentos pendentes há mais que commit_interval segundos."""
+        if (self.first_pending_at is not None
+                and time.monotonic() - self.first_pending_at >= self.commit_interval):
+            self.flush()
+
+    def flush(self):
+        """Faz o commit imediato dos escaneamentos pendentes."""
+        if self.pending_scans:
+            # O diário vai para o disco antes do commit que avança o checkpoint
+            self.journal.sync()
+            self.journal.checkpoint(self.cursor)
+            self.conn.commit()
+            self.pending_scans = 0
+            self.first_pending_at = None
+
+    def iter_unfound_patrimonios(self):
+        """Itera sobre os patrimônios não cadastrados com suas salas, ordenados por sala.
+
+        Cada linha tem (sala_id, sala, numero, quantidade, primeira_leitura, ultima_leitura).
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT s.id, s.sala, u.numero, u.quantidade, u.primeira_leitura, u.ultima_leitura
             FROM patrimonios_nao_cadastrados u
             JOIN salas s ON u.sala_id = s.id
             ORDER BY s.sala, u.numero
         ''')
-        return self.cursor.fetchall()
+        return cursor
 
-    def get_relatorio_patrimonios(self):
-        """Retorna uma lista de todas as salas e seus patrimônios para relatório."""
-        self.cursor.execute('''
+    def iter_relatorio_patrimonios(self):
+        """Itera sobre todas as salas e seus patrimônios, já com o nome da sala original e a versão, para relatório."""
+        cursor = self.conn.cursor()
+        cursor.execute('''
             SELECT s.id, s.sala, p.numero, p.status, p.ed, p.descricao, p.rotulos,
                    p.carga_atual, p.setor_responsavel, p.campus_carga,
                    p.numero_de_serie, p.estado_de_conservacao, p.encontrado,
-                   p.sala_id_original
+                   p.sala_id_original, o.sala, s.versao, s.versao_relatorio
             FROM salas s
-            LEFT JOIN patrimonios p ON s.id = p.sala_id
+            LEFT JOIN patrimonios p ON s.id = p.sala_id AND p.removido IS NOT 1
+            LEFT JOIN salas o ON o.id = p.sala_id_original
             ORDER BY s.sala, p.numero
         ''')
+        return cursor
+
+    def get_salas_resumo(self, desde=0):
+        """Retorna (alteracao, linhas, salas) com o resumo das salas alteradas depois de desde.
+
+        Cada linha tem (sala_id, sala, total, encontrados, divergentes, nao_cadastrados).
+        Passar a alteracao retornada na próxima chamada traz apenas as salas que
+        mudaram desde então, pelo índice de salas_resumo.alteracao. salas é a
+        quantidade atual de salas, para quem acompanha as alterações perceber as
+        que deixaram de existir (ex.: numa nova carga).
+        """
+        self.cursor.execute("SELECT COALESCE(MAX(alteracao), 0), COUNT(*) FROM salas_resumo")
+        alteracao, salas = self.cursor.fetchone()
+        self.cursor.execute('''
+            SELECT r.sala_id, s.sala, r.total, r.encontrados, r.divergentes, r.nao_cadastrados
+            FROM salas_resumo r
+            JOIN salas s ON s.id = r.sala_id
+            WHERE r.alteracao > ?
+        ''', (desde,))
+        return alteracao, self.cursor.fetchall(), salas
+
+    def mark_salas_reportadas(self, versoes):
+        """Registra a versão de cada sala cujos relatórios foram gravados ({sala_id: versao})."""
+        self.cursor.executemany('''
+            UPDATE salas SET versao_relatorio = ? WHERE id = ?
+        ''', [(versao, sala_id) for sala_id, versao in versoes.items()])
+        # O commit levaria junto os escaneamentos pendentes: eles passam pelo flush, com o checkpoint
+        self.flush()
+        self.conn.commit()
+
+    def search_patrimonios(self, texto, limite=None):
+        """Busca patrimônios em todo o campus pelo índice de texto, dos mais relevantes aos menos.
+
+        Cada palavra do texto deve aparecer (como início de palavra, sem diferenciar
+        acentos) no número, descrição, número de série, rótulos ou fornecedor.
+        Retorna linhas (sala_id, sala, numero, descricao, numero_de_serie, rotulos,
+        fornecedor, encontrado), ou None se o SQLite não tiver FTS5.
+        """
+        query = busca_query(texto)
+        if query is None:
+            return []
+        if not busca_exists(self.cursor):
+            return None
+        # Só os mais relevantes, ordenados pelo próprio FTS5, são buscados em patrimonios
+        self.cursor.execute('''
+            SELECT p.sala_id, s.sala, p.numero, p.descricao, p.numero_de_serie, p.rotulos,
+                   p.fornecedor, p.encontrado
+            FROM (
+                SELECT rowid, rank FROM patrimonios_busca
+                WHERE patrimonios_busca MATCH ?
+                ORDER BY rank
+                LIMIT ?
+            ) b
+            JOIN patrimonios p ON p.id = b.rowid
+            LEFT JOIN salas s ON s.id = p.sala_id
+            WHERE p.removido IS NOT 1
+            ORDER BY b.rank
+        ''', (query, limite or BUSCA_LIMIT))
+        return self.cursor.fetchall()
+
+    def create_snapshot(self, nome=None):
+        """Guarda um retrato do estado atual do inventário e retorna seu nome.
+
+        São copiados, por comandos set-based, a sala e a situação de cada patrimônio,
+        os não cadastrados de cada sala e os nomes das salas. Um número repetido é
+        guardado uma vez, preferindo a linha encontrada.
+        """
+        self.flush()
+        nome = nome or time.strftime("%Y-%m-%d_%H%M%S")
+        try:
+            self.cursor.execute('''
+                INSERT INTO snapshots (nome, criado_em) VALUES (?, ?)
+            ''', (nome, time.strftime("%Y-%m-%dT%H:%M:%S")))
+            params = {"snapshot": self.cursor.lastrowid}
+            self.cursor.execute(f'''
+                INSERT INTO snapshot_salas (snapshot_id, codigo, sala)
+                SELECT :snapshot, codigo, sala FROM ({SNAPSHOT_SOURCES["salas"][None]})
+            ''', params)
+            self.cursor.execute(f'''
+                INSERT OR IGNORE INTO snapshot_patrimonios (snapshot_id, numero, sala, encontrado)
+                SELECT :snapshot, numero, sala, encontrado FROM ({SNAPSHOT_SOURCES["patrimonios"][None]})
+                ORDER BY encontrado DESC
+            ''', params)
+            self.cursor.execute(f'''
+                INSERT OR IGNORE INTO snapshot_nao_cadastrados (snapshot_id, numero, sala)
+                SELECT :snapshot, numero, sala FROM ({SNAPSHOT_SOURCES["nao_cadastrados"][None]})
+            ''', params)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return nome
+
+    def get_snapshots(self):
+        """Retorna os retratos (nome, criado_em, patrimônios, encontrados), do mais antigo ao mais novo."""
+        self.cursor.execute('''
+            SELECT s.nome, s.criado_em, COUNT(p.numero), COALESCE(SUM(p.encontrado), 0)
+            FROM snapshots s
+            LEFT JOIN snapshot_patrimonios p ON p.snapshot_id = s.id
+            GROUP BY s.id
+            ORDER BY s.id
+        ''')
         return self.cursor.fetchall()
 
+    def get_snapshot_id(self, nome):
+        """Retorna o id do retrato com o nome dado, ou None se não existir."""
+        self.cursor.execute("SELECT id FROM snapshots WHERE nome = ?", (nome,))
+        result = self.cursor.fetchone()
+        return result[0] if result else None
+
+    def delete_snapshot(self, nome):
+        """Apaga um retrato; retorna False se ele não existir."""
+        snapshot_id = self.get_snapshot_id(nome)
+        if snapshot_id is None:
+            return False
+        for table in ("snapshot_salas", "snapshot_patrimonios", "snapshot_nao_cadastrados"):
+            self.cursor.execute(f"DELETE FROM {table} WHERE snapshot_id = ?", (snapshot_id,))
+        self.cursor.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+        self.flush()
+        self.conn.commit()
+        return True
+
+    def iter_snapshot_delta(self, de, para=None):
+        """Itera sobre o que mudou entre dois retratos (ids), ou entre um retrato e o estado atual.
+
+        Gera (tipo, sala, numero, sala_anterior) ordenado por sala, com tipo
+        "encontrado" (não estava encontrado em de), "movido" (sala diferente da
+        que tinha em de) ou "nao_cadastrado" (leitura nova nessa sala). A comparação
+        é uma única consulta, que busca cada item de para pela chave do retrato de.
+        """
+        lado = "para" if para is not None else None
+        b = SNAPSHOT_SOURCES["patrimonios"][lado]
+        nb = SNAPSHOT_SOURCES["nao_cadastrados"][lado]
+        sb = SNAPSHOT_SOURCES["salas"][lado]
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT d.tipo, COALESCE(nova.sala, antiga.sala, ''), d.numero,
+                   COALESCE(anterior_nova.sala, anterior_antiga.sala, '')
+            FROM (
+                SELECT 'encontrado' AS tipo, b.sala, b.numero, a.sala AS sala_anterior
+                FROM ({b}) b
+                LEFT JOIN snapshot_patrimonios a ON a.snapshot_id = :de AND a.numero = b.numero
+                WHERE b.encontrado = 1 AND a.encontrado IS NOT 1
+                UNION ALL
+                SELECT 'movido', b.sala, b.numero, a.sala
+                FROM ({b}) b
+                JOIN snapshot_patrimonios a ON a.snapshot_id = :de AND a.numero = b.numero
+                WHERE b.sala IS NOT a.sala
+                UNION ALL
+                SELECT DISTINCT 'nao_cadastrado', nb.sala, nb.numero, NULL
+                FROM ({nb}) nb
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM snapshot_nao_cadastrados na
+                    WHERE na.snapshot_id = :de AND na.numero = nb.numero AND na.sala = nb.sala
+                )
+            ) d
+            LEFT JOIN ({sb}) nova ON nova.codigo = d.sala
+            LEFT JOIN snapshot_salas antiga ON antiga.snapshot_id = :de AND antiga.codigo = d.sala
+            LEFT JOIN ({sb}) anterior_nova ON anterior_nova.codigo = d.sala_anterior
+            LEFT JOIN snapshot_salas anterior_antiga
+                ON anterior_antiga.snapshot_id = :de AND anterior_antiga.codigo = d.sala_anterior
+            ORDER BY 2, d.tipo, d.numero
+        ''', {"de": de, "para": para})
+        return cursor
+
+instrumentation.register(DatabaseManager, "DatabaseManager")
+
+# Consultas com o estado do retrato :para ou, com a chave None, o estado atual, com as
+# colunas das tabelas snapshot_*: as salas são identificadas pelo código
+SNAPSHOT_SOURCES = {
+    "salas": {
+        None: "SELECT codigo, sala FROM salas",
+        "para": "SELECT codigo, sala FROM snapshot_salas WHERE snapshot_id = :para",
+    },
+    "patrimonios": {
+        None: '''SELECT p.numero, s.codigo AS sala, p.encontrado
+                 FROM patrimonios p LEFT JOIN salas s ON s.id = p.sala_id
+                 WHERE p.removido IS NOT 1''',
+        "para": "SELECT numero, sala, encontrado FROM snapshot_patrimonios WHERE snapshot_id = :para",
+    },
+    "nao_cadastrados": {
+        None: '''SELECT u.numero, s.codigo AS sala
+                 FROM patrimonios_nao_cadastrados u JOIN salas s ON s.id = u.sala_id''',
+        "para": "SELECT numero, sala FROM snapshot_nao_cadastrados WHERE snapshot_id = :para",
+    },
+}
+
+def get_data_dir():
+    """Retorna o diretório de dados apropriado com base no sistema operacional."""
+    if platform.system() == "Windows":
+        # Usar %APPDATA%\SUAP-CD no Windows
+        data_dir = Path(os.getenv("APPDATA")) / "SUAP-CD"
+    else:
+        # Usar /var/lib/suapcd no Linux
+        data_dir = Path("/var/lib/suapcd")
+
+    # Criar o diretório se não existir
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+def get_campus_registry():
+    """Retorna o registro dos bancos de cada campus no diretório de dados."""
+    return CampusRegistry(get_data_dir())
+
+def resolve_db_path(campus=None):
+    """Caminho do banco do campus indicado ou, sem campus, o do ativo (suap.db se não há campi)."""
+    registry = get_campus_registry()
+    if campus is None:
+        return registry.get_default_db_path()
+    if campus in registry.campi:
+        return registry.get_db_path(campus)
+    raise ValueError(f"Campus não registrado: {campus}")
+
+class CampiDatabase:
+    """Bancos de vários campi anexados (ATTACH) a uma conexão em memória, para relatórios conjuntos.
+
+    Os bancos são abertos somente para leitura e só enquanto o relatório é gerado;
+    o uso diário abre apenas o banco do campus ativo.
+    """
+
+    def __init__(self, campi):
+        """campi é um dicionário {nome: caminho do banco}."""
+        self.conn = sqlite3.connect(":memory:", uri=True)
+        self.cursor = self.conn.cursor()
+        limite = self.conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        if len(campi) > limite:
+            self.conn.close()
+            raise ValueError(f"O SQLite anexa no máximo {limite} bancos; há {len(campi)} campi")
+        self.schemas = {}  # nome -> esquema do banco anexado
+        for nome, db_path in campi.items():
+            schema = f"campus_{len(self.schemas)}"
+            self.cursor.execute(f"ATTACH DATABASE ? AS {schema}",
+                                (f"{Path(db_path).resolve().as_uri()}?mode=ro",))
+            self.schemas[nome] = schema
+
+    def iter_resumo(self):
+        """Gera (campus, salas, patrimônios, encontrados, divergentes, não cadastrados) de cada campus."""
+        for nome, schema in self.schemas.items():
+            self.cursor.execute(f'''
+                SELECT COUNT(*), COALESCE(SUM(total), 0), COALESCE(SUM(encontrados), 0),
+                       COALESCE(SUM(divergentes), 0), COALESCE(SUM(nao_cadastrados), 0)
+                FROM {schema}.salas_resumo
+            ''')
+            yield (nome, *self.cursor.fetchone())
+
+    def iter_cadastrados_em_outro_campus(self):
+        """Gera os não cadastrados de um campus que estão cadastrados em outro.
+
+        Cada linha tem (campus da leitura, sala da leitura, número, campus do
+        cadastro, sala atual no cadastro, descrição). A busca usa o índice de
+        patrimonios.numero de cada banco anexado.
+        """
+        for nome, schema in self.schemas.items():
+            for outro, outro_schema in self.schemas.items():
+                if outro == nome:
+                    continue
+                self.cursor.execute(f'''
+                    SELECT s.sala, u.numero, ps.sala, p.descricao
+                    FROM {schema}.patrimonios_nao_cadastrados u
+                    JOIN {schema}.salas s ON s.id = u.sala_id
+                    JOIN {outro_schema}.patrimonios p ON p.numero = u.numero AND p.removido IS NOT 1
+                    LEFT JOIN {outro_schema}.salas ps ON ps.id = p.sala_id
+                    ORDER BY s.sala, u.numero
+                ''')
+                for sala, numero, sala_cadastro, descricao in self.cursor.fetchall():
+                    yield nome, sala, numero, outro, sala_cadastro, descricao
+
+    def close(self):
+        self.conn.close()
+
+def create_numero_index(cursor):
+    """Cria o índice de patrimonios.numero, único quando não há números repetidos."""
+    cursor.execute('''
+        SELECT 1 FROM patrimonios
+        GROUP BY numero HAVING COUNT(*) > 1
+        LIMIT 1
+    ''')
+    unique = cursor.fetchone() is None
+    cursor.execute('''
+        SELECT sql FROM sqlite_master
+        WHERE type = 'index' AND name = 'idx_patrimonios_numero'
+    ''')
+    result = cursor.fetchone()
+    if result is not None:
+        if result[0].upper().startswith("CREATE UNIQUE") == unique:
+            return
+        cursor.execute("DROP INDEX idx_patrimonios_numero")
+    cursor.execute(f'''
+        CREATE {"UNIQUE " if unique else ""}INDEX idx_patrimonios_numero
+        ON patrimonios (numero)
+    ''')
+
+# Próximo valor de salas_resumo.alteracao (usa o índice; não percorre a tabela)
+RESUMO_PROXIMA_ALTERACAO = "(SELECT COALESCE(MAX(alteracao), 0) + 1 FROM salas_resumo)"
+
+def resumo_patrimonio_update(row, sign):
+    """Comando que soma (sign "+") ou subtrai (sign "-") um patrimônio do resumo da sua sala; removidos não contam."""
+    return f'''
+        UPDATE salas_resumo
+        SET total = total {sign} 1,
+            encontrados = encontrados {sign} ({row}.encontrado IS 1),
+            divergentes = divergentes {sign} ({row}.sala_id_original IS NOT NULL
+                                              AND {row}.sala_id_original IS NOT {row}.sala_id),
+            alteracao = {RESUMO_PROXIMA_ALTERACAO}
+        WHERE sala_id = {row}.sala_id AND {row}.removido IS NOT 1;
+    '''
+
+def resumo_nao_cadastrado_update(row, sign):
+    """Comando que soma ou subtrai um não cadastrado do resumo da sua sala."""
+    return f'''
+        UPDATE salas_resumo
+        SET nao_cadastrados = nao_cadastrados {sign} 1,
+            alteracao = {RESUMO_PROXIMA_ALTERACAO}
+        WHERE sala_id = {row}.sala_id;
+    '''
+
+RESUMO_TRIGGERS = {
+    "trg_salas_resumo_insert": f'''
+        AFTER INSERT ON salas
+        BEGIN
+            INSERT OR IGNORE INTO salas_resumo (sala_id, alteracao)
+            VALUES (NEW.id, {RESUMO_PROXIMA_ALTERACAO});
+        END
+    ''',
+    "trg_salas_resumo_delete": '''
+        AFTER DELETE ON salas
+        BEGIN
+            DELETE FROM salas_resumo WHERE sala_id = OLD.id;
+        END
+    ''',
+    "trg_patrimonios_resumo_insert": f'''
+        AFTER INSERT ON patrimonios
+        BEGIN
+            {resumo_patrimonio_update("NEW", "+")}
+        END
+    ''',
+    "trg_patrimonios_resumo_delete": f'''
+        AFTER DELETE ON patrimonios
+        BEGIN
+            {resumo_patrimonio_update("OLD", "-")}
+        END
+    ''',
+    "trg_patrimonios_resumo_update": f'''
+        AFTER UPDATE OF sala_id, encontrado, sala_id_original, removido ON patrimonios
+        WHEN OLD.sala_id IS NOT NEW.sala_id OR OLD.encontrado IS NOT NEW.encontrado
+             OR OLD.sala_id_original IS NOT NEW.sala_id_original OR OLD.removido IS NOT NEW.removido
+        BEGIN
+            {resumo_patrimonio_update("OLD", "-")}
+            {resumo_patrimonio_update("NEW", "+")}
+        END
+    ''',
+    "trg_nao_cadastrados_resumo_insert": f'''
+        AFTER INSERT ON patrimonios_nao_cadastrados
+        BEGIN
+            {resumo_nao_cadastrado_update("NEW", "+")}
+        END
+    ''',
+    "trg_nao_cadastrados_resumo_delete": f'''
+        AFTER DELETE ON patrimonios_nao_cadastrados
+        BEGIN
+            {resumo_nao_cadastrado_update("OLD", "-")}
+        END
+    ''',
+}
+
+def create_resumo_triggers(cursor):
+    """Cria os gatilhos que mantêm salas_resumo a cada alteração de salas e patrimônios."""
+    for name, body in RESUMO_TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+def drop_resumo_triggers(cursor):
+    """Remove os gatilhos de salas_resumo, para cargas em lote seguidas de rebuild_salas_resumo."""
+    for name in RESUMO_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+def rebuild_salas_resumo(cursor):
+    """Recalcula salas_resumo a partir de patrimonios e patrimonios_nao_cadastrados."""
+    cursor.execute(f"SELECT {RESUMO_PROXIMA_ALTERACAO}")
+    alteracao = cursor.fetchone()[0]
+    cursor.execute("DELETE FROM salas_resumo")
+    cursor.execute('''
+        INSERT INTO salas_resumo (sala_id, total, encontrados, divergentes, nao_cadastrados, alteracao)
+        SELECT s.id, COALESCE(p.total, 0), COALESCE(p.encontrados, 0),
+               COALESCE(p.divergentes, 0), COALESCE(u.total, 0), ?
+        FROM salas s
+        LEFT JOIN (
+            SELECT sala_id, COUNT(*) AS total, SUM(encontrado IS 1) AS encontrados,
+                   SUM(sala_id_original IS NOT NULL AND sala_id_original IS NOT sala_id) AS divergentes
+            FROM patrimonios
+            WHERE removido IS NOT 1
+            GROUP BY sala_id
+        ) p ON p.sala_id = s.id
+        LEFT JOIN (
+            SELECT sala_id, COUNT(*) AS total
+            FROM patrimonios_nao_cadastrados
+            GROUP BY sala_id
+        ) u ON u.sala_id = s.id
+    ''', (alteracao,))
+
+# Colunas de patrimonios no índice de texto e seu peso na ordenação por relevância (bm25)
+BUSCA_COLUMNS = {
+    "numero": 10.0,
+    "descricao": 2.0,
+    "numero_de_serie": 5.0,
+    "rotulos": 1.0,
+    "fornecedor": 0.5,
+}
+
+# Quantidade máxima de resultados de search_patrimonios
+BUSCA_LIMIT = 200
+
+def busca_values(row):
+    return ", ".join(f"{row}.{col}" for col in BUSCA_COLUMNS)
+
+# Escaneamentos só alteram sala_id e encontrado, que não estão no índice: não disparam os gatilhos
+BUSCA_TRIGGERS = {
+    "trg_patrimonios_busca_insert": f'''
+        AFTER INSERT ON patrimonios
+        BEGIN
+            INSERT INTO patrimonios_busca (rowid, {", ".join(BUSCA_COLUMNS)})
+            VALUES (NEW.id, {busca_values("NEW")});
+        END
+    ''',
+    "trg_patrimonios_busca_delete": f'''
+        AFTER DELETE ON patrimonios
+        BEGIN
+            INSERT INTO patrimonios_busca (patrimonios_busca, rowid, {", ".join(BUSCA_COLUMNS)})
+            VALUES ('delete', OLD.id, {busca_values("OLD")});
+        END
+    ''',
+    "trg_patrimonios_busca_update": f'''
+        AFTER UPDATE OF {", ".join(BUSCA_COLUMNS)} ON patrimonios
+        BEGIN
+            INSERT INTO patrimonios_busca (patrimonios_busca, rowid, {", ".join(BUSCA_COLUMNS)})
+            VALUES ('delete', OLD.id, {busca_values("OLD")});
+            INSERT INTO patrimonios_busca (rowid, {", ".join(BUSCA_COLUMNS)})
+            VALUES (NEW.id, {busca_values("NEW")});
+        END
+    ''',
+}
+
+def busca_exists(cursor):
+    """Indica se o índice de texto da busca de patrimônios existe no banco."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'patrimonios_busca'")
+    return cursor.fetchone() is not None
+
+def create_busca_index(cursor):
+    """Cria a tabela FTS5 da busca; falha com OperationalError se o SQLite não tiver FTS5."""
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS patrimonios_busca USING fts5(
+            {", ".join(BUSCA_COLUMNS)},
+            content = 'patrimonios', content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    ''')
+    # A ordem por rank usa o bm25 com os pesos de BUSCA_COLUMNS
+    cursor.execute(f'''
+        INSERT INTO patrimonios_busca (patrimonios_busca, rank)
+        VALUES ('rank', 'bm25({", ".join(str(peso) for peso in BUSCA_COLUMNS.values())})')
+    ''')
+
+def create_busca_triggers(cursor):
+    """Cria os gatilhos que mantêm o índice de texto a cada alteração de patrimonios."""
+    for name, body in BUSCA_TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+def drop_busca_triggers(cursor):
+    """Remove os gatilhos do índice de texto, para cargas em lote seguidas de rebuild_busca_index."""
+    for name in BUSCA_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+def rebuild_busca_index(cursor):
+    """Refaz o índice de texto a partir de todo o conteúdo de patrimonios."""
+    cursor.execute("INSERT INTO patrimonios_busca (patrimonios_busca) VALUES ('rebuild')")
+
+def busca_query(texto):
+    """Converte o texto digitado numa consulta FTS5: todas as palavras, cada uma como prefixo."""
+    palavras = re.findall(r"\w+", texto or "")
+    if not palavras:
+        return None
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
 def generate_unique_code(sala_text, existing_codes=None):
     """Gera um código único baseado no hash MD5 do texto da sala."""
     if not sala_text:
@@ -194,88 +1202,516 @@ def generate_unique_code(sala_text, existing_codes=None):
         return code
     raise ValueError(f"Colisão de hash MD5 para a sala: {sala_text}")
 
-def load_data_from_file(cursor, conn, file_path):
-    """Zera as tabelas, processa o CSV em memória e grava salas e patrimônios no banco."""
-    cursor.execute("DELETE FROM patrimonios")
-    cursor.execute("DELETE FROM patrimonios_nao_cadastrados")
-    cursor.execute("DELETE FROM salas")
-    conn.commit()
+EXPECTED_COLUMNS = [
+    '#', 'NUMERO', 'STATUS', 'ED', 'DESCRICAO', 'RÓTULOS',
+    'CARGA ATUAL', 'SETOR DO RESPONSÁVEL', 'CAMPUS DA CARGA',
+    'VALOR AQUISIÇÃO', 'VALOR DEPRECIADO', 'NUMERO NOTA FISCAL',
+    'NÚMERO DE SÉRIE', 'DATA DA ENTRADA', 'DATA DA CARGA',
+    'FORNECEDOR', 'SALA', 'ESTADO DE CONSERVAÇÃO'
+]
+
+# Quantidade de linhas enviadas ao SQLite por executemany durante a importação
+IMPORT_BATCH_SIZE = 5000
 
+def parse_patrimonio_row(row):
+    """Converte uma linha do CSV do SUAP em (nome da sala, valores do patrimônio)."""
+    sala_text = row['SALA'].upper() if row['SALA'] and row['SALA'].strip() else None
+    return sala_text, (
+        row['NUMERO'],
+        row['STATUS'] or None,
+        row['ED'] or None,
+        row['DESCRICAO'] or None,
+        row['RÓTULOS'] or None,
+        row['CARGA ATUAL'] or None,
+        row['SETOR DO RESPONSÁVEL'] or None,
+        row['CAMPUS DA CARGA'].lower() if row['CAMPUS DA CARGA'] else None,
+        float(row['VALOR AQUISIÇÃO']) if row['VALOR AQUISIÇÃO'] else None,
+        float(row['VALOR DEPRECIADO']) if row['VALOR DEPRECIADO'] else None,
+        row['NUMERO NOTA FISCAL'] or None,
+        row['NÚMERO DE SÉRIE'] or None,
+        row['DATA DA ENTRADA'] or None,
+        row['DATA DA CARGA'] or None,
+        row['FORNECEDOR'] or None,
+        row['ESTADO DE CONSERVAÇÃO'] or None,
+    )
+
+def insert_patrimonios(cursor, batch):
+    """Insere um lote de patrimônios (valores de parse_patrimonio_row, sala_id e sala_id_original)."""
+    cursor.executemany('''
+        INSERT INTO patrimonios (
+            numero, status, ed, descricao, rotulos, carga_atual,
+            setor_responsavel, campus_carga, valor_aquisicao,
+            valor_depreciado, numero_nota_fiscal, numero_de_serie,
+            data_da_entrada, data_da_carga, fornecedor,
+            estado_de_conservacao, sala_id, sala_id_original
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', batch)
+
+def get_peak_memory_mb():
+    """Retorna o pico de memória residente do processo em MB, ou None se indisponível."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é informado em bytes no macOS e em KB no Linux
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+def set_import_pragmas(cursor):
+    """Ajusta o SQLite para carga em massa e retorna os valores anteriores."""
+    cursor.execute("PRAGMA synchronous")
+    synchronous = cursor.fetchone()[0]
+    cursor.execute("PRAGMA cache_size")
+    cache_size = cursor.fetchone()[0]
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA cache_size = -65536")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    return synchronous, cache_size
+
+def restore_pragmas(cursor, previous):
+    """Restaura os valores retornados por set_import_pragmas."""
+    synchronous, cache_size = previous
+    cursor.execute(f"PRAGMA synchronous = {int(synchronous)}")
+    cursor.execute(f"PRAGMA cache_size = {int(cache_size)}")
+    cursor.execute("PRAGMA temp_store = DEFAULT")
+
+def print_import_stats(start, total):
+    """Exibe o tempo, a taxa de importação e o pico de memória."""
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Tempo de importação: {elapsed:.2f} s ({rate:.0f} itens/s)")
+    peak = get_peak_memory_mb()
+    if peak is not None:
+        print(f"Pico de memória: {peak:.1f} MB")
+
+def filter_campus_rows(reader, campus_carga):
+    """Gera as linhas do CSV cujo CAMPUS DA CARGA é campus_carga (todas, se for None)."""
+    if campus_carga is None:
+        yield from reader
+        return
+    campus_carga = campus_carga.strip().lower()
+    for row in reader:
+        if (row['CAMPUS DA CARGA'] or "").strip().lower() == campus_carga:
+            yield row
+
+def list_campus_carga(file_path):
+    """Retorna {CAMPUS DA CARGA: quantidade de itens} de um CSV do SUAP, ou None se o arquivo for inválido.
+
+    Os itens sem CAMPUS DA CARGA são contados na chave "".
+    """
     try:
         with open(file_path, newline='', encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
-            expected_columns = [
-                '#', 'NUMERO', 'STATUS', 'ED', 'DESCRICAO', 'RÓTULOS',
-                'CARGA ATUAL', 'SETOR DO RESPONSÁVEL', 'CAMPUS DA CARGA',
-                'VALOR AQUISIÇÃO', 'VALOR DEPRECIADO', 'NUMERO NOTA FISCAL',
-                'NÚMERO DE SÉRIE', 'DATA DA ENTRADA', 'DATA DA CARGA',
-                'FORNECEDOR', 'SALA', 'ESTADO DE CONSERVAÇÃO'
-            ]
-            if reader.fieldnames != expected_columns:
-                print(f"Erro: O arquivo CSV deve ter exatamente as colunas: {expected_columns}")
-                return
-
-            salas_unicas = set(row['SALA'].upper() for row in reader if row['SALA'] and row['SALA'].strip())
-            sala_data = []
-            existing_codes = set()
-            sala_to_id = {}
-            next_id = 1
-            for sala in salas_unicas:
-                codigo = generate_unique_code(sala, existing_codes)
-                existing_codes.add(codigo)
-                sala_data.append({'id': next_id, 'sala': sala, 'codigo': codigo})
-                sala_to_id[sala] = next_id
-                next_id += 1
-
-            patrimonios_data = []
-            csvfile.seek(0)
-            next(reader)
+            if reader.fieldnames != EXPECTED_COLUMNS:
+                print(f"Erro: O arquivo CSV deve ter exatamente as colunas: {EXPECTED_COLUMNS}")
+                return None
+            campi = {}
             for row in reader:
-                campus_carga = row['CAMPUS DA CARGA'].lower() if row['CAMPUS DA CARGA'] else None
-                sala_text = row['SALA'].upper() if row['SALA'] and row['SALA'].strip() else None
-                sala_id = sala_to_id.get(sala_text, None)
-                patrimonios_data.append((
-                    row['NUMERO'],
-                    row['STATUS'] or None,
-                    row['ED'] or None,
-                    row['DESCRICAO'] or None,
-                    row['RÓTULOS'] or None,
-                    row['CARGA ATUAL'] or None,
-                    row['SETOR DO RESPONSÁVEL'] or None,
-                    campus_carga,
-                    float(row['VALOR AQUISIÇÃO']) if row['VALOR AQUISIÇÃO'] else None,
-                    float(row['VALOR DEPRECIADO']) if row['VALOR DEPRECIADO'] else None,
-                    row['NUMERO NOTA FISCAL'] or None,
-                    row['NÚMERO DE SÉRIE'] or None,
-                    row['DATA DA ENTRADA'] or None,
-                    row['DATA DA CARGA'] or None,
-                    row['FORNECEDOR'] or None,
-                    sala_id,
-                    row['ESTADO DE CONSERVAÇÃO'] or None,
-                    0,
-                    sala_id
-                ))
-
-            for sala in sala_data:
-                cursor.execute('''
-                    INSERT INTO salas (id, sala, codigo)
-                    VALUES (?, ?, ?)
-                ''', (sala['id'], sala['sala'], sala['codigo']))
-
-            cursor.executemany('''
-                INSERT INTO patrimonios (
-                    numero, status, ed, descricao, rotulos, carga_atual,
-                    setor_responsavel, campus_carga, valor_aquisicao,
-                    valor_depreciado, numero_nota_fiscal, numero_de_serie,
-                    data_da_entrada, data_da_carga, fornecedor, sala_id,
-                    estado_de_conservacao, encontrado, sala_id_original
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', patrimonios_data)
+                campus = (row['CAMPUS DA CARGA'] or "").strip()
+                campi[campus] = campi.get(campus, 0) + 1
+            return campi
+    except Exception as e:
+        print(f"Erro ao ler o arquivo: {e}")
+        return None
+
+def load_data_from_file(cursor, conn, file_path, campus_carga=None):
+    """Zera as tabelas e importa o CSV em uma única leitura, gravando em lotes numa só transação.
+
+    Com campus_carga, importa somente os itens desse CAMPUS DA CARGA.
+    """
+    start = time.perf_counter()
+    try:
+        with open(file_path, newline='', encoding='utf-8') as csvfile:
+            reader = csv.DictReader(csvfile)
+            if reader.fieldnames != EXPECTED_COLUMNS:
+                print(f"Erro: O arquivo CSV deve ter exatamente as colunas: {EXPECTED_COLUMNS}")
+                return None
 
             conn.commit()
-            print(f"Dados carregados com sucesso de {file_path}")
-            print(f"Itens importados: {len(patrimonios_data)}")
-            print(f"Salas importadas: {len(sala_data)}")
+            previous_pragmas = set_import_pragmas(cursor)
+            try:
+                # O resumo por sala é refeito de uma vez no final, sem os gatilhos por linha;
+                # rebuild_salas_resumo continua a contagem de alteracao, que nunca volta atrás
+                drop_resumo_triggers(cursor)
+                # O índice de texto também é refeito de uma vez no final
+                busca = busca_exists(cursor)
+                drop_busca_triggers(cursor)
+                cursor.execute("DELETE FROM patrimonios")
+                cursor.execute("DELETE FROM patrimonios_nao_cadastrados")
+                cursor.execute("DELETE FROM salas")
+                # Sem checkpoint, o próximo DatabaseManager arquiva o diário e começa outro
+                cursor.execute("DELETE FROM diario_leituras")
+                # O índice é recriado após a carga, conforme haja ou não números repetidos
+                cursor.execute("DROP INDEX IF EXISTS idx_patrimonios_numero")
+
+                existing_codes = set()
+                sala_to_id = {}
+                batch = []
+                total = 0
+                for row in filter_campus_rows(reader, campus_carga):
+                    sala_text, valores = parse_patrimonio_row(row)
+                    sala_id = None
+                    if sala_text is not None:
+                        sala_id = sala_to_id.get(sala_text)
+                        if sala_id is None:
+                            # Sala vista pela primeira vez: recebe o próximo id
+                            codigo = generate_unique_code(sala_text, existing_codes)
+                            existing_codes.add(codigo)
+                            sala_id = len(sala_to_id) + 1
+                            sala_to_id[sala_text] = sala_id
+                            cursor.execute('''
+                                INSERT INTO salas (id, sala, codigo)
+                                VALUES (?, ?, ?)
+                            ''', (sala_id, sala_text, codigo))
+                    batch.append((*valores, sala_id, sala_id))
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        insert_patrimonios(cursor, batch)
+                        total += len(batch)
+                        batch = []
+                if batch:
+                    insert_patrimonios(cursor, batch)
+                    total += len(batch)
+
+                create_numero_index(cursor)
+                rebuild_salas_resumo(cursor)
+                create_resumo_triggers(cursor)
+                if busca:
+                    rebuild_busca_index(cursor)
+                    create_busca_triggers(cursor)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                restore_pragmas(cursor, previous_pragmas)
+
+        print(f"Dados carregados com sucesso de {file_path}")
+        print(f"Itens importados: {total}")
+        print(f"Salas importadas: {len(sala_to_id)}")
+        print_import_stats(start, total)
+        return total
+    except Exception as e:
+        print(f"Erro ao carregar o arquivo: {e}")
+        return None
+
+# Colunas de patrimonios preenchidas a partir do CSV, na ordem de parse_patrimonio_row
+PATRIMONIO_CSV_FIELDS = [
+    'numero', 'status', 'ed', 'descricao', 'rotulos', 'carga_atual',
+    'setor_responsavel', 'campus_carga', 'valor_aquisicao',
+    'valor_depreciado', 'numero_nota_fiscal', 'numero_de_serie',
+    'data_da_entrada', 'data_da_carga', 'fornecedor',
+    'estado_de_conservacao'
+]
+
+def update_data_from_file(cursor, conn, file_path, campus_carga=None):
+    """Atualiza o banco a partir de um CSV mais novo sem perder as leituras já feitas.
+
+    Os patrimônios são comparados pelo NUMERO e as salas pelo nome: itens novos
+    são inseridos, itens com atributos alterados são atualizados e itens ausentes
+    do arquivo são marcados como removidos. Os campos encontrado e sala_id dos
+    itens já lidos são preservados, e somente as linhas alteradas são gravadas.
+    Com campus_carga, considera somente os itens desse CAMPUS DA CARGA.
+    """
+    start = time.perf_counter()
+    attributes = PATRIMONIO_CSV_FIELDS[1:]
+    try:
+        with open(file_path, newline='', encoding='utf-8') as csvfile:
+            reader = csv.DictReader(csvfile)
+            if reader.fieldnames != EXPECTED_COLUMNS:
+                print(f"Erro: O arquivo CSV deve ter exatamente as colunas: {EXPECTED_COLUMNS}")
+                return None
+
+            conn.commit()
+            previous_pragmas = set_import_pragmas(cursor)
+            # A tabela temporária tem o tamanho do arquivo; mantê-la em disco limita a memória
+            cursor.execute("PRAGMA temp_store = FILE")
+            try:
+                cursor.execute(f'''
+                    CREATE TEMP TABLE importacao (
+                        numero TEXT PRIMARY KEY,
+                        {", ".join(attributes)},
+                        sala TEXT,
+                        sala_id INTEGER
+                    )
+                ''')
+                insert_sql = f'''
+                    INSERT OR REPLACE INTO importacao ({", ".join(PATRIMONIO_CSV_FIELDS)}, sala)
+                    VALUES ({", ".join("?" * (len(PATRIMONIO_CSV_FIELDS) + 1))})
+                '''
+                batch = []
+                total = 0
+                for row in filter_campus_rows(reader, campus_carga):
+                    sala_text, valores = parse_patrimonio_row(row)
+                    batch.append((*valores, sala_text))
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        cursor.executemany(insert_sql, batch)
+                        total += len(batch)
+                        batch = []
+                if batch:
+                    cursor.executemany(insert_sql, batch)
+                    total += len(batch)
+
+                # Salas novas recebem código da mesma forma que na carga completa
+                cursor.execute("SELECT codigo FROM salas")
+                existing_codes = set(codigo for codigo, in cursor.fetchall())
+                cursor.execute('''
+                    SELECT DISTINCT sala FROM importacao
+                    WHERE sala IS NOT NULL AND sala NOT IN (SELECT sala FROM salas)
+                ''')
+                novas_salas = []
+                for sala, in cursor.fetchall():
+                    codigo = generate_unique_code(sala, existing_codes)
+                    existing_codes.add(codigo)
+                    novas_salas.append((sala, codigo))
+                cursor.executemany("INSERT INTO salas (sala, codigo) VALUES (?, ?)", novas_salas)
+                cursor.execute('''
+                    UPDATE importacao
+                    SET sala_id = (SELECT s.id FROM salas s WHERE s.sala = importacao.sala)
+                    WHERE sala IS NOT NULL
+                ''')
+
+                # Itens alterados: a sala atual só acompanha a do SUAP se ainda não foi lido
+                changed = " OR ".join(f"patrimonios.{col} IS NOT i.{col}" for col in attributes)
+                cursor.execute(f'''
+                    UPDATE patrimonios
+                    SET ({", ".join(attributes)}, sala_id, sala_id_original, removido) = (
+                        SELECT {", ".join(f"i.{col}" for col in attributes)},
+                               CASE WHEN patrimonios.encontrado = 1 THEN patrimonios.sala_id ELSE i.sala_id END,
+                               i.sala_id, 0
+                        FROM importacao i WHERE i.numero = patrimonios.numero
+                    )
+                    WHERE EXISTS (
+                        SELECT 1 FROM importacao i
+                        WHERE i.numero = patrimonios.numero
+                          AND ({changed} OR patrimonios.sala_id_original IS NOT i.sala_id
+                               OR patrimonios.removido = 1)
+                    )
+                ''')
+                atualizados = cursor.rowcount
+
+                # Inserções não disparam os gatilhos de versão; as salas que recebem itens novos
+                # são marcadas aqui
+                cursor.execute('''
+                    UPDATE salas SET versao = versao + 1
+                    WHERE id IN (
+                        SELECT i.sala_id FROM importacao i
+                        WHERE NOT EXISTS (SELECT 1 FROM patrimonios p WHERE p.numero = i.numero)
+                    )
+                ''')
+                cursor.execute(f'''
+                    INSERT INTO patrimonios ({", ".join(PATRIMONIO_CSV_FIELDS)}, sala_id, sala_id_original)
+                    SELECT {", ".join(f"i.{col}" for col in PATRIMONIO_CSV_FIELDS)}, i.sala_id, i.sala_id
+                    FROM importacao i
+                    WHERE NOT EXISTS (SELECT 1 FROM patrimonios p WHERE p.numero = i.numero)
+                ''')
+                inseridos = cursor.rowcount
+
+                cursor.execute('''
+                    UPDATE patrimonios
+                    SET removido = 1
+                    WHERE removido = 0
+                      AND NOT EXISTS (SELECT 1 FROM importacao i WHERE i.numero = patrimonios.numero)
+                ''')
+                removidos = cursor.rowcount
+
+                cursor.execute("DROP TABLE importacao")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                cursor.execute("DROP TABLE IF EXISTS temp.importacao")
+                raise
+            finally:
+                restore_pragmas(cursor, previous_pragmas)
+
+        print(f"Dados atualizados com sucesso de {file_path}")
+        print(f"Itens no arquivo: {total}")
+        print(f"Itens novos: {inseridos}")
+        print(f"Itens alterados: {atualizados}")
+        print(f"Itens removidos: {removidos}")
+        print(f"Salas novas: {len(novas_salas)}")
+        print_import_stats(start, total)
+        return total
+    except Exception as e:
+        print(f"Erro ao atualizar a partir do arquivo: {e}")
+        return None
+
+# Prefixo da linha que indica a sala das leituras seguintes num arquivo de leituras
+SCAN_LOG_SALA_PREFIX = "SALA:"
+
+def resolve_sala(cursor, sala):
+    """Retorna o id da sala pelo código ou pelo nome, ou None se não existir."""
+    cursor.execute('''
+        SELECT id FROM salas WHERE codigo = ? OR sala = ?
+    ''', (sala.strip().lower(), sala.strip().upper()))
+    result = cursor.fetchone()
+    return result[0] if result else None
+
+# Soma leituras de não cadastrados à linha do número na sala, criando-a na primeira;
+# source fornece (numero, sala_id, quantidade, primeira_leitura, ultima_leitura)
+UPSERT_NAO_CADASTRADO = '''
+    INSERT INTO patrimonios_nao_cadastrados (numero, sala_id, quantidade, primeira_leitura, ultima_leitura)
+    {source}
+    ON CONFLICT (numero, sala_id) DO UPDATE SET
+        quantidade = quantidade + excluded.quantidade,
+        primeira_leitura = COALESCE(MIN(primeira_leitura, excluded.primeira_leitura),
+                                    primeira_leitura, excluded.primeira_leitura),
+        ultima_leitura = COALESCE(MAX(ultima_leitura, excluded.ultima_leitura),
+                                  ultima_leitura, excluded.ultima_leitura)
+'''
+
+def delete_unfound_patrimonio(cursor, numero, sala_id):
+    """Desconta uma leitura não cadastrada de um número na sala, removendo a linha na última.
+
+    Retorna True se havia uma leitura a descontar.
+    """
+    cursor.execute('''
+        UPDATE patrimonios_nao_cadastrados SET quantidade = quantidade - 1
+        WHERE numero = ? AND sala_id = ? AND quantidade > 1
+    ''', (numero, sala_id))
+    if cursor.rowcount > 0:
+        return True
+    cursor.execute('''
+        DELETE FROM patrimonios_nao_cadastrados WHERE numero = ? AND sala_id = ?
+    ''', (numero, sala_id))
+    return cursor.rowcount > 0
+
+def apply_scans(cursor, scans, journal=None, lida_em=None):
+    """Aplica em lote as leituras (numero, sala_id, data e hora), na ordem, como a tela de escaneamento faria.
+
+    Cada patrimônio fica na sala da sua última leitura e as leituras de números
+    desconhecidos são somadas aos não cadastrados de cada sala. Leituras sem data
+    e hora recebem lida_em. Com journal, as leituras são acrescentadas ao diário
+    com o resultado obtido. Não faz commit; retorna (leituras, patrimônios
+    encontrados, não cadastrados registrados ou somados por número e sala).
+    """
+    cursor.execute('''
+        CREATE TEMP TABLE leituras (
+            seq INTEGER PRIMARY KEY,
+            numero TEXT NOT NULL,
+            sala_id INTEGER NOT NULL,
+            lida_em TEXT
+        )
+    ''')
+    try:
+        total = 0
+        batch = []
+        for scan in scans:
+            batch.append(scan)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                cursor.executemany("INSERT INTO leituras (numero, sala_id, lida_em) VALUES (?, ?, COALESCE(?, ?))",
+                                   [scan + (lida_em,) for scan in batch])
+                total += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany("INSERT INTO leituras (numero, sala_id, lida_em) VALUES (?, ?, COALESCE(?, ?))",
+                               [scan + (lida_em,) for scan in batch])
+            total += len(batch)
+
+        # Cada patrimônio vai para a sala da sua última leitura
+        cursor.execute("CREATE TEMP TABLE ultimas_leituras (numero TEXT PRIMARY KEY, sala_id INTEGER NOT NULL)")
+        cursor.execute('''
+            INSERT INTO ultimas_leituras
+            SELECT numero, sala_id FROM leituras
+            WHERE seq IN (SELECT MAX(seq) FROM leituras GROUP BY numero)
+        ''')
+        cursor.execute('''
+            UPDATE patrimonios
+            SET sala_id = (SELECT u.sala_id FROM ultimas_leituras u WHERE u.numero = patrimonios.numero),
+                encontrado = 1,
+                sala_id_original = COALESCE(sala_id_original, sala_id)
+            WHERE numero IN (SELECT numero FROM ultimas_leituras) AND removido IS NOT 1
+        ''')
+        encontrados = cursor.rowcount
+
+        cursor.execute(UPSERT_NAO_CADASTRADO.format(source='''
+            SELECT l.numero, l.sala_id, COUNT(*), MIN(l.lida_em), MAX(l.lida_em) FROM leituras l
+            WHERE NOT EXISTS (SELECT 1 FROM patrimonios p WHERE p.numero = l.numero AND p.removido IS NOT 1)
+            GROUP BY l.numero, l.sala_id
+            ORDER BY MIN(l.seq)
+        '''))
+        nao_cadastrados = cursor.rowcount
+
+        if journal is not None:
+            cursor.execute('''
+                SELECT s.codigo, l.numero, l.lida_em,
+                       EXISTS (SELECT 1 FROM patrimonios p WHERE p.numero = l.numero AND p.removido IS NOT 1)
+                FROM leituras l
+                JOIN salas s ON s.id = l.sala_id
+                ORDER BY l.seq
+            ''')
+            for codigo, numero, timestamp, cadastrado in cursor.fetchall():
+                journal.append(codigo, numero, ENCONTRADO if cadastrado else NAO_CADASTRADO,
+                               timestamp=timestamp or "")
+        return total, encontrados, nao_cadastrados
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS temp.ultimas_leituras")
+        cursor.execute("DROP TABLE IF EXISTS temp.leituras")
+
+def iter_scan_logs(cursor, file_paths, ignoradas):
+    """Gera (numero, sala_id, None) das linhas dos arquivos de leituras, que não têm data e hora.
+
+    Leituras de salas inexistentes são descartadas e contadas em ignoradas ({sala: quantidade}).
+    """
+    sala_ids = {}
+    for file_path in file_paths:
+        sala = Path(file_path).stem
+        with open(file_path, encoding='utf-8') as logfile:
+            for line in logfile:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.upper().startswith(SCAN_LOG_SALA_PREFIX):
+                    sala = line[len(SCAN_LOG_SALA_PREFIX):].strip()
+                    continue
+                if sala not in sala_ids:
+                    sala_ids[sala] = resolve_sala(cursor, sala)
+                sala_id = sala_ids[sala]
+                if sala_id is None:
+                    ignoradas[sala] = ignoradas.get(sala, 0) + 1
+                    continue
+                yield line, sala_id, None
+
+def ingest_scan_logs(cursor, conn, file_paths, journal=None):
+    """Importa arquivos de leituras gravados pelas pistolas, com um número por linha.
+
+    Uma linha "SALA: <código ou nome>" define a sala das leituras seguintes; sem ela,
+    vale o nome do arquivo (sem extensão). As leituras são aplicadas como se
+    tivessem sido feitas na tela de escaneamento, na ordem dos arquivos: cada
+    patrimônio fica na sala da sua última leitura e os números desconhecidos são
+    registrados como não cadastrados. Com journal, as leituras entram no diário e,
+    se a importação falhar, saem dele junto com o rollback.
+    """
+    start = time.perf_counter()
+    conn.commit()
+    previous_pragmas = set_import_pragmas(cursor)
+    ignoradas = {}
+    journal_position = journal.position if journal is not None else None
+    try:
+        total, encontrados, nao_cadastrados = apply_scans(
+            cursor, iter_scan_logs(cursor, file_paths, ignoradas), journal,
+            lida_em=time.strftime(TIMESTAMP_FORMAT))
+        if journal is not None:
+            journal.sync()
+            journal.checkpoint(cursor)
+        conn.commit()
     except Exception as e:
-        print(f"Erro ao carregar o arquivo: {e}")
\ No newline at end of file
+        conn.rollback()
+        if journal is not None:
+            # Sem isso, a próxima inicialização reaplicaria as leituras desfeitas
+            journal.truncate(journal_position)
+        print(f"Erro ao importar leituras: {e}")
+        return None
+    finally:
+        restore_pragmas(cursor, previous_pragmas)
+
+    elapsed = time.perf_counter() - start
+    print(f"Arquivos de leituras importados: {len(file_paths)}")
+    print(f"Leituras aplicadas: {total}")
+    print(f"Patrimônios encontrados: {encontrados}")
+    print(f"Não cadastrados (por sala): {nao_cadastrados}")
+    if ignoradas:
+        print(f"Leituras ignoradas (sala desconhecida): {sum(ignoradas.values())} em {', '.join(sorted(ignoradas))}")
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Tempo: {elapsed:.2f} s ({rate:.0f} leituras/s)")
+    return total
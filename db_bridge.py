@@ -0,0 +1,40 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class DatabaseBridge(QObject):
+    """Entrega na thread da interface os resultados do DatabaseWorker.
+
+    As chamadas retornam imediatamente; callback(resultado) é executado depois,
+    pelo laço de eventos do Qt, e a interface nunca espera pelo SQLite.
+    """
+
+    completed = pyqtSignal(object, object, object)  # callback, resultado, erro
+
+    def __init__(self, worker, parent=None):
+        super().__init__(parent)
+        self.worker = worker
+        self.db_path = worker.db_path
+        self.commit_interval = worker.commit_interval
+        self.completed.connect(self.dispatch)
+
+    def call(self, method, *args, callback=None):
+        """Executa o método na thread de escrita do DatabaseWorker."""
+        self.watch(self.worker.submit(method, *args), callback)
+
+    def read(self, method, *args, callback=None):
+        """Executa o método numa das conexões somente leitura do DatabaseWorker."""
+        self.watch(self.worker.submit_read(method, *args), callback)
+
+    def watch(self, future, callback):
+        # O sinal é emitido na thread do banco e entregue na thread da interface
+        future.add_done_callback(
+            lambda f: self.completed.emit(callback, None if f.exception() else f.result(),
+                                          f.exception()))
+
+    def dispatch(self, callback, result, error):
+        if error is not None:
+            print(f"Erro no banco de dados: {error}")
+        elif callback is not None:
+            callback(result)
+
+    def close(self):
+        self.worker.close()
@@ -0,0 +1,103 @@
+import queue
+import threading
+from concurrent.futures import Future
+from database import DatabaseManager, DEFAULT_COMMIT_INTERVAL, DEFAULT_COMMIT_BATCH
+
+# Conexões somente leitura disponíveis para consultas em paralelo
+DEFAULT_READERS = 2
+
+class DatabaseWorker:
+    """Executa os métodos do DatabaseManager fora da thread da interface.
+
+    Uma única thread de escrita é dona da conexão principal e atende, em ordem,
+    as operações enviadas por submit (escaneamentos e leituras que precisam ver as
+    gravações ainda pendentes do grupo de commit). Um pequeno conjunto de threads
+    com conexões somente leitura atende submit_read. Os dois retornam um
+    concurrent.futures.Future com o resultado do método chamado.
+    """
+
+    def __init__(self, db_path=None, readers=DEFAULT_READERS,
+                 commit_interval=DEFAULT_COMMIT_INTERVAL, commit_batch=DEFAULT_COMMIT_BATCH):
+        self.write_queue = queue.Queue()
+        self.read_queue = queue.Queue()
+        self.threads = []
+
+        ready = Future()
+        writer = threading.Thread(
+            target=self.run_writer, name="suapcd-db-writer", daemon=True,
+            args=(ready, db_path, commit_interval, commit_batch))
+        writer.start()
+        self.threads.append(writer)
+        # O escritor cria o esquema; os leitores só abrem o banco depois disso
+        self.db_path, self.commit_interval = ready.result()
+
+        self.reader_count = readers
+        for index in range(readers):
+            reader = threading.Thread(target=self.run_reader, name=f"suapcd-db-reader-{index}",
+                                      daemon=True)
+            reader.start()
+            self.threads.append(reader)
+
+    def run_writer(self, ready, db_path, commit_interval, commit_batch):
+        try:
+            db_manager = DatabaseManager(db_path=db_path, commit_interval=commit_interval,
+                                         commit_batch=commit_batch)
+        except Exception as e:
+            ready.set_exception(e)
+            return
+        try:
+            # Os escaneamentos só podem ser gravados pelo dono do diário
+            db_manager.require_journal()
+        except RuntimeError as e:
+            db_manager.close()
+            ready.set_exception(e)
+            return
+        ready.set_result((db_manager.db_path, db_manager.commit_interval))
+        self.serve(self.write_queue, db_manager)
+
+    def run_reader(self):
+        self.serve(self.read_queue, DatabaseManager(db_path=self.db_path, read_only=True))
+
+    def serve(self, jobs, db_manager):
+        """Atende a fila até receber None, sempre com a conexão criada nesta thread."""
+        try:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    break
+                future, method, args, after = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    if after is not None:
+                        after.result()
+                    future.set_result(getattr(db_manager, method)(*args))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            db_manager.close()
+
+    def submit(self, method, *args):
+        """Executa um método na thread de escrita."""
+        future = Future()
+        self.write_queue.put((future, method, args, None))
+        return future
+
+    def submit_read(self, method, *args):
+        """Executa um método de consulta numa conexão somente leitura.
+
+        Antes da consulta, os escaneamentos pendentes são gravados, para que ela
+        veja tudo o que já foi enviado a submit.
+        """
+        flushed = self.submit("flush")
+        future = Future()
+        self.read_queue.put((future, method, args, flushed))
+        return future
+
+    def close(self):
+        """Grava o que estiver pendente e encerra todas as conexões."""
+        for _ in range(self.reader_count):
+            self.read_queue.put(None)
+        self.write_queue.put(None)
+        for thread in self.threads:
+            thread.join()
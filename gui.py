@@ -0,0 +1,43 @@
+import sys
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt
+from main_window import MainWindow
+from db_bridge import DatabaseBridge
+
+class App(QApplication):
+    def __init__(self, argv, db):
+        super().__init__(argv)
+        self.db = db
+
+    def notify(self, receiver, event):
+        """Sobrescreve notify para capturar exceções e evitar travamentos."""
+        try:
+            return super().notify(receiver, event)
+        except Exception as e:
+            print(f"Erro no ciclo de eventos: {e}")
+            return False
+
+def run_gui(worker):
+    """Abre a interface sobre um DatabaseWorker local ou um ScanClient."""
+    # Habilitar suporte a High DPI
+    QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, False)
+    QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
+
+    app = App(sys.argv, None)
+    app.db = DatabaseBridge(worker)
+    window = MainWindow(app.db)
+    
+    # Ajustar tamanho da janela para a tela do cliente
+    screen = app.primaryScreen()
+    size = screen.size()
+    window.resize(size)
+    
+    # Maximizar a janela
+    window.showMaximized()
+    
+    try:
+        sys.exit(app.exec_())
+    except Exception as e:
+        print(f"Erro ao executar a aplicação: {e}")
+    finally:
+        app.db.close()  # Garantir que o banco seja fechado
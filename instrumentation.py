@@ -0,0 +1,224 @@
+import os
+import re
+import time
+import atexit
+import bisect
+import threading
+import functools
+import contextlib
+
+# Limites (ms) das faixas do histograma de latência
+BUCKETS_MS = [0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000, 3000]
+
+# Tempo a partir do qual chamadas e consultas são registradas como lentas
+DEFAULT_SLOW_MS = 100
+
+enabled = False
+slow_ms = DEFAULT_SLOW_MS
+stats = {}
+lock = threading.Lock()
+local = threading.local()  # Linhas lidas ou alteradas pela thread, para as chamadas em andamento
+registered = []
+
+class Stat:
+    """Contagem, tempo, linhas e histograma de latência de uma operação."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, seconds, rows):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.rows += rows
+        self.buckets[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+
+    def percentile(self, fraction):
+        """Limite superior (ms) da faixa que contém o percentil pedido."""
+        target = self.count * fraction
+        seen = 0
+        for position, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return BUCKETS_MS[position] if position < len(BUCKETS_MS) else self.max * 1000
+        return self.max * 1000
+
+def record(name, seconds, rows=0):
+    """Acumula uma medição com o nome dado."""
+    with lock:
+        stat = stats.get(name)
+        if stat is None:
+            stat = stats[name] = Stat()
+        stat.add(seconds, rows)
+
+def count_rows(rows):
+    local.rows = getattr(local, "rows", 0) + rows
+
+def begin(name):
+    """Inicia a medição de uma operação assíncrona; retorna None se a instrumentação estiver desligada."""
+    return (name, time.perf_counter()) if enabled else None
+
+def end(token, rows=0):
+    """Conclui a medição iniciada por begin."""
+    if token is not None:
+        name, start = token
+        elapsed = time.perf_counter() - start
+        record(name, elapsed, rows)
+        if elapsed * 1000 >= slow_ms:
+            print(f"[perf] Operação lenta: {name} ({elapsed * 1000:.1f} ms, {rows} linhas)")
+
+@contextlib.contextmanager
+def measure(name):
+    start = time.perf_counter()
+    rows_before = getattr(local, "rows", 0)
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        rows = getattr(local, "rows", 0) - rows_before
+        record(name, elapsed, rows)
+        if elapsed * 1000 >= slow_ms:
+            print(f"[perf] Operação lenta: {name} ({elapsed * 1000:.1f} ms, {rows} linhas)")
+
+def wrap_method(name, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with measure(name):
+            return method(*args, **kwargs)
+    wrapper.instrumented = method
+    return wrapper
+
+def instrument_class(cls, prefix):
+    """Substitui os métodos públicos da classe por versões medidas."""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith("_") or not callable(value) or hasattr(value, "instrumented"):
+            continue
+        setattr(cls, attr, wrap_method(f"{prefix}.{attr}", value))
+
+def register(cls, prefix):
+    """Registra uma classe para ser medida quando a instrumentação for ligada."""
+    registered.append((cls, prefix))
+    if enabled:
+        instrument_class(cls, prefix)
+
+def normalize_sql(sql):
+    return re.sub(r"\s+", " ", sql).strip()
+
+class InstrumentedCursor:
+    """Cursor que mede cada comando, conta as linhas e registra as consultas lentas com o plano."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __getattr__(self, attr):
+        return getattr(self.cursor, attr)
+
+    def __iter__(self):
+        for row in self.cursor:
+            count_rows(1)
+            yield row
+
+    def run(self, method, sql, params):
+        start = time.perf_counter()
+        method(sql, params)
+        elapsed = time.perf_counter() - start
+        rows = max(self.cursor.rowcount, 0)
+        count_rows(rows)
+        text = normalize_sql(sql)
+        record(f"sql: {text[:100]}", elapsed, rows)
+        if elapsed * 1000 >= slow_ms:
+            self.log_slow(text, sql, params if method == self.cursor.execute else None, elapsed)
+        return self
+
+    def log_slow(self, text, sql, params, elapsed):
+        print(f"[perf] Consulta lenta ({elapsed * 1000:.1f} ms): {text}")
+        if params:
+            print(f"[perf]   Parâmetros: {params}")
+        if not re.match(r"\s*(SELECT|UPDATE|INSERT|DELETE|WITH)\b", sql, re.IGNORECASE):
+            return
+        try:
+            plan = self.cursor.connection.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+        except Exception as e:
+            print(f"[perf]   Plano indisponível: {e}")
+            return
+        for _, _, _, detail in plan:
+            print(f"[perf]   Plano: {detail}")
+
+    def execute(self, sql, params=()):
+        return self.run(self.cursor.execute, sql, params)
+
+    def executemany(self, sql, params):
+        return self.run(self.cursor.executemany, sql, params)
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None:
+            count_rows(1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self.cursor.fetchmany(size) if size is not None else self.cursor.fetchmany()
+        count_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        count_rows(len(rows))
+        return rows
+
+class InstrumentedConnection:
+    """Conexão cujos cursores são InstrumentedCursor."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, attr):
+        return getattr(self.conn, attr)
+
+    def cursor(self):
+        return InstrumentedCursor(self.conn.cursor())
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+def wrap_connection(conn):
+    """Retorna a conexão medida se a instrumentação estiver ligada, ou a própria conexão."""
+    return InstrumentedConnection(conn) if enabled else conn
+
+def print_summary():
+    """Exibe as operações medidas, ordenadas pelo tempo total."""
+    with lock:
+        items = sorted(stats.items(), key=lambda item: item[1].total, reverse=True)
+    if not items:
+        return
+    print("[perf] Resumo da instrumentação (tempos em ms):")
+    print(f"[perf] {'operação':<60} {'chamadas':>9} {'total':>10} {'média':>8} "
+          f"{'p50':>7} {'p95':>7} {'máx':>9} {'linhas':>10}")
+    for name, stat in items:
+        print(f"[perf] {name[:60]:<60} {stat.count:>9} {stat.total * 1000:>10.1f} "
+              f"{stat.total / stat.count * 1000:>8.2f} {stat.percentile(0.5):>7.1f} "
+              f"{stat.percentile(0.95):>7.1f} {stat.max * 1000:>9.1f} {stat.rows:>10}")
+
+def enable(threshold_ms=None):
+    """Liga a instrumentação das classes registradas e o resumo na saída do programa."""
+    global enabled, slow_ms
+    if threshold_ms is not None:
+        slow_ms = threshold_ms
+    if enabled:
+        return
+    enabled = True
+    for cls, prefix in registered:
+        instrument_class(cls, prefix)
+    atexit.register(print_summary)
+
+def enable_from_env():
+    """Liga a instrumentação se SUAPCD_PROFILE=1; SUAPCD_SLOW_MS muda o limite de lentidão."""
+    if os.environ.get("SUAPCD_PROFILE", "") not in ("", "0"):
+        slow = os.environ.get("SUAPCD_SLOW_MS")
+        enable(float(slow) if slow else None)
+
+enable_from_env()
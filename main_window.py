@@ -4,20 +4,41 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 from PyQt5.QtWidgets import (
     QMainWindow, QLabel, QVBoxLayout, QWidget, QHBoxLayout,
-    QSpacerItem, QSizePolicy, QTableWidget, QTableWidgetItem, QHeaderView,
-    QPushButton, QLineEdit, QComboBox, QMessageBox
+    QSpacerItem, QSizePolicy, QTableView, QHeaderView,
+    QPushButton, QLineEdit, QComboBox, QMessageBox, QProgressDialog
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QBrush, QColor
-from report_generator import ReportGenerator
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from patrimonio_model import PatrimonioTableModel
+from sala_catalog import SalaCatalog
+from sala_model import SalaTableModel, SalaFilterProxyModel
+from report_worker import ReportWorker
+from dashboard_window import DashboardWindow
+from search_window import SearchWindow
+import instrumentation
+
+# Espera após a última tecla antes de aplicar o filtro de salas
+FILTER_DELAY_MS = 200
 
 class MainWindow(QMainWindow):
-    def __init__(self, db_manager):
+    def __init__(self, db):
         super().__init__()
         self.setWindowTitle("SUAP-CD - Coletor de Dados")
-        self.db_manager = db_manager
+        self.db = db  # DatabaseBridge: todo acesso ao banco é feito fora desta thread
+        self.patrimonio_request = 0  # Identifica a consulta de patrimônios mais recente
         self.filter_mode = "all"  # Modo de filtro inicial: todos
-        self.report_generator = ReportGenerator(db_manager)
+        self.report_worker = None
+        self.report_progress = None
+        self.dashboard = None
+        self.search_window = None
+
+        # Garante o commit dos escaneamentos pendentes mesmo sem novas leituras
+        # (conectada a um servidor de escaneamento, db_path é None e o servidor cuida disso)
+        self.commit_timer = QTimer(self)
+        self.commit_timer.setInterval(max(50, int(db.commit_interval * 500)))
+        self.commit_timer.timeout.connect(lambda: self.db.call("flush_expired"))
+        if db.db_path is not None:
+            self.commit_timer.start()
 
         # Layout principal
         layout = QVBoxLayout()
@@ -41,10 +62,26 @@ class MainWindow(QMainWindow):
         button_layout.addWidget(scan_button)
         
         # Botão para gerar relatório
-        report_button = QPushButton("Gerar Relatório")
-        report_button.setFont(QFont("Arial", 12))
-        report_button.clicked.connect(self.report_generator.generate_report)
-        button_layout.addWidget(report_button)
+        self.report_button = QPushButton("Gerar Relatório")
+        self.report_button.setFont(QFont("Arial", 12))
+        self.report_button.clicked.connect(self.generate_report)
+        button_layout.addWidget(self.report_button)
+        if db.db_path is None:
+            # O relatório lê o arquivo do banco: é gerado no servidor, com -report
+            self.report_button.setEnabled(False)
+            self.report_button.setToolTip("Gere os relatórios no servidor de escaneamento")
+        
+        # Botão para abrir o painel de andamento das salas
+        dashboard_button = QPushButton("Painel de Salas")
+        dashboard_button.setFont(QFont("Arial", 12))
+        dashboard_button.clicked.connect(self.open_dashboard)
+        button_layout.addWidget(dashboard_button)
+        
+        # Botão para buscar patrimônios em todas as salas
+        search_button = QPushButton("Buscar Patrimônio")
+        search_button.setFont(QFont("Arial", 12))
+        search_button.clicked.connect(self.open_search)
+        button_layout.addWidget(search_button)
         
         layout.addLayout(button_layout)
         
@@ -52,19 +89,27 @@ class MainWindow(QMainWindow):
         self.filter_input = QLineEdit()
         self.filter_input.setFont(QFont("Arial", 12))
         self.filter_input.setPlaceholderText("Filtrar salas...")
-        self.filter_input.textChanged.connect(self.filter_salas)
+        self.filter_input.textChanged.connect(self.filter_timer_start)
         layout.addWidget(self.filter_input)
+
+        # O filtro só é aplicado após uma pausa na digitação
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(self.filter_salas)
         
-        # Tabela para selecionar salas
-        self.sala_table = QTableWidget(self)
-        self.sala_table.setColumnCount(1)
-        self.sala_table.setHorizontalHeaderLabels(["Nome da Sala"])
+        # Tabela para selecionar salas (catálogo em memória filtrado por um proxy)
+        self.sala_model = SalaTableModel(SalaCatalog(), self)
+        self.sala_proxy = SalaFilterProxyModel(self)
+        self.sala_proxy.setSourceModel(self.sala_model)
+        self.sala_table = QTableView(self)
+        self.sala_table.setModel(self.sala_proxy)
         self.sala_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.sala_table.setFont(QFont("Arial", 10))
-        self.sala_table.setSelectionMode(QTableWidget.SingleSelection)
-        self.sala_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.sala_table.setEditTriggers(QTableWidget.NoEditTriggers)  # Impedir edição
-        self.populate_sala_table("")  # Inicializar sem filtro
+        self.sala_table.setSelectionMode(QTableView.SingleSelection)
+        self.sala_table.setSelectionBehavior(QTableView.SelectRows)
+        self.sala_table.setEditTriggers(QTableView.NoEditTriggers)  # Impedir edição
+        self.populate_sala_table()
         self.sala_table.clicked.connect(self.update_patrimonios_table)
         layout.addWidget(self.sala_table, stretch=1)  # Ocupa metade do espaço
         
@@ -75,17 +120,13 @@ class MainWindow(QMainWindow):
         self.filter_combo.currentIndexChanged.connect(self.update_filter_mode)
         layout.addWidget(self.filter_combo)
         
-        # Tabela para exibir patrimônios
-        self.patrimonio_table = QTableWidget(self)
-        self.patrimonio_table.setColumnCount(12)
-        self.patrimonio_table.setHorizontalHeaderLabels([
-            "Número", "Status", "ED", "Descrição", "Rótulos", "Carga Atual",
-            "Setor Responsável", "Campus Carga", "Número de Série", "Estado Conservação",
-            "Encontrado", "Sala Original"
-        ])
+        # Tabela para exibir patrimônios (modelo com células montadas sob demanda)
+        self.patrimonio_model = PatrimonioTableModel(self)
+        self.patrimonio_table = QTableView(self)
+        self.patrimonio_table.setModel(self.patrimonio_model)
         self.patrimonio_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.patrimonio_table.setFont(QFont("Arial", 10))
-        self.patrimonio_table.setEditTriggers(QTableWidget.NoEditTriggers)  # Impedir edição
+        self.patrimonio_table.setEditTriggers(QTableView.NoEditTriggers)  # Impedir edição
         layout.addWidget(self.patrimonio_table, stretch=1)  # Ocupa metade do espaço
         
         # Labels para estatísticas
@@ -107,24 +148,30 @@ class MainWindow(QMainWindow):
         container.setLayout(layout)
         self.setCentralWidget(container)
 
-    def populate_sala_table(self, filter_text):
-        """Popula a QTableWidget com salas, aplicando o filtro especificado."""
-        salas = self.db_manager.get_all_salas()
-        # Filtrar salas com base no texto (case-insensitive)
-        filtered_salas = [
-            (sala_id, sala_nome) for sala_id, sala_nome in salas
-            if filter_text.lower() in sala_nome.lower()
-        ]
-        self.sala_table.setRowCount(len(filtered_salas))
-        for row_idx, (sala_id, sala_nome) in enumerate(filtered_salas):
-            item = QTableWidgetItem(sala_nome)
-            item.setData(Qt.UserRole, sala_id)  # Armazenar sala_id como dado associado
-            self.sala_table.setItem(row_idx, 0, item)
+    def populate_sala_table(self):
+        """Carrega o catálogo de salas do banco; deve ser chamado novamente após importações."""
+        token = instrumentation.begin("ui.populate_sala_table")
+        self.db.read("get_all_salas", callback=lambda salas: self.salas_loaded(salas, token))
+
+    def salas_loaded(self, salas, token=None):
+        """Recebe a lista de salas do banco e reaplica o filtro."""
+        self.sala_model.reload(salas)
+        self.filter_salas()
+        instrumentation.end(token, len(salas))
+
+    def filter_timer_start(self):
+        """Reinicia a espera do filtro a cada tecla digitada."""
+        self.filter_timer.start()
 
     def filter_salas(self):
         """Atualiza a tabela de salas com base no texto do filtro."""
-        filter_text = self.filter_input.text().strip()
-        self.populate_sala_table(filter_text)
+        self.filter_timer.stop()
+        self.sala_proxy.set_filter_text(self.filter_input.text())
+
+    def selected_sala_id(self):
+        """Retorna o id da sala selecionada, ou None."""
+        rows = self.sala_table.selectionModel().selectedRows()
+        return rows[0].data(Qt.UserRole) if rows else None
 
     def update_filter_mode(self):
         """Atualiza o modo de filtro com base na seleção do ComboBox."""
@@ -139,92 +186,152 @@ class MainWindow(QMainWindow):
 
     def update_patrimonios_table(self):
         """Atualiza a tabela de patrimônios com base na sala selecionada e no filtro de encontrado."""
-        selected_items = self.sala_table.selectedItems()
-        if not selected_items:
-            self.patrimonio_table.setRowCount(0)
+        self.patrimonio_request += 1
+        sala_id = self.selected_sala_id()
+        if sala_id is None:
+            self.patrimonio_model.clear()
             self.total_label.setText("Total de Patrimônios: 0")
             self.encontrados_label.setText("Patrimônios Encontrados: 0")
             return
         
-        # Obter o sala_id do item selecionado
-        sala_id = selected_items[0].data(Qt.UserRole)
-        
-        # Limpar tabela de patrimônios
-        self.patrimonio_table.setRowCount(0)
-        
-        # Buscar todos os patrimônios da sala
-        patrimonios = self.db_manager.get_patrimonios_by_sala(sala_id)
-        
-        # Filtrar patrimônios com base no modo de filtro
-        filtered_patrimonios = []
-        for patrimonio in patrimonios:
-            encontrado = patrimonio[-2]  # Penúltimo campo é encontrado
-            if self.filter_mode == "all":
-                filtered_patrimonios.append(patrimonio)
-            elif self.filter_mode == "encontrados" and encontrado == 1:
-                filtered_patrimonios.append(patrimonio)
-            elif self.filter_mode == "nao_encontrados" and encontrado == 0:
-                filtered_patrimonios.append(patrimonio)
-        
-        # Atualizar tabela com os patrimônios filtrados
-        self.patrimonio_table.setRowCount(len(filtered_patrimonios))
-        
-        # Calcular estatísticas
-        total_patrimonios = len(filtered_patrimonios)
-        encontrados = sum(1 for row_data in filtered_patrimonios if row_data[-2] == 1)
-        
-        # Atualizar labels
-        self.total_label.setText(f"Total de Patrimônios: {total_patrimonios}")
-        self.encontrados_label.setText(f"Patrimônios Encontrados: {encontrados}")
-        
-        # Preencher tabela
-        for row_idx, row_data in enumerate(filtered_patrimonios):
-            # Mapear os 12 campos: numero, status, ed, descricao, rotulos, carga_atual,
-            # setor_responsavel, campus_carga, numero_de_serie, estado_de_conservacao,
-            # encontrado, sala_id_original
-            is_divergent = row_data[-1] is not None and row_data[-1] != sala_id
-            highlight_color = (QColor(255, 255, 0) if is_divergent else
-                             QColor(144, 238, 144) if row_data[-2] == 1 else None)
-            
-            for col_idx, value in enumerate(row_data[:-2]):  # Excluir encontrado e sala_id_original
-                item = QTableWidgetItem(str(value or ""))
-                if highlight_color:
-                    item.setBackground(QBrush(highlight_color))
-                self.patrimonio_table.setItem(row_idx, col_idx, item)
-            
-            # Coluna Encontrado
-            encontrado_text = "Sim" if row_data[-2] == 1 else "Não"
-            item = QTableWidgetItem(encontrado_text)
-            if highlight_color:
-                item.setBackground(QBrush(highlight_color))
-            self.patrimonio_table.setItem(row_idx, 10, item)
-            
-            # Coluna Sala Original (mostra o nome da sala ou vazio se não houver)
-            sala_id_original = row_data[-1]
-            sala_original_text = ""
-            if sala_id_original:
-                self.db_manager.cursor.execute("SELECT sala FROM salas WHERE id = ?", (sala_id_original,))
-                result = self.db_manager.cursor.fetchone()
-                sala_original_text = result[0] if result else ""
-            item = QTableWidgetItem(sala_original_text)
-            if highlight_color:
-                item.setBackground(QBrush(highlight_color))
-            self.patrimonio_table.setItem(row_idx, 11, item)
+        # O filtro de encontrado é aplicado na própria consulta
+        request, filter_mode = self.patrimonio_request, self.filter_mode
+        token = instrumentation.begin("ui.update_patrimonios_table")
+        self.db.read("get_patrimonios_by_sala", sala_id, filter_mode,
+                     callback=lambda rows: self.patrimonios_loaded(request, sala_id, filter_mode, rows, token))
+
+    def patrimonios_loaded(self, request, sala_id, filter_mode, patrimonios, token=None):
+        """Exibe os patrimônios recebidos, se ainda corresponderem à última seleção."""
+        if request != self.patrimonio_request:
+            return
+        self.patrimonio_model.set_rows(sala_id, patrimonios, filter_mode)
+        self.update_patrimonio_labels()
+        instrumentation.end(token, len(patrimonios))
+
+    def update_patrimonio_labels(self):
+        """Atualiza os contadores a partir do modelo de patrimônios."""
+        self.total_label.setText(f"Total de Patrimônios: {self.patrimonio_model.rowCount()}")
+        self.encontrados_label.setText(f"Patrimônios Encontrados: {self.patrimonio_model.encontrados}")
+
+    def apply_patrimonio_change(self, numero, sala_id):
+        """Atualiza somente a linha do patrimônio escaneado e os contadores."""
+        model = self.patrimonio_model
+        if model.sala_id is None or (sala_id != model.sala_id and numero not in model.row_index):
+            return  # A tabela exibida não é afetada
+        self.db.call("get_patrimonio", numero, callback=self.patrimonio_loaded)
+
+    def patrimonio_loaded(self, result):
+        """Aplica ao modelo o estado atual de um patrimônio."""
+        if result is None:
+            return
+        sala_id, row = result
+        self.patrimonio_model.apply_change(sala_id, row)
+        self.update_patrimonio_labels()
 
     def open_scan_window(self):
         """Abre a janela de escaneamento de código de barras como diálogo modal, se uma sala estiver selecionada."""
-        selected_items = self.sala_table.selectedItems()
-        if not selected_items:
+        sala_id = self.selected_sala_id()
+        if sala_id is None:
             QMessageBox.warning(self, "Erro", "Por favor, selecione uma sala antes de escanear.")
             return
         
-        sala_id = selected_items[0].data(Qt.UserRole)
         self.hide()
         from scan_window import ScanWindow
-        self.scan_window = ScanWindow(self.db_manager, self, sala_id)
+        self.scan_window = ScanWindow(self.db, self, sala_id)
+        self.scan_window.patrimonio_changed.connect(self.apply_patrimonio_change)
         self.scan_window.show()  # Abrir a janela de escaneamento
         self.showMaximized()  # Restaurar a janela principal após fechar
 
+    def open_dashboard(self):
+        """Abre o painel de salas, sem bloquear a janela principal."""
+        if self.dashboard is None:
+            self.dashboard = DashboardWindow(self.db, self)
+        self.dashboard.show()
+        self.dashboard.raise_()
+
+    def open_search(self):
+        """Abre a busca de patrimônios, sem bloquear a janela principal."""
+        if self.search_window is None:
+            self.search_window = SearchWindow(self.db, self)
+            self.search_window.sala_selected.connect(self.select_sala)
+        self.search_window.show()
+        self.search_window.raise_()
+        self.search_window.search_input.setFocus()
+
+    def select_sala(self, sala_id):
+        """Seleciona uma sala na tabela, limpando o filtro se ele a esconder, e exibe seus patrimônios."""
+        try:
+            source_row = self.sala_model.catalog.ids.index(sala_id)
+        except ValueError:
+            return
+        index = self.sala_proxy.mapFromSource(self.sala_model.index(source_row, 0))
+        if not index.isValid():
+            self.filter_input.setText("")
+            self.filter_salas()
+            index = self.sala_proxy.mapFromSource(self.sala_model.index(source_row, 0))
+        self.sala_table.selectRow(index.row())
+        self.sala_table.scrollTo(index)
+        self.update_patrimonios_table()
+
+    def generate_report(self):
+        """Inicia a geração de relatórios em segundo plano, sem bloquear os escaneamentos."""
+        if not self.report_button.isEnabled():
+            return
+        self.report_button.setEnabled(False)
+        # O relatório lê apenas dados já gravados: começa depois do commit dos pendentes
+        self.db.call("flush", callback=lambda _: self.start_report_worker())
+
+    def start_report_worker(self):
+        """Abre o diálogo de progresso e inicia a thread do relatório."""
+        self.report_progress = QProgressDialog("Gerando relatório...", "Cancelar", 0, 0, self)
+        self.report_progress.setWindowTitle("Relatório")
+        self.report_progress.setWindowModality(Qt.NonModal)
+        self.report_progress.setAutoClose(False)
+        self.report_progress.setAutoReset(False)
+        self.report_progress.setMinimumDuration(0)
+
+        self.report_worker = ReportWorker(self.db.db_path, parent=self)
+        self.report_worker.progress.connect(self.update_report_progress)
+        self.report_worker.report_finished.connect(self.report_finished)
+        self.report_worker.report_failed.connect(self.report_failed)
+        self.report_progress.canceled.connect(self.report_worker.requestInterruption)
+        self.report_worker.start()
+
+    def update_report_progress(self, processadas, total, sala_nome):
+        """Atualiza o diálogo de progresso com a sala em processamento."""
+        if self.report_progress is None:
+            return
+        self.report_progress.setMaximum(total)
+        self.report_progress.setValue(processadas)
+        if sala_nome:
+            self.report_progress.setLabelText(f"Gerando relatório: {sala_nome} ({processadas}/{total})")
+
+    def close_report_progress(self):
+        """Fecha o diálogo de progresso e libera o botão de relatório."""
+        if self.report_progress is not None:
+            self.report_progress.close()
+            self.report_progress = None
+        self.report_button.setEnabled(self.db.db_path is not None)
+
+    def report_finished(self, versoes):
+        """Registra as salas reescritas pelo relatório concluído."""
+        self.close_report_progress()
+        if versoes is None:
+            self.statusBar().showMessage("Geração de relatório cancelada.", 10000)
+            return
+        self.db.call("mark_salas_reportadas", versoes)
+        self.statusBar().showMessage(
+            f"Relatório gerado. Salas atualizadas: {len(versoes)}", 10000)
+
+    def report_failed(self, message):
+        """Exibe o erro ocorrido na geração do relatório."""
+        self.close_report_progress()
+        QMessageBox.warning(self, "Erro", f"Erro ao gerar relatório: {message}")
+
     def closeEvent(self, event):
         """Evento de fechamento da janela principal."""
+        if self.report_worker is not None and self.report_worker.isRunning():
+            self.report_worker.requestInterruption()
+            self.report_worker.wait()
+        self.db.call("flush")
         event.accept()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import re
+
+# Separadores entre o número e um sufixo (ex.: 123456-1, 123456/01)
+SUFFIX_SEPARATORS = re.compile(r"[-/.\s]")
+
+# Motivos das sugestões, na ordem em que são apresentadas
+MOTIVO_ZEROS = "zeros"          # Difere só em zeros à esquerda, espaços ou pontuação
+MOTIVO_SUFIXO = "sufixo"        # Um dos números é o outro com um sufixo
+MOTIVO_TROCA = "troca"          # Dois caracteres vizinhos trocados
+MOTIVO_DIGITO = "digito"        # Um caractere a mais, a menos ou diferente
+MOTIVOS = [MOTIVO_ZEROS, MOTIVO_SUFIXO, MOTIVO_TROCA, MOTIVO_DIGITO]
+
+# Maior sufixo sem separador considerado (ex.: dígito verificador lido junto)
+MAX_SUFFIX = 2
+
+def normalize_numero(numero):
+    """Forma canônica de um número: maiúsculas, só letras e dígitos, sem zeros à esquerda."""
+    normalized = (numero or "").upper()
+    if not (normalized.isascii() and normalized.isalnum()):
+        normalized = re.sub(r"[^0-9A-Z]", "", normalized)
+    return normalized.lstrip("0") or normalized[:1]
+
+def base_numero(numero):
+    """Parte do número antes do sufixo separado por hífen, barra, ponto ou espaço, ou None."""
+    numero = (numero or "").strip()
+    if numero.isalnum():
+        return None
+    parts = SUFFIX_SEPARATORS.split(numero, maxsplit=1)
+    return normalize_numero(parts[0]) if len(parts) > 1 and parts[0] else None
+
+class NumeroMatcher:
+    """Índice em memória dos números de patrimônio para sugerir o número certo de uma leitura errada.
+
+    Os números são indexados pela forma normalizada e pela parte antes do sufixo.
+    Em vez de percorrer uma árvore de distâncias, a busca gera as variações a
+    distância 1 da leitura (no alfabeto dos números cadastrados) e consulta cada
+    uma no dicionário: poucas centenas de consultas, sem depender do tamanho do campus.
+    """
+
+    def __init__(self, numeros=()):
+        self.normalized = {}  # forma normalizada -> números cadastrados
+        self.bases = {}  # parte antes do sufixo -> números cadastrados com sufixo
+        alphabet = set()
+        for numero in numeros:
+            normalized = normalize_numero(numero)
+            self.normalized.setdefault(normalized, []).append(numero)
+            alphabet.update(normalized)
+            base = base_numero(numero)
+            if base and base != normalized:
+                self.bases.setdefault(base, []).append(numero)
+        self.alphabet = "".join(sorted(alphabet))
+
+    def __len__(self):
+        return sum(len(numeros) for numeros in self.normalized.values())
+
+    def variants(self, text):
+        """Retorna (trocas, dígitos): os conjuntos de formas a distância 1 do texto normalizado."""
+        pieces = [(text[:i], text[i:]) for i in range(len(text) + 1)]
+        trocas = {a + b[1] + b[0] + b[2:] for a, b in pieces if len(b) > 1 and b[0] != b[1]}
+        digitos = {a + b[1:] for a, b in pieces if b}
+        digitos.update(a + c + b[1:] for a, b in pieces if b for c in self.alphabet if c != b[0])
+        digitos.update(a + c + b for a, b in pieces for c in self.alphabet)
+        return trocas, digitos
+
+    def similar(self, numero, limite=5):
+        """Retorna até limite pares (número cadastrado, motivo) parecidos com a leitura, dos mais prováveis aos menos."""
+        normalized = normalize_numero(numero)
+        if not normalized:
+            return []
+        found = {}
+
+        def add(numeros, motivo):
+            for candidate in numeros or ():
+                if candidate != numero and candidate not in found:
+                    found[candidate] = motivo
+
+        add(self.normalized.get(normalized), MOTIVO_ZEROS)
+        # Sufixo lido a mais (com ou sem separador) ou faltando na leitura
+        base = base_numero(numero)
+        if base:
+            add(self.normalized.get(base), MOTIVO_SUFIXO)
+        for size in range(1, MAX_SUFFIX + 1):
+            if len(normalized) > size + 1:
+                add(self.normalized.get(normalized[:-size]), MOTIVO_SUFIXO)
+        add(self.bases.get(normalized), MOTIVO_SUFIXO)
+        trocas, digitos = self.variants(normalized)
+        for motivo, variants in ((MOTIVO_TROCA, trocas), (MOTIVO_DIGITO, digitos)):
+            for variant in sorted(self.normalized.keys() & variants):
+                add(self.normalized[variant], motivo)
+
+        ranked = sorted(found.items(), key=lambda item: MOTIVOS.index(item[1]))
+        return ranked[:limite]
@@ -0,0 +1,116 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from PyQt5.QtGui import QBrush, QColor
+
+HEADERS = [
+    "Número", "Status", "ED", "Descrição", "Rótulos", "Carga Atual",
+    "Setor Responsável", "Campus Carga", "Número de Série", "Estado Conservação",
+    "Encontrado", "Sala Original"
+]
+
+# Posições em cada linha retornada por DatabaseManager.get_patrimonios_by_sala
+COL_ENCONTRADO = 10
+COL_SALA_ID_ORIGINAL = 11
+COL_SALA_ORIGINAL = 12
+
+DIVERGENTE_BRUSH = QBrush(QColor(255, 255, 0))
+ENCONTRADO_BRUSH = QBrush(QColor(144, 238, 144))
+
+class PatrimonioTableModel(QAbstractTableModel):
+    """Modelo da tabela de patrimônios de uma sala.
+
+    Guarda apenas as tuplas retornadas pelo banco; o texto e a cor de cada célula
+    são calculados sob demanda, somente para as linhas visíveis.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sala_id = None
+        self.filter_mode = "all"
+        self.rows = []
+        self.row_index = {}  # numero -> posição em self.rows
+        self.encontrados = 0
+
+    def set_rows(self, sala_id, rows, filter_mode="all"):
+        """Substitui o conteúdo do modelo pelos patrimônios de uma sala."""
+        self.beginResetModel()
+        self.sala_id = sala_id
+        self.filter_mode = filter_mode
+        self.rows = rows
+        self.reindex()
+        self.encontrados = sum(1 for row in rows if row[COL_ENCONTRADO] == 1)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_rows(None, [])
+
+    def reindex(self):
+        self.row_index = {row[0]: position for position, row in enumerate(self.rows)}
+
+    def accepts(self, encontrado):
+        """Indica se um patrimônio com esse estado passa pelo filtro atual."""
+        if self.filter_mode == "encontrados":
+            return encontrado == 1
+        if self.filter_mode == "nao_encontrados":
+            return encontrado == 0
+        return True
+
+    def apply_change(self, sala_id, row):
+        """Aplica o novo estado de um patrimônio alterando apenas a linha afetada.
+
+        sala_id é a sala atual do patrimônio e row a linha no formato de
+        get_patrimonios_by_sala. A linha é atualizada, inserida ou removida
+        conforme a sala exibida e o filtro.
+        """
+        numero = row[0]
+        position = self.row_index.get(numero)
+        if sala_id == self.sala_id and self.accepts(row[COL_ENCONTRADO]):
+            if position is None:
+                position = len(self.rows)
+                self.beginInsertRows(QModelIndex(), position, position)
+                self.rows.append(row)
+                self.row_index[numero] = position
+                self.encontrados += row[COL_ENCONTRADO] == 1
+                self.endInsertRows()
+            else:
+                self.encontrados += (row[COL_ENCONTRADO] == 1) - (self.rows[position][COL_ENCONTRADO] == 1)
+                self.rows[position] = row
+                self.dataChanged.emit(self.index(position, 0),
+                                      self.index(position, len(HEADERS) - 1))
+        elif position is not None:
+            self.beginRemoveRows(QModelIndex(), position, position)
+            self.encontrados -= self.rows[position][COL_ENCONTRADO] == 1
+            del self.rows[position]
+            self.reindex()
+            self.endRemoveRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        row = self.rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == COL_ENCONTRADO:
+                return "Sim" if row[COL_ENCONTRADO] == 1 else "Não"
+            if column == COL_SALA_ID_ORIGINAL:
+                return row[COL_SALA_ORIGINAL] or ""
+            return str(row[column] or "")
+
+        if role == Qt.BackgroundRole:
+            sala_id_original = row[COL_SALA_ID_ORIGINAL]
+            if sala_id_original is not None and sala_id_original != self.sala_id:
+                return DIVERGENTE_BRUSH
+            if row[COL_ENCONTRADO] == 1:
+                return ENCONTRADO_BRUSH
+        return QVariant()
@@ -1,249 +1,442 @@
+import io
 import os
 import csv
 import glob
+import shutil
+import zipfile
 import platform
+import tempfile
+import instrumentation
 from pathlib import Path
 
+HEADERS_SALA = [
+    "Número", "Status", "ED", "Descrição", "Rótulos", "Carga Atual",
+    "Setor Responsável", "Campus Carga", "Número de Série",
+    "Estado Conservação", "Encontrado", "Sala Original"
+]
+
+HEADERS_GERAL = [
+    "Sala Atual", "Número", "Status", "ED", "Descrição", "Rótulos", "Carga Atual",
+    "Setor Responsável", "Campus Carga", "Número de Série",
+    "Estado Conservação", "Encontrado", "Sala Original"
+]
+
+HEADERS_UNFOUND = ["Número", "Leituras", "Primeira Leitura", "Última Leitura"]
+HEADERS_UNFOUND_GERAL = ["Sala Atual"] + HEADERS_UNFOUND
+
+HEADERS_CAMPI_RESUMO = [
+    "Campus", "Salas", "Patrimônios", "Encontrados", "Não Encontrados", "Divergentes", "Não Cadastrados"
+]
+HEADERS_OUTRO_CAMPUS = [
+    "Campus da Leitura", "Sala da Leitura", "Número", "Campus do Cadastro", "Sala do Cadastro", "Descrição"
+]
+
+HEADERS_DELTA = ["Sala Atual", "Número", "Sala Anterior"]
+HEADERS_DELTA_RESUMO = ["Sala", "Encontrados", "Movidos", "Não Cadastrados"]
+
+# Arquivo de cada tipo de mudança do relatório de diferenças entre retratos
+DELTA_FILES = {
+    "encontrado": ("encontrados.csv", "Relatório de novos encontrados"),
+    "movido": ("movidos.csv", "Relatório de patrimônios movidos"),
+    "nao_cadastrado": ("nao_cadastrados.csv", "Relatório de novos não cadastrados"),
+}
+
+# Nome padrão do arquivo compactado com todos os relatórios
+ARCHIVE_NAME = "relatorio.zip"
+
+# Tamanho a partir do qual um relatório do arquivo compactado passa da memória para o disco
+SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+class ReportFile:
+    """Arquivo CSV de relatório escrito linha a linha."""
+
+    def __init__(self, path, headers, description):
+        self.path = path
+        self.description = description
+        self.file = None
+        self.writer = None
+        try:
+            self.file = self.open_file()
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(headers)
+        except Exception as e:
+            self.fail(e)
+
+    def open_file(self):
+        return open(self.path, mode='w', newline='', encoding='utf-8')
+
+    def fail(self, error):
+        """Registra o erro e descarta o arquivo para as próximas linhas."""
+        print(f"Erro ao escrever CSV {self.path}: {error}")
+        self.writer = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def writerow(self, row):
+        if self.writer is not None:
+            try:
+                self.writer.writerow(row)
+            except Exception as e:
+                self.fail(e)
+
+    def close(self):
+        if self.file is not None:
+            try:
+                self.file.close()
+                print(f"{self.description} gerado: {self.path}")
+            except Exception as e:
+                print(f"Erro ao escrever CSV {self.path}: {e}")
+            self.file = None
+            self.writer = None
+
+class ArchiveReportFile(ReportFile):
+    """Relatório gravado dentro de um arquivo ZIP.
+
+    O ZIP só aceita uma entrada aberta por vez, e os relatórios do _GERAL_ são
+    escritos junto com os das salas: cada relatório é acumulado num arquivo
+    temporário (em memória enquanto for pequeno) e copiado para o ZIP ao fechar.
+    """
+
+    def __init__(self, archive, name, headers, description):
+        self.archive = archive
+        self.spool = None
+        super().__init__(name, headers, description)
+
+    def open_file(self):
+        self.spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        return io.TextIOWrapper(self.spool, encoding='utf-8', newline='')
+
+    def close(self):
+        if self.file is None:
+            return
+        try:
+            self.file.flush()
+            self.file.detach()
+            size = self.spool.tell()
+            self.spool.seek(0)
+            with self.archive.open(self.path, mode='w', force_zip64=size > zipfile.ZIP64_LIMIT) as entry:
+                shutil.copyfileobj(self.spool, entry)
+        except Exception as e:
+            print(f"Erro ao escrever CSV {self.path}: {e}")
+        finally:
+            self.spool.close()
+            self.file = None
+            self.writer = None
+
 class ReportGenerator:
-    def __init__(self, db_manager):
-        self.db_manager = db_manager
+    def __init__(self, db_manager, report_dir=None):
+        self.db_manager = db_manager  # None nos relatórios conjuntos dos campi
+        self.report_dir = report_dir  # None usa o diretório padrão do sistema
 
     def get_report_dir(self):
-        """Retorna o diretório de relatórios apropriado com base no sistema operacional."""
-        if platform.system() == "Windows":
-            # Usar %APPDATA%\SUAP-CD\report no Windows
-            report_dir = Path(os.getenv("APPDATA")) / "SUAP-CD" / "report"
+        """Retorna o diretório de relatórios apropriado com base no sistema operacional.
+
+        No diretório padrão, cada campus registrado tem seu próprio subdiretório.
+        """
+        if self.report_dir is not None:
+            report_dir = Path(self.report_dir)
         else:
-            # Usar /var/lib/suapcd/report no Linux
-            report_dir = Path("/var/lib/suapcd/report")
-        
+            if platform.system() == "Windows":
+                # Usar %APPDATA%\SUAP-CD\report no Windows
+                report_dir = Path(os.getenv("APPDATA")) / "SUAP-CD" / "report"
+            else:
+                # Usar /var/lib/suapcd/report no Linux
+                report_dir = Path("/var/lib/suapcd/report")
+            if self.db_manager is not None and self.db_manager.campus is not None:
+                report_dir = report_dir / self.db_manager.campus
+
         # Criar o diretório se não existir
         report_dir.mkdir(parents=True, exist_ok=True)
         return report_dir
 
-    def generate_report(self):
-        """Gera relatórios CSV com itens lidos, não lidos, divergentes e não cadastrados para cada sala e geral."""
-        base_dir = self.get_report_dir()
-        
-        geral_dir = base_dir / "_GERAL_"
-        try:
-            geral_dir.mkdir(exist_ok=True)
-        except Exception as e:
-            print(f"Erro ao criar diretório {geral_dir}: {e}")
-            return
+    def get_sala_dir(self, base_dir, sala_nome):
+        """Retorna o diretório de relatórios de uma sala."""
+        safe_sala_nome = "".join(c if c.isalnum() or c in ('_', '-') else '_' for c in sala_nome)
+        return base_dir / safe_sala_nome
 
-        relatorio_data = self.db_manager.get_relatorio_patrimonios()
-        salas = {}
-        geral_encontrados = []
-        geral_nao_encontrados = []
-        geral_divergentes = []
-        for row in relatorio_data:
-            sala_id, sala_nome = row[0], row[1]
-            if sala_id not in salas:
-                salas[sala_id] = {"nome": sala_nome, "encontrados": [], "nao_encontrados": [], "divergentes": []}
-            if row[2] is not None:
-                patrimonio = row[2:]
-                if patrimonio[-2] == 1:
-                    salas[sala_id]["encontrados"].append(patrimonio)
-                    geral_encontrados.append((sala_nome, *patrimonio))
-                else:
-                    salas[sala_id]["nao_encontrados"].append(patrimonio)
-                    geral_nao_encontrados.append((sala_nome, *patrimonio))
-                if patrimonio[-1] is not None and patrimonio[-1] != sala_id:
-                    salas[sala_id]["divergentes"].append(patrimonio)
-                    geral_divergentes.append((sala_nome, *patrimonio))
-
-        unfound_data = self.db_manager.get_unfound_patrimonios()
-        salas_unfound = {}
-        geral_unfound = []
-        for sala_id, sala_nome, numero in unfound_data:
-            if sala_id not in salas_unfound:
-                salas_unfound[sala_id] = {"nome": sala_nome, "unfound": []}
-            salas_unfound[sala_id]["unfound"].append(numero)
-            geral_unfound.append((sala_nome, numero))
-
-        headers_sala = [
-            "Número", "Status", "ED", "Descrição", "Rótulos", "Carga Atual",
-            "Setor Responsável", "Campus Carga", "Número de Série",
-            "Estado Conservação", "Encontrado", "Sala Original"
-        ]
-
-        headers_geral = [
-            "Sala Atual", "Número", "Status", "ED", "Descrição", "Rótulos", "Carga Atual",
-            "Setor Responsável", "Campus Carga", "Número de Série",
-            "Estado Conservação", "Encontrado", "Sala Original"
-        ]
-
-        headers_unfound = ["Número"]
-        headers_unfound_geral = ["Sala Atual", "Número"]
-
-        for csv_file in glob.glob(str(geral_dir / "*.csv")):
+    def remove_csv_files(self, directory):
+        """Remove os CSVs de um relatório anterior."""
+        for csv_file in glob.glob(str(directory / "*.csv")):
             try:
                 os.remove(csv_file)
                 print(f"Arquivo removido: {csv_file}")
             except Exception as e:
                 print(f"Erro ao remover arquivo {csv_file}: {e}")
 
-        csv_path_geral_encontrados = geral_dir / "encontrados.csv"
-        try:
-            with open(csv_path_geral_encontrados, mode='w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers_geral)
-                for sala_nome, *patrimonio in geral_encontrados:
-                    row = list(patrimonio)
-                    row[-2] = "Lido"
-                    sala_id_original = row[-1]
-                    sala_original_nome = ""
-                    if sala_id_original:
-                        self.db_manager.cursor.execute("SELECT sala FROM salas WHERE id = ?", (sala_id_original,))
-                        result = self.db_manager.cursor.fetchone()
-                        sala_original_nome = result[0] if result else ""
-                    row[-1] = sala_original_nome
-                    writer.writerow([sala_nome, *map(lambda x: str(x or ""), row)])
-            print(f"Relatório geral de encontrados gerado: {csv_path_geral_encontrados}")
-        except Exception as e:
-            print(f"Erro ao escrever CSV {csv_path_geral_encontrados}: {e}")
+    def open_report_file(self, archive, directory, name, headers, description):
+        """Abre um relatório no diretório dado, ou na pasta de mesmo nome do arquivo compactado."""
+        if archive is not None:
+            return ArchiveReportFile(archive, f"{directory.name}/{name}", headers, description)
+        return ReportFile(directory / name, headers, description)
 
-        csv_path_geral_nao_encontrados = geral_dir / "nao_encontrados.csv"
+    def open_sala_files(self, base_dir, sala_nome, archive=None):
+        """Prepara o diretório de uma sala e abre seus relatórios de patrimônios."""
+        sala_dir = self.get_sala_dir(base_dir, sala_nome)
+        if archive is None:
+            try:
+                sala_dir.mkdir(exist_ok=True)
+            except Exception as e:
+                print(f"Erro ao criar diretório {sala_dir}: {e}")
+                return None
+            self.remove_csv_files(sala_dir)
+        return {
+            "encontrados": self.open_report_file(archive, sala_dir, "encontrados.csv", HEADERS_SALA,
+                                                 f"Relatório de encontrados para sala {sala_nome}"),
+            "nao_encontrados": self.open_report_file(archive, sala_dir, "nao_encontrados.csv", HEADERS_SALA,
+                                                     f"Relatório de não encontrados para sala {sala_nome}"),
+            "divergentes": self.open_report_file(archive, sala_dir, "divergente.csv", HEADERS_SALA,
+                                                 f"Relatório de divergentes para sala {sala_nome}"),
+        }
+
+    def open_archive(self, base_dir, archive_path):
+        """Abre o arquivo compactado num nome temporário, trocado pelo definitivo ao final."""
+        archive_path = Path(archive_path) if archive_path is not None else base_dir / ARCHIVE_NAME
+        temp_path = archive_path.with_name(archive_path.name + ".tmp")
         try:
-            with open(csv_path_geral_nao_encontrados, mode='w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers_geral)
-                for sala_nome, *patrimonio in geral_nao_encontrados:
-                    row = list(patrimonio)
-                    row[-2] = "Não Lido"
-                    sala_id_original = row[-1]
-                    sala_original_nome = ""
-                    if sala_id_original:
-                        self.db_manager.cursor.execute("SELECT sala FROM salas WHERE id = ?", (sala_id_original,))
-                        result = self.db_manager.cursor.fetchone()
-                        sala_original_nome = result[0] if result else ""
-                    row[-1] = sala_original_nome
-                    writer.writerow([sala_nome, *map(lambda x: str(x or ""), row)])
-            print(f"Relatório geral de não encontrados gerado: {csv_path_geral_nao_encontrados}")
+            return zipfile.ZipFile(temp_path, mode='w', compression=zipfile.ZIP_DEFLATED,
+                                   compresslevel=1), archive_path
         except Exception as e:
-            print(f"Erro ao escrever CSV {csv_path_geral_nao_encontrados}: {e}")
+            print(f"Erro ao criar arquivo {temp_path}: {e}")
+            return None, archive_path
 
-        csv_path_geral_divergentes = geral_dir / "divergente.csv"
+    def close_archive(self, archive, archive_path, completed):
+        """Fecha o arquivo compactado; se a geração foi concluída, ele substitui o anterior."""
+        temp_path = Path(archive.filename)
         try:
-            with open(csv_path_geral_divergentes, mode='w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers_geral)
-                for sala_nome, *patrimonio in geral_divergentes:
-                    row = list(patrimonio)
-                    row[-2] = "Lido" if row[-2] == 1 else "Não Lido"
-                    sala_id_original = row[-1]
-                    sala_original_nome = ""
-                    if sala_id_original:
-                        self.db_manager.cursor.execute("SELECT sala FROM salas WHERE id = ?", (sala_id_original,))
-                        result = self.db_manager.cursor.fetchone()
-                        sala_original_nome = result[0] if result else ""
-                    row[-1] = sala_original_nome
-                    writer.writerow([sala_nome, *map(lambda x: str(x or ""), row)])
-            print(f"Relatório geral de divergentes gerado: {csv_path_geral_divergentes}")
+            archive.close()
+            if completed:
+                os.replace(temp_path, archive_path)
+                print(f"Relatórios gravados em {archive_path}")
+                return True
         except Exception as e:
-            print(f"Erro ao escrever CSV {csv_path_geral_divergentes}: {e}")
+            print(f"Erro ao gravar arquivo {archive_path}: {e}")
+        temp_path.unlink(missing_ok=True)
+        return False
+
+    def close_files(self, files):
+        if files:
+            for report_file in files.values():
+                report_file.close()
+
+    def generate_report(self, full=False, progress=None, is_cancelled=None, archive=False,
+                        archive_path=None, geral_only=False):
+        """Gera relatórios CSV com itens lidos, não lidos, divergentes e não cadastrados para cada sala e geral.
 
-        csv_path_geral_unfound = geral_dir / "nao_cadastrados.csv"
+        As linhas vêm de uma única consulta ordenada por sala, já com o nome da sala
+        original, e são escritas ao mesmo tempo nos arquivos da sala e do _GERAL_.
+        Os arquivos do _GERAL_ são sempre refeitos; os de cada sala só são reescritos
+        se a sala mudou desde o último relatório, ou para todas as salas com full=True.
+
+        progress(salas_processadas, total_salas, sala_nome) é chamado a cada sala e
+        is_cancelled() é consultado entre salas. Retorna {sala_id: versao} das salas
+        reescritas, ou None se a geração falhou ou foi cancelada. Com um banco somente
+        leitura, cabe a quem chamou registrar essas versões com mark_salas_reportadas.
+
+        Com archive=True, todos os relatórios são gravados num único ZIP (archive_path,
+        ou relatorio.zip no diretório de relatórios) com as mesmas pastas e arquivos,
+        sem criar nem apagar nada nos diretórios das salas. Com geral_only=True, só os
+        relatórios do _GERAL_ são gerados. Nesses modos os diretórios das salas não são
+        atualizados, e o retorno é {} em caso de sucesso.
+        """
+        base_dir = self.get_report_dir()
+        total_salas = self.db_manager.count_salas()
+
+        zip_file = None
+        if archive:
+            zip_file, archive_path = self.open_archive(base_dir, archive_path)
+            if zip_file is None:
+                return None
+        versoes = None
         try:
-            with open(csv_path_geral_unfound, mode='w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers_unfound_geral)
-                for sala_nome, numero in geral_unfound:
-                    writer.writerow([sala_nome, numero])
-            print(f"Relatório geral de não cadastrados (escaneados) gerado: {csv_path_geral_unfound}")
-        except Exception as e:
-            print(f"Erro ao escrever CSV {csv_path_geral_unfound}: {e}")
-
-        for sala_id, sala_info in salas.items():
-            sala_nome = sala_info["nome"]
-            encontrados = sala_info["encontrados"]
-            nao_encontrados = sala_info["nao_encontrados"]
-            divergentes = sala_info["divergentes"]
-            
-            safe_sala_nome = "".join(c if c.isalnum() or c in ('_', '-') else '_' for c in sala_nome)
-            sala_dir = base_dir / safe_sala_nome
-            try:
-                sala_dir.mkdir(exist_ok=True)
-            except Exception as e:
-                print(f"Erro ao criar diretório {sala_dir}: {e}")
-                continue
-            
-            for csv_file in glob.glob(str(sala_dir / "*.csv")):
-                try:
-                    os.remove(csv_file)
-                    print(f"Arquivo removido: {csv_file}")
-                except Exception as e:
-                    print(f"Erro ao remover arquivo {csv_file}: {e}")
-
-            csv_path_encontrados = sala_dir / "encontrados.csv"
-            try:
-                with open(csv_path_encontrados, mode='w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(headers_sala)
-                    for patrimonio in encontrados:
-                        row = list(patrimonio)
-                        row[-2] = "Lido"
-                        sala_id_original = row[-1]
-                        sala_original_nome = ""
-                        if sala_id_original:
-                            self.db_manager.cursor.execute("SELECT sala FROM salas WHERE id = ?", (sala_id_original,))
-                            result = self.db_manager.cursor.fetchone()
-                            sala_original_nome = result[0] if result else ""
-                        row[-1] = sala_original_nome
-                        writer.writerow([str(val or "") for val in row])
-                print(f"Relatório de encontrados gerado para sala {sala_nome}: {csv_path_encontrados}")
-            except Exception as e:
-                print(f"Erro ao escrever CSV {csv_path_encontrados}: {e}")
+            versoes = self.write_reports(base_dir, zip_file, full, geral_only, total_salas,
+                                         progress, is_cancelled)
+        finally:
+            if zip_file is not None and not self.close_archive(zip_file, archive_path, versoes is not None):
+                versoes = None
+        if versoes is None:
+            return None
 
-            csv_path_nao_encontrados = sala_dir / "nao_encontrados.csv"
-            try:
-                with open(csv_path_nao_encontrados, mode='w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(headers_sala)
-                    for patrimonio in nao_encontrados:
-                        row = list(patrimonio)
-                        row[-2] = "Não Lido"
-                        sala_id_original = row[-1]
-                        sala_original_nome = ""
-                        if sala_id_original:
-                            self.db_manager.cursor.execute("SELECT sala FROM salas WHERE id = ?", (sala_id_original,))
-                            result = self.db_manager.cursor.fetchone()
-                            sala_original_nome = result[0] if result else ""
-                        row[-1] = sala_original_nome
-                        writer.writerow([str(val or "") for val in row])
-                print(f"Relatório de não encontrados gerado para sala {sala_nome}: {csv_path_nao_encontrados}")
-            except Exception as e:
-                print(f"Erro ao escrever CSV {csv_path_nao_encontrados}: {e}")
+        if progress is not None:
+            progress(total_salas, total_salas, "")
+        if zip_file is not None or geral_only:
+            return {}
+        if not self.db_manager.read_only:
+            self.db_manager.mark_salas_reportadas(versoes)
+        print(f"Salas com relatório atualizado: {len(versoes)}")
+        return versoes
 
-            csv_path_divergentes = sala_dir / "divergente.csv"
+    def write_reports(self, base_dir, archive, full, geral_only, total_salas, progress, is_cancelled):
+        """Escreve os relatórios no diretório base ou no ZIP aberto e retorna {sala_id: versao}."""
+        geral_dir = base_dir / "_GERAL_"
+        if archive is None:
             try:
-                with open(csv_path_divergentes, mode='w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(headers_sala)
-                    for patrimonio in divergentes:
-                        row = list(patrimonio)
-                        row[-2] = "Lido" if row[-2] == 1 else "Não Lido"
-                        sala_id_original = row[-1]
-                        sala_original_nome = ""
-                        if sala_id_original:
-                            self.db_manager.cursor.execute("SELECT sala FROM salas WHERE id = ?", (sala_id_original,))
-                            result = self.db_manager.cursor.fetchone()
-                            sala_original_nome = result[0] if result else ""
-                        row[-1] = sala_original_nome
-                        writer.writerow([str(val or "") for val in row])
-                print(f"Relatório de divergentes gerado para sala {sala_nome}: {csv_path_divergentes}")
+                geral_dir.mkdir(exist_ok=True)
             except Exception as e:
-                print(f"Erro ao escrever CSV {csv_path_divergentes}: {e}")
-
-            if sala_id in salas_unfound:
-                csv_path_unfound = sala_dir / "nao_cadastrados.csv"
-                try:
-                    with open(csv_path_unfound, mode='w', newline='', encoding='utf-8') as csvfile:
-                        writer = csv.writer(csvfile)
-                        writer.writerow(headers_unfound)
-                        for numero in salas_unfound[sala_id]["unfound"]:
-                            writer.writerow([numero])
-                    print(f"Relatório de não cadastrados (escaneados) gerado para sala {sala_nome}: {csv_path_unfound}")
-                except Exception as e:
-                    print(f"Erro ao escrever CSV {csv_path_unfound}: {e}")
\ No newline at end of file
+                print(f"Erro ao criar diretório {geral_dir}: {e}")
+                return None
+            self.remove_csv_files(geral_dir)
+        geral_files = {
+            "encontrados": self.open_report_file(archive, geral_dir, "encontrados.csv", HEADERS_GERAL,
+                                                 "Relatório geral de encontrados"),
+            "nao_encontrados": self.open_report_file(archive, geral_dir, "nao_encontrados.csv", HEADERS_GERAL,
+                                                     "Relatório geral de não encontrados"),
+            "divergentes": self.open_report_file(archive, geral_dir, "divergente.csv", HEADERS_GERAL,
+                                                 "Relatório geral de divergentes"),
+        }
+
+        current_sala_id = None
+        sala_files = None
+        versoes = {}  # Salas reescritas e a versão gravada
+        salas_processadas = 0
+        phase = instrumentation.begin("relatorio.patrimonios")
+        try:
+            for sala_id, sala_nome, *patrimonio, versao, versao_relatorio in \
+                    self.db_manager.iter_relatorio_patrimonios():
+                if sala_id != current_sala_id:
+                    self.close_files(sala_files)
+                    sala_files = None
+                    if is_cancelled is not None and is_cancelled():
+                        # Nenhuma versão é registrada: as salas continuam pendentes
+                        print("Geração de relatório cancelada.")
+                        return None
+                    if progress is not None:
+                        progress(salas_processadas, total_salas, sala_nome)
+                    salas_processadas += 1
+                    current_sala_id = sala_id
+                    if not geral_only and (full or archive is not None or versao != versao_relatorio
+                                           or not self.get_sala_dir(base_dir, sala_nome).is_dir()):
+                        sala_files = self.open_sala_files(base_dir, sala_nome, archive)
+                        if sala_files is not None:
+                            versoes[sala_id] = versao
+                if patrimonio[0] is None:
+                    continue  # Sala sem patrimônios
+
+                encontrado, sala_id_original, sala_original_nome = patrimonio[-3:]
+                row = [str(val or "") for val in patrimonio[:-3]]
+                row.append("Lido" if encontrado == 1 else "Não Lido")
+                row.append(sala_original_nome or "")
+                geral_row = [sala_nome, *row]
+
+                status = "encontrados" if encontrado == 1 else "nao_encontrados"
+                is_divergent = sala_id_original is not None and sala_id_original != sala_id
+                geral_files[status].writerow(geral_row)
+                if is_divergent:
+                    geral_files["divergentes"].writerow(geral_row)
+                if sala_files:
+                    sala_files[status].writerow(row)
+                    if is_divergent:
+                        sala_files["divergentes"].writerow(row)
+        finally:
+            self.close_files(sala_files)
+            self.close_files(geral_files)
+            instrumentation.end(phase, salas_processadas)
+
+        geral_unfound = self.open_report_file(archive, geral_dir, "nao_cadastrados.csv", HEADERS_UNFOUND_GERAL,
+                                              "Relatório geral de não cadastrados (escaneados)")
+        current_sala_id = None
+        sala_unfound = None
+        phase = instrumentation.begin("relatorio.nao_cadastrados")
+        try:
+            for sala_id, sala_nome, *row in self.db_manager.iter_unfound_patrimonios():
+                if sala_id != current_sala_id:
+                    if sala_unfound is not None:
+                        sala_unfound.close()
+                    current_sala_id = sala_id
+                    sala_unfound = None
+                    # Somente salas reescritas na etapa anterior recebem o arquivo
+                    if sala_id in versoes:
+                        sala_unfound = self.open_report_file(
+                            archive, self.get_sala_dir(base_dir, sala_nome), "nao_cadastrados.csv",
+                            HEADERS_UNFOUND,
+                            f"Relatório de não cadastrados (escaneados) para sala {sala_nome}")
+                geral_unfound.writerow([sala_nome] + row)
+                if sala_unfound is not None:
+                    sala_unfound.writerow(row)
+        finally:
+            if sala_unfound is not None:
+                sala_unfound.close()
+            geral_unfound.close()
+            instrumentation.end(phase)
+        return versoes
+
+    def generate_delta_report(self, de, para=None):
+        """Gera o relatório do que mudou entre dois retratos, ou entre um retrato e o estado atual.
+
+        Os arquivos ficam em _DELTA_/<de>__<para> no diretório de relatórios: um CSV
+        por tipo de mudança, com a sala de cada item, e resumo.csv com as contagens
+        por sala e o total geral. As mudanças vêm de iter_snapshot_delta, já ordenadas
+        por sala. Retorna {tipo: quantidade}, ou None se um dos retratos não existir.
+        """
+        ids = [self.db_manager.get_snapshot_id(nome) if nome is not None else None for nome in (de, para)]
+        for nome, snapshot_id in zip((de, para), ids):
+            if nome is not None and snapshot_id is None:
+                print(f"Retrato não encontrado: {nome}")
+                return None
+
+        delta_dir = self.get_sala_dir(self.get_report_dir() / "_DELTA_", f"{de}__{para or 'atual'}")
+        try:
+            delta_dir.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            print(f"Erro ao criar diretório {delta_dir}: {e}")
+            return None
+        self.remove_csv_files(delta_dir)
+
+        files = {tipo: ReportFile(delta_dir / name, HEADERS_DELTA, description)
+                 for tipo, (name, description) in DELTA_FILES.items()}
+        resumo = ReportFile(delta_dir / "resumo.csv", HEADERS_DELTA_RESUMO, "Resumo das diferenças por sala")
+        totais = dict.fromkeys(DELTA_FILES, 0)
+        current_sala = None
+        contagem = None
+        try:
+            for tipo, sala, numero, sala_anterior in self.db_manager.iter_snapshot_delta(*ids):
+                if sala != current_sala:
+                    if contagem is not None:
+                        resumo.writerow([current_sala, *contagem.values()])
+                    current_sala = sala
+                    contagem = dict.fromkeys(DELTA_FILES, 0)
+                files[tipo].writerow([sala, numero, sala_anterior])
+                contagem[tipo] += 1
+                totais[tipo] += 1
+            if contagem is not None:
+                resumo.writerow([current_sala, *contagem.values()])
+            resumo.writerow(["_GERAL_", *totais.values()])
+        finally:
+            self.close_files(files)
+            resumo.close()
+        return totais
+
+    def generate_campi_report(self, campi_db):
+        """Gera, em _CAMPI_ no diretório de relatórios, os relatórios conjuntos de vários campi.
+
+        resumo.csv tem o andamento de cada campus e o total, e
+        cadastrados_em_outro_campus.csv lista os não cadastrados de um campus que
+        pertencem a outro. campi_db é um CampiDatabase. Retorna os totais.
+        """
+        campi_dir = self.get_report_dir() / "_CAMPI_"
+        try:
+            campi_dir.mkdir(parents=True, exist_ok=True)
+        except Exception as e:
+            print(f"Erro ao criar diretório {campi_dir}: {e}")
+            return None
+        self.remove_csv_files(campi_dir)
+
+        resumo = ReportFile(campi_dir / "resumo.csv", HEADERS_CAMPI_RESUMO, "Resumo do inventário por campus")
+        outros = ReportFile(campi_dir / "cadastrados_em_outro_campus.csv", HEADERS_OUTRO_CAMPUS,
+                            "Relatório de não cadastrados que pertencem a outro campus")
+        totais = [0] * 5
+        try:
+            for campus, *contagem in campi_db.iter_resumo():
+                salas, total, encontrados, divergentes, nao_cadastrados = contagem
+                resumo.writerow([campus, salas, total, encontrados, total - encontrados,
+                                 divergentes, nao_cadastrados])
+                totais = [soma + valor for soma, valor in zip(totais, contagem)]
+            salas, total, encontrados, divergentes, nao_cadastrados = totais
+            resumo.writerow(["_GERAL_", salas, total, encontrados, total - encontrados,
+                             divergentes, nao_cadastrados])
+            for row in campi_db.iter_cadastrados_em_outro_campus():
+                outros.writerow(list(row))
+        finally:
+            resumo.close()
+            outros.close()
+        return totais
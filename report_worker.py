@@ -0,0 +1,35 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from database import DatabaseManager
+from report_generator import ReportGenerator
+
+class ReportWorker(QThread):
+    """Gera os relatórios em segundo plano, com conexão própria e somente leitura."""
+
+    progress = pyqtSignal(int, int, str)  # salas processadas, total de salas, sala atual
+    report_finished = pyqtSignal(object)  # {sala_id: versao}, ou None se cancelado
+    report_failed = pyqtSignal(str)
+
+    def __init__(self, db_path, full=False, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.full = full
+
+    def run(self):
+        """Executa a geração sobre um retrato consistente do banco."""
+        db_manager = None
+        try:
+            db_manager = DatabaseManager(db_path=self.db_path, read_only=True)
+            db_manager.begin_read()
+            versoes = ReportGenerator(db_manager).generate_report(
+                full=self.full,
+                progress=self.progress.emit,
+                is_cancelled=self.isInterruptionRequested,
+            )
+            db_manager.end_read()
+        except Exception as e:
+            self.report_failed.emit(str(e))
+            return
+        finally:
+            if db_manager is not None:
+                db_manager.close()
+        self.report_finished.emit(versoes)
@@ -0,0 +1,119 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from patrimonio_model import ENCONTRADO_BRUSH
+
+HEADERS = [
+    "Sala", "Total", "Encontrados", "Não Encontrados", "Divergentes", "Não Cadastrados", "Concluído"
+]
+
+# Posições em cada linha retornada por DatabaseManager.get_salas_resumo
+COL_SALA_ID = 0
+COL_SALA = 1
+COL_TOTAL = 2
+COL_ENCONTRADOS = 3
+COL_DIVERGENTES = 4
+COL_NAO_CADASTRADOS = 5
+
+# Colunas da tabela exibida, na ordem de HEADERS
+VIEW_COL_SALA = 0
+VIEW_COL_TOTAL = 1
+VIEW_COL_ENCONTRADOS = 2
+VIEW_COL_NAO_ENCONTRADOS = 3  # Calculada
+VIEW_COL_DIVERGENTES = 4
+VIEW_COL_NAO_CADASTRADOS = 5
+VIEW_COL_CONCLUIDO = 6  # Calculada
+
+# Posição na linha do banco de cada coluna da tabela que vem direto dela
+SOURCE_COLUMNS = {
+    VIEW_COL_SALA: COL_SALA,
+    VIEW_COL_TOTAL: COL_TOTAL,
+    VIEW_COL_ENCONTRADOS: COL_ENCONTRADOS,
+    VIEW_COL_DIVERGENTES: COL_DIVERGENTES,
+    VIEW_COL_NAO_CADASTRADOS: COL_NAO_CADASTRADOS,
+}
+
+def concluido(row):
+    """Fração de patrimônios encontrados; salas sem patrimônios contam como concluídas."""
+    return row[COL_ENCONTRADOS] / row[COL_TOTAL] if row[COL_TOTAL] else 1.0
+
+class ResumoTableModel(QAbstractTableModel):
+    """Modelo do painel de salas, atualizado apenas nas salas que mudaram.
+
+    Salas que deixam de existir só saem com replace, que recarrega todas.
+    Qt.UserRole devolve o valor numérico da célula, usado na ordenação.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.row_index = {}  # sala_id -> posição em self.rows
+        self.totais = [0, 0, 0, 0]  # total, encontrados, divergentes, não cadastrados
+
+    def apply(self, rows):
+        """Insere ou substitui as salas recebidas de get_salas_resumo."""
+        novas = []
+        for row in rows:
+            position = self.row_index.get(row[COL_SALA_ID])
+            if position is None:
+                novas.append(row)
+                continue
+            self.add_totais(self.rows[position], -1)
+            self.rows[position] = row
+            self.add_totais(row, 1)
+            self.dataChanged.emit(self.index(position, 0), self.index(position, len(HEADERS) - 1))
+        if novas:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(novas) - 1)
+            for row in novas:
+                self.row_index[row[COL_SALA_ID]] = len(self.rows)
+                self.rows.append(row)
+                self.add_totais(row, 1)
+            self.endInsertRows()
+
+    def replace(self, rows):
+        """Substitui todas as salas pelas recebidas de get_salas_resumo."""
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.row_index = {row[COL_SALA_ID]: position for position, row in enumerate(self.rows)}
+        self.totais = [0, 0, 0, 0]
+        for row in self.rows:
+            self.add_totais(row, 1)
+        self.endResetModel()
+
+    def add_totais(self, row, sign):
+        for position, col in enumerate((COL_TOTAL, COL_ENCONTRADOS, COL_DIVERGENTES, COL_NAO_CADASTRADOS)):
+            self.totais[position] += sign * row[col]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def value(self, row, column):
+        """Valor da coluna da tabela para uma linha do banco."""
+        if column == VIEW_COL_CONCLUIDO:
+            return concluido(row)
+        if column == VIEW_COL_NAO_ENCONTRADOS:
+            return row[COL_TOTAL] - row[COL_ENCONTRADOS]
+        return row[SOURCE_COLUMNS[column]]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        row = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == VIEW_COL_CONCLUIDO:
+                return f"{concluido(row):.0%}" if row[COL_TOTAL] else "-"
+            return str(self.value(row, column))
+        if role == Qt.UserRole:
+            return self.value(row, column)
+        if role == Qt.TextAlignmentRole and column != VIEW_COL_SALA:
+            return Qt.AlignRight | Qt.AlignVCenter
+        if role == Qt.BackgroundRole and row[COL_TOTAL] and row[COL_ENCONTRADOS] == row[COL_TOTAL]:
+            return ENCONTRADO_BRUSH
+        return QVariant()
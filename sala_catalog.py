@@ -0,0 +1,58 @@
+import unicodedata
+
+def normalize_text(text):
+    """Normaliza um texto para busca, ignorando maiúsculas e acentos."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SalaCatalog:
+    """Catálogo das salas em memória, com nomes normalizados e índice de trigramas.
+
+    É carregado uma vez e recarregado após importações; a busca não consulta o banco.
+    """
+
+    def __init__(self, salas=()):
+        self.load(salas)
+
+    def load(self, salas):
+        """Recebe a lista (id, nome) de get_all_salas e reconstrói o índice."""
+        self.ids = []
+        self.names = []
+        self.normalized = []
+        self.index = {}  # trigrama -> posições das salas que o contêm
+        for position, (sala_id, sala_nome) in enumerate(salas):
+            normalized = normalize_text(sala_nome)
+            self.ids.append(sala_id)
+            self.names.append(sala_nome)
+            self.normalized.append(normalized)
+            for trigram in trigrams(normalized):
+                self.index.setdefault(trigram, set()).add(position)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, text):
+        """Retorna as posições das salas cujo nome contém todas as palavras do texto, ou None sem filtro."""
+        tokens = normalize_text(text).split()
+        if not tokens:
+            return None
+
+        # Palavras mais longas restringem mais os candidatos e são resolvidas primeiro
+        tokens.sort(key=len, reverse=True)
+        candidates = None
+        for token in tokens:
+            token_trigrams = trigrams(token)
+            if token_trigrams:
+                postings = sorted((self.index.get(t, set()) for t in token_trigrams), key=len)
+                found = set(postings[0]).intersection(*postings[1:])
+                if candidates is not None:
+                    found &= candidates
+            else:
+                found = candidates if candidates is not None else range(len(self.ids))
+            candidates = {position for position in found if token in self.normalized[position]}
+            if not candidates:
+                break
+        return candidates
@@ -0,0 +1,48 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QVariant
+
+class SalaTableModel(QAbstractTableModel):
+    """Modelo de uma coluna com os nomes das salas de um SalaCatalog; o id fica em Qt.UserRole."""
+
+    def __init__(self, catalog, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+
+    def reload(self, salas):
+        """Recarrega o catálogo a partir da lista (id, nome) de salas."""
+        self.beginResetModel()
+        self.catalog.load(salas)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.catalog)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return "Nome da Sala"
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        if role == Qt.DisplayRole:
+            return self.catalog.names[index.row()]
+        if role == Qt.UserRole:
+            return self.catalog.ids[index.row()]
+        return QVariant()
+
+class SalaFilterProxyModel(QSortFilterProxyModel):
+    """Exibe apenas as salas encontradas pela busca no catálogo."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.matches = None  # None exibe todas as salas
+
+    def set_filter_text(self, text):
+        self.matches = self.sourceModel().catalog.search(text)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.matches is None or source_row in self.matches
@@ -0,0 +1,49 @@
+from collections import deque
+
+# Caracteres que a pistola envia ao final de cada código
+TERMINATORS = ("\r", "\n", "\t")
+
+class ScanInputBuffer:
+    """Separa códigos completos do fluxo de teclas da pistola, sem descartar nenhuma tecla.
+
+    Os caracteres são acumulados até um terminador; cada código completo entra
+    numa fila, na ordem de leitura, para ser processado depois.
+    """
+
+    def __init__(self):
+        self.partial = []
+        self.codes = deque()
+
+    def feed(self, text):
+        """Acrescenta caracteres recebidos e retorna quantos códigos foram completados."""
+        completed = 0
+        for char in text:
+            if char in TERMINATORS:
+                completed += self.terminate()
+            elif char.isprintable():
+                self.partial.append(char)
+        return completed
+
+    def terminate(self):
+        """Encerra o código em andamento; retorna 1 se havia um código, 0 caso contrário."""
+        code = "".join(self.partial).strip()
+        self.partial = []
+        if code:
+            self.codes.append(code)
+            return 1
+        return 0
+
+    def backspace(self):
+        if self.partial:
+            self.partial.pop()
+
+    def current(self):
+        """Texto do código ainda sem terminador."""
+        return "".join(self.partial)
+
+    def pop(self):
+        """Retira o próximo código da fila, ou None se vazia."""
+        return self.codes.popleft() if self.codes else None
+
+    def __len__(self):
+        return len(self.codes)
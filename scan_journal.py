@@ -0,0 +1,155 @@
+import os
+import time
+import uuid
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Resultado de cada leitura registrada no diário
+ENCONTRADO = "encontrado"
+NAO_CADASTRADO = "nao_cadastrado"
+CANCELADO = "cancelado"  # Leitura não cadastrada desfeita ao confirmar uma sugestão
+
+# Data e hora de cada leitura, no diário e em patrimonios_nao_cadastrados
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Primeira linha do diário, com o identificador gravado também no banco
+HEADER_PREFIX = "# suapcd-diario "
+
+def lock_journal(path):
+    """Trava o diário para este processo, que passa a ser o único a gravá-lo e a recuperá-lo.
+
+    Retorna o arquivo da trava (fechá-lo libera o diário), ou None se outro processo
+    ou outra conexão já é dona do diário.
+    """
+    path = Path(path)
+    lock_file = open(path.with_name(f"{path.name}.lock"), "a+b")
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+class ScanJournal:
+    """Diário de leituras: arquivo texto ao qual cada escaneamento é acrescentado.
+
+    Cada linha tem data e hora, código da sala, número e resultado, separados por
+    tabulação. A linha é gravada antes do commit do banco, e a tabela
+    diario_leituras guarda, junto com os dados, até que posição do diário o banco
+    já está atualizado. Se o identificador do arquivo não for o do banco, o arquivo
+    é arquivado e um novo diário é iniciado.
+    """
+
+    def __init__(self, path, identificador=None):
+        self.path = Path(path)
+        self.recreated = False  # O banco esperava um diário que não foi encontrado
+        if identificador is not None and self.read_header() == identificador:
+            self.identificador = identificador
+            self.position = self.truncate_partial_line()
+        else:
+            if self.path.exists():
+                self.archive()
+            self.recreated = identificador is not None
+            self.identificador = identificador or uuid.uuid4().hex
+            self.position = self.create()
+        self.start = len(f"{HEADER_PREFIX}{self.identificador}\n".encode('utf-8'))
+        self.file = open(self.path, "ab")
+
+    def read_header(self):
+        """Retorna o identificador gravado no diário, ou None se não houver diário."""
+        if not self.path.exists():
+            return None
+        with open(self.path, "rb") as journal:
+            line = journal.readline().decode('utf-8', errors='replace')
+        return line[len(HEADER_PREFIX):].strip() if line.startswith(HEADER_PREFIX) else None
+
+    def create(self):
+        header = f"{HEADER_PREFIX}{self.identificador}\n".encode('utf-8')
+        with open(self.path, "wb") as journal:
+            journal.write(header)
+            journal.flush()
+            os.fsync(journal.fileno())
+        return len(header)
+
+    def archive(self):
+        """Renomeia o diário atual, mantendo-o como histórico."""
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        target = self.path.with_name(f"{self.path.name}.{stamp}")
+        suffix = 1
+        while target.exists():
+            target = self.path.with_name(f"{self.path.name}.{stamp}-{suffix}")
+            suffix += 1
+        self.path.rename(target)
+        print(f"Diário de leituras arquivado: {target}")
+
+    def truncate_partial_line(self):
+        """Descarta a última linha se ela foi gravada pela metade e retorna o tamanho do diário."""
+        with open(self.path, "rb+") as journal:
+            size = journal.seek(0, os.SEEK_END)
+            end = size
+            while end > 0:
+                chunk_start = max(0, end - 4096)
+                journal.seek(chunk_start)
+                chunk = journal.read(end - chunk_start)
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    end = chunk_start + newline + 1
+                    break
+                end = chunk_start
+            if end != size:
+                journal.truncate(end)
+                print(f"Linha incompleta descartada do diário de leituras ({size - end} bytes)")
+        return end
+
+    def append(self, codigo, numero, resultado, timestamp=None):
+        """Acrescenta uma leitura e a entrega ao sistema operacional."""
+        if timestamp is None:
+            timestamp = time.strftime(TIMESTAMP_FORMAT)
+        data = f"{timestamp}\t{codigo}\t{numero}\t{resultado}\n".encode('utf-8')
+        self.file.write(data)
+        self.file.flush()
+        self.position += len(data)
+
+    def sync(self):
+        """Garante em disco as leituras acrescentadas até aqui."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def truncate(self, position):
+        """Descarta as leituras acrescentadas depois da posição dada, cujo commit no banco foi desfeito."""
+        self.file.flush()
+        os.ftruncate(self.file.fileno(), position)
+        os.fsync(self.file.fileno())
+        self.position = position
+
+    def read_from(self, position):
+        """Gera (data e hora, codigo, numero, resultado) das leituras gravadas a partir da posição dada."""
+        with open(self.path, "rb") as journal:
+            journal.seek(max(position, self.start))
+            while journal.tell() < self.position:
+                line = journal.readline().decode('utf-8').rstrip("\n")
+                if not line or line.startswith("#"):
+                    continue
+                timestamp, codigo, numero, resultado = line.split("\t")
+                yield timestamp, codigo, numero, resultado
+
+    def checkpoint(self, cursor):
+        """Registra no banco, na transação corrente, que ele contém todo o diário até aqui."""
+        cursor.execute('''
+            INSERT OR REPLACE INTO diario_leituras (id, identificador, posicao)
+            VALUES (1, ?, ?)
+        ''', (self.identificador, self.position))
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,164 @@
+import hmac
+import json
+import os
+import socket
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from db_worker import DatabaseWorker
+from database import DEFAULT_COMMIT_INTERVAL
+
+DEFAULT_PORT = 8765
+
+# Por padrão o servidor só atende este computador; na rede, é preciso indicar o host
+DEFAULT_HOST = "127.0.0.1"
+
+# Variável de ambiente com o token compartilhado, quando -token não é indicado
+TOKEN_ENV = "SUAPCD_TOKEN"
+
+# Métodos do DatabaseManager que as estações podem chamar pela rede
+WRITE_METHODS = {
+    "process_scan", "mark_patrimonio_encontrado", "record_unfound_patrimonio",
+    "get_patrimonio", "find_similar_numeros", "confirm_similar", "flush", "flush_expired",
+}
+READ_METHODS = {
+    "count_salas", "get_all_salas", "get_sala_nome", "get_patrimonios_by_sala", "get_patrimonio",
+    "get_salas_resumo", "search_patrimonios",
+}
+
+def parse_address(text, default_host=DEFAULT_HOST):
+    """Converte "host:porta", "host" ou "porta" em (host, porta)."""
+    if ":" in text:
+        host, port = text.rsplit(":", 1)
+    elif text.isdigit():
+        host, port = "", text
+    else:
+        host, port = text, ""
+    return host or default_host, int(port) if port else DEFAULT_PORT
+
+def get_token(token=None):
+    """Token compartilhado entre servidor e estações: o indicado ou o de SUAPCD_TOKEN."""
+    return token or os.environ.get(TOKEN_ENV) or None
+
+def is_loopback(host):
+    """Indica se o host só é acessível deste computador."""
+    return host in ("localhost", "::1") or host.startswith("127.")
+
+def check_token(expected, received):
+    """Compara os tokens em tempo constante; sem token esperado, tudo é aceito."""
+    if not expected:
+        return True
+    if not isinstance(received, str):
+        return False
+    return hmac.compare_digest(received.encode('utf-8'), expected.encode('utf-8'))
+
+class ScanRequestHandler(socketserver.StreamRequestHandler):
+    """Atende uma estação: uma requisição JSON por linha, uma resposta por linha, em ordem."""
+
+    def handle(self):
+        print(f"Estação conectada: {self.client_address[0]}:{self.client_address[1]}")
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not check_token(self.server.token, request.get("token")):
+                    # Sem o token certo, a conexão é encerrada sem tocar no banco
+                    self.wfile.write(json.dumps({"error": "Token inválido"}).encode('utf-8') + b"\n")
+                    print(f"Token inválido de {self.client_address[0]}:{self.client_address[1]}")
+                    return
+                method = request["method"]
+                args = request.get("args", [])
+                if request.get("read") and method in READ_METHODS:
+                    future = self.server.worker.submit_read(method, *args)
+                elif method in WRITE_METHODS:
+                    future = self.server.worker.submit(method, *args)
+                else:
+                    raise ValueError(f"Método não permitido: {method}")
+                response = {"result": future.result()}
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+        print(f"Estação desconectada: {self.client_address[0]}:{self.client_address[1]}")
+
+class ScanServer(socketserver.ThreadingTCPServer):
+    """Servidor de escaneamento compartilhado por várias estações na rede local.
+
+    Cada conexão tem sua thread, mas todas as gravações passam pela thread de
+    escrita do DatabaseWorker: as leituras de todas as estações entram no mesmo
+    grupo de commit, e as consultas usam as conexões somente leitura do WAL.
+    Com token, toda requisição precisa trazê-lo; sem ele, a conexão é encerrada.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, db_path=None, commit_interval=DEFAULT_COMMIT_INTERVAL, token=None):
+        self.token = token
+        self.worker = DatabaseWorker(db_path, commit_interval=commit_interval)
+        try:
+            super().__init__(address, ScanRequestHandler)
+        except Exception:
+            self.worker.close()
+            raise
+
+    def service_actions(self):
+        # Chamado a cada volta de serve_forever: grava os grupos que expiraram
+        self.worker.submit("flush_expired")
+
+    def run(self):
+        """Atende as estações até Ctrl+C e grava o que estiver pendente."""
+        host, port = self.server_address[:2]
+        print(f"Servidor de escaneamento em {host}:{port} (banco {self.worker.db_path})")
+        try:
+            self.serve_forever(poll_interval=max(0.05, self.worker.commit_interval / 2))
+        except KeyboardInterrupt:
+            print("Encerrando servidor de escaneamento.")
+        finally:
+            self.server_close()
+            self.worker.close()
+
+class ScanClient:
+    """Conexão de uma estação com o ScanServer.
+
+    Oferece submit e submit_read como o DatabaseWorker, para que a interface
+    funcione com um DatabaseBridge sobre o servidor, e call para coletores simples.
+    Sem banco local, db_path é None.
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT, timeout=30, token=None):
+        self.db_path = None
+        self.token = token
+        self.commit_interval = 0
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.sock.makefile("rwb")
+        # Uma requisição por vez na conexão, na ordem de envio
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def request(self, method, args, read=False):
+        request = {"method": method, "args": args, "read": read}
+        if self.token:
+            request["token"] = self.token
+        self.file.write(json.dumps(request).encode('utf-8') + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Conexão com o servidor encerrada")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    def call(self, method, *args):
+        """Executa o método no servidor e aguarda o resultado."""
+        return self.submit(method, *args).result()
+
+    def submit(self, method, *args):
+        return self.executor.submit(self.request, method, list(args))
+
+    def submit_read(self, method, *args):
+        return self.executor.submit(self.request, method, list(args), True)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.file.close()
+        self.sock.close()
@@ -1,15 +1,34 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QApplication
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QApplication
+from PyQt5.QtCore import Qt, QTimer, QEvent, pyqtSignal
+from PyQt5.QtGui import QFont, QKeySequence
+from scan_input import ScanInputBuffer
+from numero_matcher import MOTIVO_ZEROS, MOTIVO_SUFIXO, MOTIVO_TROCA, MOTIVO_DIGITO
+
+# Quantidade de sugestões exibidas para um número não cadastrado
+MAX_SUGESTOES = 3
+
+MOTIVO_TEXTOS = {
+    MOTIVO_ZEROS: "zeros à esquerda",
+    MOTIVO_SUFIXO: "sufixo",
+    MOTIVO_TROCA: "dígitos trocados",
+    MOTIVO_DIGITO: "um dígito diferente",
+}
 
 class ScanWindow(QDialog):
-    def __init__(self, db_manager, parent=None, sala_id=None):
+    # Emitido com o número e a nova sala de cada patrimônio marcado como encontrado
+    patrimonio_changed = pyqtSignal(str, int)
+
+    def __init__(self, db, parent=None, sala_id=None):
         super().__init__(parent)
         self.setWindowTitle("Escanear Código de Barras")
-        self.db_manager = db_manager
+        self.db = db  # DatabaseBridge
         self.parent = parent
         self.sala_id = sala_id
-        self.is_processing = False
+        self.sala_nome = ""
+        self.scan_buffer = ScanInputBuffer()
+        self.processing_scheduled = False
+        self.scans_processed = 0  # Identifica a leitura mais recente, para descartar sugestões antigas
+        self.lidos = {}  # numero -> encontrado, dos números já processados nesta sala
 
         self.setWindowModality(Qt.ApplicationModal)
 
@@ -27,22 +46,29 @@ class ScanWindow(QDialog):
         label.setAlignment(Qt.AlignCenter)
         layout.addWidget(label)
         
-        sala_nome = self.get_sala_nome()
-        self.sala_label = QLabel(f"Sala: {sala_nome}")
+        self.sala_label = QLabel("Sala: ")
         self.sala_label.setFont(QFont("Arial", 16))
         self.sala_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.sala_label, alignment=Qt.AlignCenter)
         
+        # O campo só exibe o buffer de leitura: somente leitura, nenhuma tecla ou ação de
+        # edição (Delete, recortar, desfazer, setas seguidas de digitação) o altera por fora
         self.input = QLineEdit()
         self.input.setFont(QFont("Arial", 16))
         self.input.setMaximumWidth(400)
-        self.input.returnPressed.connect(self.handle_return_pressed)
+        self.input.setReadOnly(True)
+        self.input.installEventFilter(self)
         layout.addWidget(self.input, alignment=Qt.AlignCenter)
         
         self.feedback_label = QLabel("")
         self.feedback_label.setFont(QFont("Arial", 14))
         self.feedback_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.feedback_label)
+
+        # Sugestões para um número não cadastrado; os botões não tiram o foco da leitura
+        self.suggestions_layout = QHBoxLayout()
+        self.suggestions_layout.setAlignment(Qt.AlignCenter)
+        layout.addLayout(self.suggestions_layout)
         
         close_button = QPushButton("Fechar")
         close_button.setFont(QFont("Arial", 12))
@@ -53,68 +79,155 @@ class ScanWindow(QDialog):
         self.setLayout(layout)
         self.input.setFocus()
 
-    def get_sala_nome(self):
-        """Obtém o nome da sala com base no sala_id."""
         if self.sala_id:
-            self.db_manager.cursor.execute("SELECT sala FROM salas WHERE id = ?", (self.sala_id,))
-            result = self.db_manager.cursor.fetchone()
-            return result[0] if result else "Desconhecida"
-        return "Nenhuma sala selecionada"
-
-    def handle_return_pressed(self):
-        """Manipula o sinal returnPressed para evitar múltiplas chamadas."""
-        if not self.is_processing:
-            self.is_processing = True
-            self.input.setEnabled(False)
-            QTimer.singleShot(0, self.process_scan)
-            QTimer.singleShot(200, self.reset_processing)
-
-    def reset_processing(self):
-        """Redefine a flag de processamento e reativa a entrada."""
-        self.is_processing = False
-        self.input.setEnabled(True)
-        self.input.setFocus()
-        self.activateWindow()
-        self.raise_()
+            self.db.read("get_sala_nome", self.sala_id, callback=self.set_sala_nome)
+        else:
+            self.sala_label.setText("Sala: Nenhuma sala selecionada")
+
+    def set_sala_nome(self, sala_nome):
+        """Exibe o nome da sala obtido do banco."""
+        self.sala_nome = sala_nome or "Desconhecida"
+        self.sala_label.setText(f"Sala: {self.sala_nome}")
+
+    def handle_key(self, event):
+        """Repassa uma tecla ao buffer de leitura; retorna True se ela foi consumida."""
+        key = event.key()
+        if key in (Qt.Key_Enter, Qt.Key_Return, Qt.Key_Tab):
+            completed = self.scan_buffer.terminate()
+        elif key == Qt.Key_Backspace:
+            self.scan_buffer.backspace()
+            completed = 0
+        elif event.matches(QKeySequence.Paste):
+            completed = self.scan_buffer.feed(QApplication.clipboard().text())
+        elif event.text() and event.text().isprintable():
+            completed = self.scan_buffer.feed(event.text())
+        else:
+            return False
+
+        self.input.setText(self.scan_buffer.current())
+        if completed:
+            self.schedule_processing()
+        return True
+
+    def eventFilter(self, obj, event):
+        """Captura as teclas do campo de entrada sem bloqueá-lo entre leituras."""
+        if obj is self.input and event.type() == QEvent.KeyPress:
+            if self.handle_key(event):
+                return True
+        return super().eventFilter(obj, event)
+
+    def schedule_processing(self):
+        """Agenda o processamento da fila de códigos, se ainda não agendado."""
+        if not self.processing_scheduled:
+            self.processing_scheduled = True
+            QTimer.singleShot(0, self.process_queue)
+
+    def process_queue(self):
+        """Envia ao banco todos os códigos da fila.
+
+        A thread de escrita do banco atende os códigos na ordem de envio, e os
+        resultados voltam pelo laço de eventos sem bloquear a leitura de teclas.
+        """
+        self.processing_scheduled = False
+        numero = self.scan_buffer.pop()
+        while numero is not None:
+            self.process_scan(numero)
+            numero = self.scan_buffer.pop()
 
-    def process_scan(self):
-        """Processa o escaneamento e mantém a janela aberta para escaneamento contínuo."""
-        numero = self.input.text().strip()
+    def process_scan(self, numero):
+        """Envia um código escaneado para processamento e mantém a janela aberta para escaneamento contínuo."""
         print(f"Processando escaneamento: '{numero}'")
         
-        if not numero:
-            self.feedback_label.setText("Nenhum código escaneado.")
-            self.input.clear()
-            return
-        
         if not self.sala_id:
             self.feedback_label.setText("Nenhuma sala selecionada.")
-            self.input.clear()
             return
         
-        if self.db_manager.mark_patrimonio_encontrado(numero, self.sala_id):
-            self.feedback_label.setText(f"Patrimônio {numero} encontrado na sala {self.sala_label.text().replace('Sala: ', '')}.")
-            if self.parent:
-                self.parent.update_patrimonios_table()
+        sala_id = self.sala_id
+        # Repetições são informadas na hora; o banco ainda recebe a leitura para contá-la
+        lido = self.lidos.get(numero)
+        if lido is not None:
+            self.show_repeat(numero, lido)
+        self.db.call("process_scan", numero, sala_id,
+                     callback=lambda encontrado: self.scan_processed(numero, sala_id, encontrado, lido))
+
+    def show_repeat(self, numero, encontrado):
+        """Informa, sem esperar o banco, que o número já foi lido nesta sala."""
+        if encontrado:
+            self.feedback_label.setText(f"Patrimônio {numero} já encontrado na sala {self.sala_nome}.")
+        else:
+            self.feedback_label.setText(f"Patrimônio {numero} não cadastrado, já registrado nesta sala.")
+
+    def scan_processed(self, numero, sala_id, encontrado, lido=None):
+        """Exibe o resultado de um escaneamento processado pelo banco.
+
+        lido é o resultado anterior do mesmo número, já informado por show_repeat.
+        """
+        self.lidos[numero] = encontrado
+        if encontrado == lido:
+            return
+        self.clear_suggestions()
+        self.scans_processed += 1
+        scan = self.scans_processed
+        if encontrado:
+            self.feedback_label.setText(f"Patrimônio {numero} encontrado na sala {self.sala_nome}.")
+            self.patrimonio_changed.emit(numero, sala_id)
         else:
-            self.db_manager.record_unfound_patrimonio(numero, self.sala_id)
             self.feedback_label.setText(f"Patrimônio {numero} não cadastrado e registrado.")
-        
-        self.input.clear()
+            self.db.call("find_similar_numeros", numero, MAX_SUGESTOES,
+                         callback=lambda rows: self.show_suggestions(scan, numero, sala_id, rows))
+
+    def show_suggestions(self, scan, numero_lido, sala_id, rows):
+        """Oferece os patrimônios cadastrados parecidos com um número não cadastrado.
+
+        Sugestões que chegam depois de outra leitura já processada são descartadas.
+        """
+        if scan != self.scans_processed or not rows:
+            return
+        label = QLabel("Você quis dizer:")
+        label.setFont(QFont("Arial", 12))
+        self.suggestions_layout.addWidget(label)
+        for numero, motivo, _, sala, descricao in rows:
+            button = QPushButton(f"{numero} — {descricao or ''}\n({MOTIVO_TEXTOS.get(motivo, motivo)}; sala {sala or '?'})")
+            button.setFont(QFont("Arial", 11))
+            button.setFocusPolicy(Qt.NoFocus)
+            button.setAutoDefault(False)
+            button.clicked.connect(
+                lambda _, numero=numero: self.confirm_suggestion(numero_lido, numero, sala_id))
+            self.suggestions_layout.addWidget(button)
+
+    def clear_suggestions(self):
+        while self.suggestions_layout.count():
+            widget = self.suggestions_layout.takeAt(0).widget()
+            if widget is not None:
+                widget.deleteLater()
+
+    def confirm_suggestion(self, numero_lido, numero, sala_id):
+        """Substitui a leitura não cadastrada pelo patrimônio sugerido escolhido pelo operador."""
+        self.clear_suggestions()
+        self.db.call("confirm_similar", numero_lido, numero, sala_id,
+                     callback=lambda encontrado: self.suggestion_confirmed(numero_lido, numero, sala_id, encontrado))
+
+    def suggestion_confirmed(self, numero_lido, numero, sala_id, encontrado):
+        # Uma nova leitura do número errado volta a receber sugestões
+        self.lidos.pop(numero_lido, None)
+        if encontrado:
+            self.lidos[numero] = True
+            self.feedback_label.setText(f"Leitura {numero_lido} corrigida: patrimônio {numero} encontrado na sala {self.sala_nome}.")
+            self.patrimonio_changed.emit(numero, sala_id)
 
     def keyPressEvent(self, event):
-        """Impede que a tecla Enter ou Esc feche a janela."""
-        if event.key() in (Qt.Key_Enter, Qt.Key_Return):
-            if not self.is_processing:
-                self.handle_return_pressed()
+        """Impede que Enter ou Esc fechem a janela e envia ao buffer as teclas recebidas fora do campo."""
+        if event.key() == Qt.Key_Escape:
             event.accept()
-        elif event.key() == Qt.Key_Escape:
+        elif self.handle_key(event):
+            self.input.setFocus()
             event.accept()
         else:
             super().keyPressEvent(event)
 
     def closeEvent(self, event):
         """Evento de fechamento da ScanWindow."""
+        self.db.call("flush")
         try:
             if self.parent is not None:
                 self.parent.showMaximized()
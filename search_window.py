@@ -0,0 +1,85 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QLineEdit, QTableView, QHeaderView, QPushButton, QApplication
+)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont
+from busca_model import BuscaTableModel
+
+# Espera após a última tecla antes de buscar
+SEARCH_DELAY_MS = 250
+
+class SearchWindow(QDialog):
+    """Busca de patrimônios em todas as salas, pelo índice de texto do banco.
+
+    Um duplo clique num resultado emite sala_selected com a sala atual do patrimônio.
+    """
+
+    sala_selected = pyqtSignal(int)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Buscar Patrimônios")
+        self.db = db  # DatabaseBridge
+        self.search_request = 0  # Identifica a busca mais recente
+
+        screen = QApplication.primaryScreen().size()
+        self.resize(int(screen.width() * 0.7), int(screen.height() * 0.6))
+
+        layout = QVBoxLayout()
+
+        self.search_input = QLineEdit()
+        self.search_input.setFont(QFont("Arial", 12))
+        self.search_input.setPlaceholderText("Número, descrição, número de série, rótulos ou fornecedor...")
+        self.search_input.textChanged.connect(self.search_timer_start)
+        layout.addWidget(self.search_input)
+
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.search)
+
+        self.model = BuscaTableModel(self)
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
+        self.table.setFont(QFont("Arial", 10))
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)  # Impedir edição
+        self.table.doubleClicked.connect(self.select_sala)
+        layout.addWidget(self.table)
+
+        self.status_label = QLabel("")
+        self.status_label.setFont(QFont("Arial", 10))
+        layout.addWidget(self.status_label)
+
+        close_button = QPushButton("Fechar")
+        close_button.setFont(QFont("Arial", 12))
+        close_button.clicked.connect(self.close)
+        layout.addWidget(close_button, alignment=Qt.AlignCenter)
+        self.setLayout(layout)
+
+    def search_timer_start(self):
+        """Reinicia a espera da busca a cada tecla digitada."""
+        self.search_timer.start()
+
+    def search(self):
+        """Envia a busca ao banco; resultados de buscas anteriores são descartados."""
+        self.search_request += 1
+        request = self.search_request
+        self.db.read("search_patrimonios", self.search_input.text(),
+                     callback=lambda rows: self.results_loaded(request, rows))
+
+    def results_loaded(self, request, rows):
+        if request != self.search_request:
+            return
+        if rows is None:
+            self.model.set_rows([])
+            self.status_label.setText("Busca indisponível: o SQLite instalado não tem FTS5.")
+            return
+        self.model.set_rows(rows)
+        self.status_label.setText(f"Resultados: {len(rows)}" if rows else "")
+
+    def select_sala(self, index):
+        sala_id = index.data(Qt.UserRole)
+        if sala_id is not None:
+            self.sala_selected.emit(sala_id)
@@ -0,0 +1,99 @@
+import csv
+import random
+import argparse
+from database import EXPECTED_COLUMNS
+
+# Partes usadas para montar nomes de salas, patrimônios e responsáveis com acentos
+BLOCOS = ["BLOCO A", "BLOCO B", "BLOCO C", "BLOCO DA ADMINISTRAÇÃO", "BLOCO DE ENSINO",
+          "PRÉDIO DA BIBLIOTECA", "GINÁSIO", "ANEXO DA DIREÇÃO", "PAVILHÃO DE LABORATÓRIOS"]
+TIPOS_SALA = ["SALA DE AULA", "LABORATÓRIO DE INFORMÁTICA", "LABORATÓRIO DE QUÍMICA",
+              "LABORATÓRIO DE ELETRÔNICA", "COORDENAÇÃO DE CURSO", "SECRETARIA ACADÊMICA",
+              "AUDITÓRIO", "ALMOXARIFADO", "SALA DOS PROFESSORES", "DIRETORIA DE ENSINO",
+              "GABINETE", "COPA", "DEPÓSITO", "NÚCLEO DE TECNOLOGIA DA INFORMAÇÃO"]
+ITENS = ["CADEIRA GIRATÓRIA", "MESA DE ESCRITÓRIO", "MICROCOMPUTADOR", "MONITOR LED 24\"",
+         "PROJETOR MULTIMÍDIA", "ARMÁRIO DE AÇO", "ESTANTE", "NOBREAK", "IMPRESSORA LASER",
+         "CONDICIONADOR DE AR SPLIT", "QUADRO BRANCO", "NOTEBOOK", "BEBEDOURO ELÉTRICO",
+         "OSCILOSCÓPIO DIGITAL", "BALANÇA ANALÍTICA", "SWITCH GERENCIÁVEL", "LONGARINA 3 LUGARES"]
+MARCAS = ["POSITIVO", "DELL", "LENOVO", "EPSON", "SAMSUNG", "LG", "CAVALETTI", "PANDIN",
+          "TEKTRONIX", "MARTE", "HP", "ELGIN"]
+NOMES = ["JOSÉ", "MARIA", "JOÃO", "ANTÔNIO", "FRANCISCA", "LUÍS", "CONCEIÇÃO", "SEBASTIÃO",
+         "LÚCIA", "ANDRÉ", "PATRÍCIA", "MÁRCIO"]
+SOBRENOMES = ["SILVA", "ARAÚJO", "GONÇALVES", "MAGALHÃES", "FALCÃO", "CONCEIÇÃO", "BRANDÃO",
+              "LOURENÇO", "NOGUEIRA", "ROMÃO"]
+SETORES = ["DIREÇÃO-GERAL", "DEPARTAMENTO DE ENSINO", "COORDENAÇÃO DE TI", "BIBLIOTECA",
+           "DEPARTAMENTO DE ADMINISTRAÇÃO", "COORDENAÇÃO DE PESQUISA E EXTENSÃO"]
+FORNECEDORES = ["COMÉRCIO DE MÓVEIS LTDA", "INFORMÁTICA CUIABÁ EIRELI", "DISTRIBUIDORA PAULISTA S.A.",
+                "ELETRÔNICOS DO CERRADO LTDA", "PAPELARIA E SERVIÇOS ÁGUA BOA ME"]
+ESTADOS = ["Bom", "Ótimo", "Regular", "Ocioso", "Recuperável", "Antieconômico"]
+ELEMENTOS_DESPESA = ["44905234", "44905235", "44905242", "44905233", "44905212"]
+
+def sala_names(quantidade, rng):
+    """Gera nomes únicos de salas no formato usado pelo SUAP."""
+    names = []
+    for index in range(quantidade):
+        bloco = rng.choice(BLOCOS)
+        tipo = rng.choice(TIPOS_SALA)
+        names.append(f"{tipo} {index + 1:04d} - {bloco}")
+    return names
+
+def sala_weights(quantidade, rng):
+    """Pesos das salas: poucas salas muito cheias e muitas com poucos itens, como nos campi."""
+    return [rng.lognormvariate(0, 1.2) for _ in range(quantidade)]
+
+def generate_suap_csv(file_path, itens=100000, salas=3000, seed=0,
+                      campus="Campus Cuiabá", sem_sala=0.002):
+    """Gera um CSV sintético com as colunas exatas da exportação do SUAP.
+
+    Os números de patrimônio são únicos; sem_sala é a fração de itens sem sala.
+    Com a mesma semente, o arquivo gerado é sempre o mesmo.
+    """
+    rng = random.Random(seed)
+    names = sala_names(salas, rng)
+    weights = sala_weights(salas, rng)
+    # Sorteia as salas em blocos, sem montar a lista inteira de itens na memória
+    chunk = 10000
+    numero = 100000 + rng.randrange(1000)
+    with open(file_path, mode='w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(EXPECTED_COLUMNS)
+        written = 0
+        while written < itens:
+            count = min(chunk, itens - written)
+            for sala in rng.choices(names, weights=weights, k=count):
+                written += 1
+                numero += 1 + (rng.random() < 0.05) * rng.randrange(1, 50)
+                item = rng.choice(ITENS)
+                marca = rng.choice(MARCAS)
+                aquisicao = round(rng.uniform(80, 25000), 2)
+                ano = rng.randrange(2005, 2025)
+                writer.writerow([
+                    written,
+                    str(numero),
+                    "Ativo" if rng.random() < 0.97 else "Baixado",
+                    rng.choice(ELEMENTOS_DESPESA),
+                    f"{item} {marca} MOD. {rng.randrange(100, 9999)}",
+                    "" if rng.random() < 0.7 else f"TOMBO ANTIGO {rng.randrange(1, 99999)}",
+                    f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}",
+                    rng.choice(SETORES),
+                    campus,
+                    f"{aquisicao:.2f}",
+                    f"{aquisicao * rng.uniform(0.1, 1):.2f}",
+                    f"{rng.randrange(1, 99999)}/{ano}",
+                    "" if rng.random() < 0.4 else f"SN{rng.randrange(16 ** 8):08X}",
+                    f"{rng.randrange(1, 29):02d}/{rng.randrange(1, 13):02d}/{ano}",
+                    f"{rng.randrange(1, 29):02d}/{rng.randrange(1, 13):02d}/{min(ano + 1, 2025)}",
+                    rng.choice(FORNECEDORES),
+                    "" if rng.random() < sem_sala else sala,
+                    rng.choice(ESTADOS),
+                ])
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um CSV sintético no formato de exportação do SUAP")
+    parser.add_argument("arquivo", type=str, help="Caminho do CSV a gerar")
+    parser.add_argument("-itens", type=int, default=100000, help="Quantidade de patrimônios")
+    parser.add_argument("-salas", type=int, default=3000, help="Quantidade de salas")
+    parser.add_argument("-seed", type=int, default=0, help="Semente do gerador")
+    args = parser.parse_args()
+    total = generate_suap_csv(args.arquivo, args.itens, args.salas, args.seed)
+    print(f"Arquivo gerado: {args.arquivo} ({total} itens, até {args.salas} salas)")
@@ -0,0 +1,100 @@
+import csv
+import io
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import cli
+import database
+from campus_registry import CampusRegistry
+from synthetic_data import generate_suap_csv
+
+class ArquivarCampusAtivoTest(unittest.TestCase):
+    """Arquivar o campus ativo não pode fazer os comandos abrirem um suap.db vazio."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        patcher = mock.patch.object(database, "get_data_dir", lambda: self.dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        generate_suap_csv(self.dir / "suap.csv", itens=100, salas=5, seed=1, campus="Campus Cuiabá")
+        self.assertEqual(cli.main(["load", str(self.dir / "suap.csv"), "-por-campus"]), 0)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_sem_campus_ativo_falha_sem_abrir_suap_db(self):
+        self.assertEqual(cli.main(["campus", "-arquivar", "campus-cuiaba"]), 0)
+
+        registry = CampusRegistry(self.dir)
+        self.assertIsNone(registry.ativo)
+        with self.assertRaises(ValueError):
+            registry.get_default_db_path()
+        with self.assertRaises(ValueError):
+            database.DatabaseManager()
+        self.assertEqual(cli.main(["stats"]), 1)
+        self.assertFalse((self.dir / "suap.db").exists())
+
+        # O campus arquivado continua acessível quando indicado
+        self.assertEqual(cli.main(["-campus", "campus-cuiaba", "stats", "-salas", "0"]), 0)
+        self.assertEqual(cli.main(["campus", "-ativar", "campus-cuiaba"]), 0)
+        self.assertEqual(cli.main(["stats", "-salas", "0"]), 0)
+
+    def test_sem_campi_registrados_usa_suap_db(self):
+        self.assertEqual(CampusRegistry(self.dir / "vazio").get_default_db_path(), self.dir / "vazio" / "suap.db")
+
+class CargaPorCampusTest(unittest.TestCase):
+    """A carga de um CSV com vários campi respeita -campus-carga e avisa dos itens sem campus."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        patcher = mock.patch.object(database, "get_data_dir", lambda: self.dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        generate_suap_csv(self.dir / "a.csv", itens=60, salas=5, seed=1, campus="Campus Cuiabá")
+        generate_suap_csv(self.dir / "b.csv", itens=40, salas=5, seed=2, campus="Campus Várzea Grande")
+        with open(self.dir / "a.csv", newline='', encoding='utf-8') as csvfile:
+            rows = list(csv.reader(csvfile))
+        with open(self.dir / "b.csv", newline='', encoding='utf-8') as csvfile:
+            rows += list(csv.reader(csvfile))[1:]
+        coluna = rows[0].index("CAMPUS DA CARGA")
+        rows[-1][coluna] = ""
+        with open(self.dir / "suap.csv", "w", newline='', encoding='utf-8') as csvfile:
+            csv.writer(csvfile).writerows(rows)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def count_patrimonios(self, db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM patrimonios").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_campus_carga_com_db(self):
+        db_path = self.dir / "outro.db"
+        self.assertEqual(cli.main(["-db", str(db_path), "load", str(self.dir / "suap.csv"),
+                                   "-campus-carga", "Campus Cuiabá"]), 0)
+        self.assertEqual(self.count_patrimonios(db_path), 60)
+
+    def test_por_campus_com_db_e_recusado(self):
+        db_path = self.dir / "outro.db"
+        self.assertEqual(cli.main(["-db", str(db_path), "load", str(self.dir / "suap.csv"), "-por-campus"]), 1)
+        self.assertFalse(db_path.exists())
+
+    def test_por_campus_informa_itens_sem_campus(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(cli.main(["load", str(self.dir / "suap.csv"), "-por-campus"]), 0)
+        self.assertIn("Itens sem CAMPUS DA CARGA, não importados: 1", output.getvalue())
+        self.assertEqual(self.count_patrimonios(self.dir / "suap-campus-cuiaba.db"), 60)
+        self.assertEqual(self.count_patrimonios(self.dir / "suap-campus-varzea-grande.db"), 39)
+
+if __name__ == "__main__":
+    unittest.main()
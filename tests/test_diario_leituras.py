@@ -0,0 +1,136 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import cli
+from database import DatabaseManager, load_data_from_file
+from synthetic_data import generate_suap_csv
+
+class DiarioLeiturasTest(unittest.TestCase):
+    """As leituras do diário são reaplicadas uma única vez, e só pelo dono do diário."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        self.db_path = self.dir / "suap.db"
+        generate_suap_csv(self.dir / "suap.csv", itens=200, salas=10, seed=1, sem_sala=0)
+        db = DatabaseManager(db_path=self.db_path)
+        load_data_from_file(db.cursor, db.conn, self.dir / "suap.csv")
+        db.close()
+        # Grupo de commit longo: as leituras ficam só no diário até o flush
+        self.db = DatabaseManager(db_path=self.db_path, commit_interval=3600, commit_batch=1000)
+        self.sala_id = self.db.get_all_salas()[0][0]
+
+    def tearDown(self):
+        if self.db is not None:
+            self.db.close()
+        self.tempdir.cleanup()
+
+    def crash(self):
+        """Simula a queda do programa: fecha tudo sem gravar as leituras pendentes."""
+        self.db.conn.close()
+        self.db.journal.close()
+        self.db.journal_lock.close()
+        self.db = None
+
+    def quantidade(self, numero):
+        db = DatabaseManager(db_path=self.db_path, read_only=True)
+        try:
+            db.cursor.execute("SELECT SUM(quantidade) FROM patrimonios_nao_cadastrados WHERE numero = ?", (numero,))
+            return db.cursor.fetchone()[0]
+        finally:
+            db.close()
+
+    def test_leituras_pendentes_recuperadas_apos_queda(self):
+        for _ in range(3):
+            self.assertFalse(self.db.process_scan("999999", self.sala_id))
+        self.crash()
+        DatabaseManager(db_path=self.db_path).close()
+        self.assertEqual(self.quantidade("999999"), 3)
+        # Reabrir de novo não reaplica o que já foi recuperado
+        DatabaseManager(db_path=self.db_path).close()
+        self.assertEqual(self.quantidade("999999"), 3)
+
+    def test_segundo_processo_nao_reaplica_leituras_pendentes(self):
+        for _ in range(3):
+            self.db.process_scan("999999", self.sala_id)
+        outro = DatabaseManager(db_path=self.db_path)
+        self.assertIsNone(outro.journal)
+        with self.assertRaises(RuntimeError):
+            outro.process_scan("999998", self.sala_id)
+        outro.close()
+        self.assertEqual(cli.main(["-db", str(self.db_path), "stats", "-salas", "0"]), 0)
+        self.assertEqual(cli.main(["-db", str(self.db_path), "scanlog", str(self.dir / "suap.csv")]), 1)
+        self.db.flush()
+        self.assertEqual(self.quantidade("999999"), 3)
+
+    def test_commit_do_relatorio_grava_o_checkpoint(self):
+        for _ in range(2):
+            self.db.process_scan("999999", self.sala_id)
+        self.db.mark_salas_reportadas({self.sala_id: 1})
+        self.crash()
+        DatabaseManager(db_path=self.db_path).close()
+        self.assertEqual(self.quantidade("999999"), 2)
+
+    def test_transacao_de_leitura_grava_o_checkpoint(self):
+        self.db.process_scan("999999", self.sala_id)
+        self.db.begin_read()
+        self.db.end_read()
+        self.crash()
+        DatabaseManager(db_path=self.db_path).close()
+        self.assertEqual(self.quantidade("999999"), 1)
+
+    def test_apagar_retrato_grava_o_checkpoint(self):
+        self.db.create_snapshot("t")
+        self.db.process_scan("999999", self.sala_id)
+        self.assertTrue(self.db.delete_snapshot("t"))
+        self.crash()
+        DatabaseManager(db_path=self.db_path).close()
+        self.assertEqual(self.quantidade("999999"), 1)
+
+    def test_linha_incompleta_e_descartada(self):
+        self.db.process_scan("999999", self.sala_id)
+        path = self.db.journal.path
+        self.crash()
+        with open(path, "ab") as journal:
+            journal.write(b"2026-01-01T00:00:00\tabc\t99")
+        DatabaseManager(db_path=self.db_path).close()
+        self.assertEqual(self.quantidade("999999"), 1)
+        self.assertTrue(path.read_bytes().endswith(b"\n"))
+
+    def test_correcao_de_sugestao_e_recuperada(self):
+        self.db.cursor.execute("SELECT numero FROM patrimonios WHERE sala_id = ? LIMIT 1", (self.sala_id,))
+        numero = self.db.cursor.fetchone()[0]
+        lido = numero + "9"
+        self.assertFalse(self.db.process_scan(lido, self.sala_id))
+        self.assertIn(numero, [row[0] for row in self.db.find_similar_numeros(lido)])
+        self.assertTrue(self.db.confirm_similar(lido, numero, self.sala_id))
+        self.crash()
+
+        db = DatabaseManager(db_path=self.db_path)
+        try:
+            self.assertIsNone(self.quantidade(lido))
+            db.cursor.execute("SELECT encontrado FROM patrimonios WHERE numero = ?", (numero,))
+            self.assertEqual(db.cursor.fetchone(), (1,))
+            # Refazer tudo a partir do diário chega ao mesmo estado
+            db.rebuild_from_journal()
+            self.assertIsNone(self.quantidade(lido))
+            db.cursor.execute("SELECT COUNT(*) FROM patrimonios WHERE encontrado = 1")
+            self.assertEqual(db.cursor.fetchone(), (1,))
+        finally:
+            db.close()
+
+    def test_diario_ausente_e_recriado(self):
+        self.db.process_scan("999999", self.sala_id)
+        self.db.close()
+        self.db = None
+        (self.dir / "suap.journal").unlink()
+        db = DatabaseManager(db_path=self.db_path)
+        try:
+            self.assertTrue(db.journal.path.exists())
+            self.assertEqual(self.quantidade("999999"), 1)
+        finally:
+            db.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from database import DatabaseManager
+
+class MigracaoNaoCadastradosTest(unittest.TestCase):
+    """Bancos antigos, com uma linha por leitura, passam a ter uma linha por número e sala."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tempdir.name) / "suap.db"
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript('''
+            CREATE TABLE salas (id INTEGER PRIMARY KEY AUTOINCREMENT, sala TEXT UNIQUE, codigo TEXT UNIQUE);
+            CREATE TABLE patrimonios_nao_cadastrados (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                numero TEXT NOT NULL,
+                sala_id INTEGER,
+                FOREIGN KEY (sala_id) REFERENCES salas(id)
+            );
+            INSERT INTO salas (sala, codigo) VALUES ('SALA 1', 'aaaa'), ('SALA 2', 'bbbb');
+            INSERT INTO patrimonios_nao_cadastrados (numero, sala_id) VALUES
+                ('900', 1), ('900', 1), ('900', 2), ('901', 1), ('900', 1), ('902', NULL), ('902', NULL);
+        ''')
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_linhas_repetidas_viram_quantidade(self):
+        db_manager = DatabaseManager(self.db_path)
+        try:
+            db_manager.cursor.execute('''
+                SELECT numero, sala_id, quantidade FROM patrimonios_nao_cadastrados ORDER BY numero, sala_id
+            ''')
+            self.assertEqual(db_manager.cursor.fetchall(),
+                             [("900", 1, 3), ("900", 2, 1), ("901", 1, 1), ("902", None, 2)])
+        finally:
+            db_manager.close()
+
+if __name__ == "__main__":
+    unittest.main()
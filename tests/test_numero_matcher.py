@@ -0,0 +1,50 @@
+import unittest
+
+from numero_matcher import (NumeroMatcher, normalize_numero, base_numero,
+                            MOTIVO_ZEROS, MOTIVO_SUFIXO, MOTIVO_TROCA, MOTIVO_DIGITO)
+
+class NumeroMatcherTest(unittest.TestCase):
+    """Sugestões de números cadastrados para leituras erradas da pistola."""
+
+    def setUp(self):
+        self.matcher = NumeroMatcher(["123456", "00987654", "555555-1", "424242", "100"])
+
+    def test_normalizacao(self):
+        self.assertEqual(normalize_numero("00987654"), "987654")
+        self.assertEqual(normalize_numero(" 555.555-1 "), "5555551")
+        self.assertEqual(normalize_numero("000"), "0")
+        self.assertEqual(base_numero("555555-1"), "555555")
+        self.assertIsNone(base_numero("555555"))
+
+    def test_motivos(self):
+        casos = {
+            "0123456": ("123456", MOTIVO_ZEROS),
+            "987654": ("00987654", MOTIVO_ZEROS),
+            "555555": ("555555-1", MOTIVO_SUFIXO),
+            "4242421": ("424242", MOTIVO_SUFIXO),
+            "123465": ("123456", MOTIVO_TROCA),
+            "12345": ("123456", MOTIVO_DIGITO),
+            "123457": ("123456", MOTIVO_DIGITO),
+            "10": ("100", MOTIVO_DIGITO),
+        }
+        for lido, esperado in casos.items():
+            with self.subTest(lido=lido):
+                self.assertEqual(self.matcher.similar(lido)[0], esperado)
+
+    def test_sem_sugestao(self):
+        self.assertEqual(self.matcher.similar("999999"), [])
+        self.assertEqual(self.matcher.similar(""), [])
+        # O próprio número cadastrado não é sugerido para si mesmo
+        self.assertEqual(self.matcher.similar("555555-1"), [])
+
+    def test_ordem_e_limite(self):
+        matcher = NumeroMatcher(["0123456", "123465", "123457", "123458", "123459"])
+        sugestoes = matcher.similar("123456", limite=3)
+        self.assertEqual(len(sugestoes), 3)
+        self.assertEqual(sugestoes[0], ("0123456", MOTIVO_ZEROS))
+        self.assertEqual(sugestoes[1], ("123465", MOTIVO_TROCA))
+        self.assertEqual(sugestoes[2][1], MOTIVO_DIGITO)
+        self.assertEqual(len(matcher), 5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import csv
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from database import DatabaseManager, load_data_from_file, apply_scans, delete_unfound_patrimonio
+from synthetic_data import generate_suap_csv
+
+class ProcessScanTest(unittest.TestCase):
+    """Escaneamentos: números repetidos no SUAP, contagem dos não cadastrados e leitura em lote."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        generate_suap_csv(self.dir / "suap.csv", itens=200, salas=10, seed=1, sem_sala=0)
+        self.db = DatabaseManager(db_path=self.dir / "suap.db", commit_interval=0)
+
+    def tearDown(self):
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def load(self, rows=None):
+        path = self.dir / "suap.csv"
+        if rows is not None:
+            path = self.dir / "editado.csv"
+            with open(path, "w", newline='', encoding='utf-8') as csvfile:
+                csv.writer(csvfile).writerows(rows)
+        load_data_from_file(self.db.cursor, self.db.conn, path)
+        self.salas = [sala_id for sala_id, _ in self.db.get_all_salas()]
+        self.db.cursor.execute("SELECT numero FROM patrimonios ORDER BY id")
+        self.numeros = [numero for numero, in self.db.cursor.fetchall()]
+
+    def indice_unico(self):
+        self.db.cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'idx_patrimonios_numero'")
+        return self.db.cursor.fetchone()[0].upper().startswith("CREATE UNIQUE")
+
+    def nao_cadastrados(self, cursor=None):
+        cursor = cursor or self.db.cursor
+        cursor.execute('''
+            SELECT numero, sala_id, quantidade, primeira_leitura <= ultima_leitura
+            FROM patrimonios_nao_cadastrados ORDER BY numero, sala_id
+        ''')
+        return cursor.fetchall()
+
+    def patrimonios(self, cursor):
+        cursor.execute("SELECT numero, sala_id, encontrado, sala_id_original FROM patrimonios ORDER BY id")
+        return cursor.fetchall()
+
+    def test_numero_repetido_no_suap(self):
+        self.load()
+        self.assertTrue(self.indice_unico())
+
+        with open(self.dir / "suap.csv", newline='', encoding='utf-8') as csvfile:
+            rows = list(csv.reader(csvfile))
+        repetido = list(rows[2])
+        repetido[1] = rows[1][1]
+        self.load([rows[0], rows[1], repetido] + rows[3:])
+        self.assertFalse(self.indice_unico())
+
+        numero = rows[1][1]
+        self.assertTrue(self.db.process_scan(numero, self.salas[-1]))
+        self.db.cursor.execute("SELECT sala_id, encontrado FROM patrimonios WHERE numero = ?", (numero,))
+        self.assertEqual(self.db.cursor.fetchall(), [(self.salas[-1], 1)] * 2)
+
+    def test_nao_cadastrados_contados_por_sala(self):
+        self.load()
+        primeira, segunda = self.salas[:2]
+        for sala_id in (primeira, primeira, segunda, primeira):
+            self.assertFalse(self.db.process_scan("X-1", sala_id))
+        self.assertCountEqual(self.nao_cadastrados(), [("X-1", primeira, 3, 1), ("X-1", segunda, 1, 1)])
+
+        # A sugestão confirmada desconta uma leitura da sala
+        self.assertTrue(self.db.confirm_similar("X-1", self.numeros[0], primeira))
+        self.assertCountEqual(self.nao_cadastrados(), [("X-1", primeira, 2, 1), ("X-1", segunda, 1, 1)])
+        self.assertTrue(delete_unfound_patrimonio(self.db.cursor, "X-1", segunda))
+        self.assertFalse(delete_unfound_patrimonio(self.db.cursor, "X-1", segunda))
+        self.assertCountEqual(self.nao_cadastrados(), [("X-1", primeira, 2, 1)])
+
+    def test_lote_igual_a_leituras_uma_a_uma(self):
+        self.load()
+        self.db.close()
+        shutil.copy(self.dir / "suap.db", self.dir / "lote.db")
+        self.db = DatabaseManager(db_path=self.dir / "suap.db", commit_interval=0)
+
+        rng = random.Random(7)
+        desconhecidos = [f"X-{i}" for i in range(5)]
+        scans = [(rng.choice(self.numeros[:60] + desconhecidos), rng.choice(self.salas)) for _ in range(300)]
+        for numero, sala_id in scans:
+            self.db.process_scan(numero, sala_id)
+        self.db.flush()
+
+        lote = DatabaseManager(db_path=self.dir / "lote.db")
+        try:
+            total, encontrados, nao_cadastrados = apply_scans(
+                lote.cursor, [(numero, sala_id, None) for numero, sala_id in scans], lida_em="2026-01-01T00:00:00")
+            lote.conn.commit()
+            self.assertEqual(total, len(scans))
+            self.assertEqual(encontrados, len({numero for numero, _ in scans if numero not in desconhecidos}))
+            self.assertEqual(nao_cadastrados, len({scan for scan in scans if scan[0] in desconhecidos}))
+            self.assertEqual(self.patrimonios(lote.cursor), self.patrimonios(self.db.cursor))
+            self.assertEqual(self.nao_cadastrados(lote.cursor), self.nao_cadastrados())
+        finally:
+            lote.close()
+
+if __name__ == "__main__":
+    unittest.main()
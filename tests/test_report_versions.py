@@ -0,0 +1,78 @@
+import csv
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from database import DatabaseManager, load_data_from_file
+from report_generator import ReportGenerator
+from synthetic_data import generate_suap_csv
+
+class ReportVersionsTest(unittest.TestCase):
+    """O relatório incremental reescreve só as salas alteradas desde o anterior."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        generate_suap_csv(self.dir / "suap.csv", itens=200, salas=10, seed=1, sem_sala=0)
+        self.db = DatabaseManager(db_path=self.dir / "suap.db", commit_interval=0)
+        load_data_from_file(self.db.cursor, self.db.conn, self.dir / "suap.csv")
+        self.report_dir = self.dir / "report"
+        self.generator = ReportGenerator(self.db, report_dir=self.report_dir)
+        self.salas = self.db.get_all_salas()
+
+    def tearDown(self):
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def generate(self, full=False):
+        with redirect_stdout(StringIO()):
+            return self.generator.generate_report(full=full)
+
+    def sala_file(self, sala, name="encontrados.csv"):
+        return self.generator.get_sala_dir(self.report_dir, sala) / name
+
+    def numeros(self, path, coluna=0):
+        """Números de um relatório; nos do _GERAL_ a primeira coluna é a sala."""
+        with open(path, newline='', encoding='utf-8') as csvfile:
+            return {row[coluna] for row in list(csv.reader(csvfile))[1:]}
+
+    def test_so_salas_alteradas_sao_reescritas(self):
+        self.assertEqual(set(self.generate(full=True)), {sala_id for sala_id, _ in self.salas})
+        self.assertEqual(self.generate(), {})
+
+        (lida_id, lida), (outra_id, outra) = self.salas[:2]
+        marcador = "não reescrito\n"
+        for sala in (lida, outra):
+            self.sala_file(sala).write_text(marcador, encoding='utf-8')
+        self.db.cursor.execute("SELECT numero FROM patrimonios WHERE sala_id = ? LIMIT 1", (lida_id,))
+        numero = self.db.cursor.fetchone()[0]
+        self.assertTrue(self.db.process_scan(numero, lida_id))
+        self.assertFalse(self.db.process_scan("NAO-CADASTRADO", lida_id))
+
+        versoes = self.generate()
+        self.assertEqual(list(versoes), [lida_id])
+        self.assertEqual(self.numeros(self.sala_file(lida)), {numero})
+        self.assertEqual(self.numeros(self.sala_file(lida, "nao_cadastrados.csv")), {"NAO-CADASTRADO"})
+        self.assertEqual(self.sala_file(outra).read_text(encoding='utf-8'), marcador)
+        # O _GERAL_ é sempre refeito
+        self.assertEqual(self.numeros(self.report_dir / "_GERAL_" / "encontrados.csv", 1), {numero})
+
+        # As versões gravadas tornam o próximo relatório vazio, mesmo após reabrir o banco
+        self.db.close()
+        self.db = DatabaseManager(db_path=self.dir / "suap.db", read_only=True)
+        self.generator = ReportGenerator(self.db, report_dir=self.report_dir)
+        self.assertEqual(self.generate(), {})
+
+    def test_diretorio_apagado_e_refeito(self):
+        self.generate(full=True)
+        _, sala = self.salas[0]
+        for path in self.sala_file(sala).parent.iterdir():
+            path.unlink()
+        self.sala_file(sala).parent.rmdir()
+        self.assertEqual(list(self.generate()), [self.salas[0][0]])
+        self.assertTrue(self.sala_file(sala, "nao_encontrados.csv").exists())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication
+
+from database import DatabaseManager, load_data_from_file
+from resumo_model import ResumoTableModel, HEADERS
+from synthetic_data import generate_suap_csv
+
+class ResumoRecargaTest(unittest.TestCase):
+    """Uma nova carga com menos salas não deixa as antigas no painel."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        generate_suap_csv(self.dir / "suap.csv", itens=200, salas=10, seed=1, sem_sala=0)
+        generate_suap_csv(self.dir / "novo.csv", itens=100, salas=4, seed=2, sem_sala=0)
+        self.db = DatabaseManager(db_path=self.dir / "suap.db")
+        load_data_from_file(self.db.cursor, self.db.conn, self.dir / "suap.csv")
+
+    def tearDown(self):
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def test_salas_removidas_saem_do_painel(self):
+        model = ResumoTableModel()
+        alteracao, rows, salas = self.db.get_salas_resumo()
+        model.replace(rows)
+        self.assertEqual(model.rowCount(), salas)
+
+        load_data_from_file(self.db.cursor, self.db.conn, self.dir / "novo.csv")
+        nova_alteracao, rows, salas = self.db.get_salas_resumo(alteracao)
+        # A contagem continua depois da carga: as salas recarregadas chegam como alteradas
+        self.assertGreater(nova_alteracao, alteracao)
+        self.assertEqual(len(rows), salas)
+        model.apply(rows)
+        self.assertNotEqual(model.rowCount(), salas)
+
+        _, rows, salas = self.db.get_salas_resumo()
+        model.replace(rows)
+        self.assertEqual(model.rowCount(), salas)
+        self.assertEqual(model.totais[0], 100)
+        self.assertEqual(sorted(row[0] for row in model.rows), sorted(row[0] for row in rows))
+
+    def test_colunas_da_tabela(self):
+        model = ResumoTableModel()
+        model.replace([(7, "SALA 7", 8, 6, 1, 2)])
+        valores = [model.index(0, column).data(Qt.UserRole) for column in range(len(HEADERS))]
+        self.assertEqual(valores, ["SALA 7", 8, 6, 2, 1, 2, 0.75])
+
+if __name__ == "__main__":
+    unittest.main()
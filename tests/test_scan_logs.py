@@ -0,0 +1,104 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from database import DatabaseManager, load_data_from_file, ingest_scan_logs
+from synthetic_data import generate_suap_csv
+
+class ScanLogsTest(unittest.TestCase):
+    """Arquivos de leituras das pistolas aplicados em lote, com o diário de leituras."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        self.db_path = self.dir / "suap.db"
+        generate_suap_csv(self.dir / "suap.csv", itens=200, salas=10, seed=1, sem_sala=0)
+        self.db = DatabaseManager(db_path=self.db_path)
+        load_data_from_file(self.db.cursor, self.db.conn, self.dir / "suap.csv")
+        self.db.close()
+        self.db = DatabaseManager(db_path=self.db_path)
+        self.salas = self.db.get_all_salas()
+        self.db.cursor.execute("SELECT numero, sala_id FROM patrimonios ORDER BY id")
+        self.patrimonios = self.db.cursor.fetchall()
+
+    def tearDown(self):
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def write_log(self, nome, linhas):
+        path = self.dir / nome
+        path.write_text("\n".join(linhas) + "\n", encoding='utf-8')
+        return path
+
+    def nao_cadastrados(self):
+        self.db.cursor.execute("SELECT numero, sala_id, quantidade FROM patrimonios_nao_cadastrados ORDER BY numero")
+        return self.db.cursor.fetchall()
+
+    def test_importacao_que_falha_sai_do_diario(self):
+        sala_id, sala = self.salas[0]
+        log = self.write_log("pistola.txt", [f"SALA: {sala}", "999999", "999999", self.patrimonios[0][0]])
+        posicao = self.db.journal.position
+        with mock.patch.object(self.db.journal, "checkpoint", side_effect=sqlite3.OperationalError("disk I/O error")):
+            self.assertIsNone(ingest_scan_logs(self.db.cursor, self.db.conn, [log], self.db.journal))
+        self.assertEqual(self.db.journal.position, posicao)
+        self.assertEqual(self.db.journal.path.stat().st_size, posicao)
+        self.db.close()
+
+        # A próxima inicialização não tem o que recuperar
+        self.db = DatabaseManager(db_path=self.db_path)
+        self.assertEqual(self.nao_cadastrados(), [])
+        self.db.cursor.execute("SELECT COUNT(*) FROM patrimonios WHERE encontrado = 1")
+        self.assertEqual(self.db.cursor.fetchone()[0], 0)
+
+    def estado(self):
+        self.db.cursor.execute("SELECT numero, sala_id, encontrado, sala_id_original FROM patrimonios ORDER BY id")
+        return self.db.cursor.fetchall(), self.nao_cadastrados()
+
+    def test_leituras_em_lote(self):
+        self.db.cursor.execute("SELECT id, sala, codigo FROM salas ORDER BY id")
+        (sala_a, nome_a, _), (sala_b, _, codigo_b) = self.db.cursor.fetchall()[:2]
+        movido, original = next((numero, sala_id) for numero, sala_id in self.patrimonios if sala_id != sala_b)
+        parado = next(numero for numero, sala_id in self.patrimonios if sala_id == sala_a and numero != movido)
+        # A sala vem do cabeçalho (pelo nome) ou, sem ele, do nome do arquivo (pelo código)
+        log_a = self.write_log("pistola1.txt", [f"SALA: {nome_a}", movido, parado, "999999", "999999",
+                                                "SALA: SALA INEXISTENTE", parado])
+        log_b = self.write_log(f"{codigo_b}.txt", [movido, "999999"])
+
+        total = ingest_scan_logs(self.db.cursor, self.db.conn, [log_a, log_b], self.db.journal)
+        self.assertEqual(total, 6)
+        # Cada patrimônio fica na sala da última leitura
+        self.assertEqual(self.db.get_patrimonio(movido)[0], sala_b)
+        self.db.cursor.execute("SELECT encontrado, sala_id_original FROM patrimonios WHERE numero = ?", (movido,))
+        self.assertEqual(self.db.cursor.fetchone(), (1, original))
+        self.assertEqual(self.db.get_patrimonio(parado)[0], sala_a)
+        self.assertEqual(self.nao_cadastrados(), [("999999", sala_a, 2), ("999999", sala_b, 1)])
+
+        # As leituras entraram no diário: refazer a partir dele chega ao mesmo estado
+        estado = self.estado()
+        self.db.rebuild_from_journal()
+        self.assertEqual(self.estado(), estado)
+
+    def test_igual_a_escanear_na_interface(self):
+        sala_a, nome_a = self.salas[0]
+        sala_b, nome_b = self.salas[1]
+        leituras = [(numero, (sala_a, sala_b)[i % 2]) for i, (numero, _) in enumerate(self.patrimonios[:30])]
+        leituras += [("999999", sala_a), (self.patrimonios[0][0], sala_a), ("999998", sala_b), ("999999", sala_a)]
+        nomes = {sala_a: nome_a, sala_b: nome_b}
+        log = self.write_log("pistola.txt", [linha for numero, sala_id in leituras
+                                             for linha in (f"SALA: {nomes[sala_id]}", numero)])
+        ingest_scan_logs(self.db.cursor, self.db.conn, [log], self.db.journal)
+        lote = self.estado()
+
+        # O mesmo banco antes das leituras, agora escaneado leitura por leitura
+        self.db.cursor.execute("UPDATE patrimonios SET sala_id = sala_id_original, encontrado = 0")
+        self.db.cursor.execute("DELETE FROM patrimonios_nao_cadastrados")
+        self.db.conn.commit()
+        for numero, sala_id in leituras:
+            self.db.process_scan(numero, sala_id)
+        self.db.flush()
+        self.assertEqual(self.estado(), lote)
+
+if __name__ == "__main__":
+    unittest.main()
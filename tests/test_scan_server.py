@@ -0,0 +1,48 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import cli
+from scan_server import ScanServer, ScanClient, parse_address
+
+class ScanServerTokenTest(unittest.TestCase):
+    """O servidor só atende este computador por padrão e, com token, recusa quem não o envia."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tempdir.name) / "suap.db"
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_endereco_padrao_e_local(self):
+        self.assertEqual(parse_address("8765"), ("127.0.0.1", 8765))
+        self.assertEqual(parse_address(""), ("127.0.0.1", 8765))
+        self.assertEqual(parse_address("0.0.0.0:9000"), ("0.0.0.0", 9000))
+
+    def test_rede_sem_token_e_recusada(self):
+        self.assertEqual(cli.main(["-db", str(self.db_path), "serve", "0.0.0.0:0"]), 1)
+
+    def test_token(self):
+        server = ScanServer(("127.0.0.1", 0), self.db_path, token="segredo")
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05})
+        thread.start()
+        try:
+            host, port = server.server_address[:2]
+            for token in (None, "errado"):
+                client = ScanClient(host, port, token=token)
+                with self.assertRaisesRegex(RuntimeError, "Token inválido"):
+                    client.call("flush")
+                client.close()
+            client = ScanClient(host, port, token="segredo")
+            self.assertEqual(client.submit_read("count_salas").result(), 0)
+            client.close()
+        finally:
+            server.shutdown()
+            thread.join()
+            server.server_close()
+            server.worker.close()
+
+if __name__ == "__main__":
+    unittest.main()
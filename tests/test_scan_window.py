@@ -0,0 +1,67 @@
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt, QEvent
+from PyQt5.QtGui import QKeyEvent
+from PyQt5.QtWidgets import QApplication
+
+from scan_window import ScanWindow
+
+class FakeBridge:
+    """Registra as chamadas ao banco, sem executá-las."""
+
+    def __init__(self):
+        self.calls = []
+
+    def call(self, method, *args, callback=None):
+        self.calls.append((method, *args))
+
+    def read(self, method, *args, callback=None):
+        pass
+
+class ScanWindowInputTest(unittest.TestCase):
+    """O número enviado ao banco é sempre o que aparece no campo de leitura."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.db = FakeBridge()
+        self.window = ScanWindow(self.db)
+        self.window.sala_id = 1
+
+    def tearDown(self):
+        self.window.deleteLater()
+
+    def press(self, key, text="", modifiers=Qt.NoModifier):
+        QApplication.sendEvent(self.window.input, QKeyEvent(QEvent.KeyPress, key, modifiers, text))
+
+    def type_text(self, text):
+        for char in text:
+            self.press(Qt.Key_0 + int(char) if char.isdigit() else Qt.Key_A, char)
+
+    def test_teclas_de_edicao_nao_alteram_o_campo(self):
+        self.type_text("12345")
+        self.press(Qt.Key_Left)
+        self.press(Qt.Key_Left)
+        self.press(Qt.Key_Delete)
+        self.assertEqual(self.window.input.text(), "12345")
+        self.window.input.selectAll()
+        self.press(Qt.Key_X, "\x18", Qt.ControlModifier)
+        self.assertEqual(self.window.input.text(), "12345")
+        self.press(Qt.Key_Z, "\x1a", Qt.ControlModifier)
+        self.assertEqual(self.window.input.text(), "12345")
+        self.type_text("6")
+        self.assertEqual(self.window.input.text(), self.window.scan_buffer.current())
+        self.assertEqual(self.window.input.text(), "123456")
+
+        self.press(Qt.Key_Return, "\r")
+        self.window.process_queue()
+        self.assertEqual(self.db.calls, [("process_scan", "123456", 1)])
+        self.assertEqual(self.window.input.text(), "")
+
+if __name__ == "__main__":
+    unittest.main()
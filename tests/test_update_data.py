@@ -0,0 +1,99 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from database import DatabaseManager, load_data_from_file, update_data_from_file, rebuild_salas_resumo
+from synthetic_data import generate_suap_csv
+
+# Posições das colunas no CSV do SUAP
+NUMERO = 1
+DESCRICAO = 4
+SALA = 16
+
+class UpdateDataTest(unittest.TestCase):
+    """A atualização por um CSV mais novo aplica as diferenças e preserva as leituras."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        generate_suap_csv(self.dir / "suap.csv", itens=200, salas=10, seed=1, sem_sala=0)
+        with open(self.dir / "suap.csv", newline='', encoding='utf-8') as csvfile:
+            self.rows = list(csv.reader(csvfile))
+        self.db = DatabaseManager(db_path=self.dir / "suap.db", commit_interval=0)
+        load_data_from_file(self.db.cursor, self.db.conn, self.dir / "suap.csv")
+
+    def tearDown(self):
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def update(self, rows):
+        with open(self.dir / "novo.csv", "w", newline='', encoding='utf-8') as csvfile:
+            csv.writer(csvfile).writerows(rows)
+        self.assertEqual(update_data_from_file(self.db.cursor, self.db.conn, self.dir / "novo.csv"), len(rows) - 1)
+
+    def patrimonio(self, numero):
+        self.db.cursor.execute('''
+            SELECT p.descricao, s.sala, o.sala, p.encontrado, p.removido
+            FROM patrimonios p
+            LEFT JOIN salas s ON s.id = p.sala_id
+            LEFT JOIN salas o ON o.id = p.sala_id_original
+            WHERE p.numero = ?
+        ''', (numero,))
+        return self.db.cursor.fetchone()
+
+    def resumo(self):
+        self.db.cursor.execute("SELECT * FROM salas_resumo ORDER BY sala_id")
+        return [row[:-1] for row in self.db.cursor.fetchall()]  # Sem a alteração
+
+    def test_diferencas_aplicadas_e_leituras_preservadas(self):
+        header, alterado, lido, movido, lido_movido, *resto = self.rows
+        salas = {row[SALA] for row in self.rows[1:]}
+        outra = lambda sala: next(nome for nome in sorted(salas) if nome != sala)
+        sala_lida = outra(lido_movido[SALA])
+        self.assertTrue(self.db.process_scan(lido[NUMERO], self.db.get_patrimonio(lido[NUMERO])[0]))
+        self.db.cursor.execute("SELECT id FROM salas WHERE sala = ?", (sala_lida,))
+        self.assertTrue(self.db.process_scan(lido_movido[NUMERO], self.db.cursor.fetchone()[0]))
+
+        novo = list(alterado)
+        novo[NUMERO] = "9" + alterado[NUMERO]
+        alterado = list(alterado)
+        alterado[DESCRICAO] = "DESCRIÇÃO NOVA"
+        movido = list(movido)
+        movido[SALA] = outra(movido[SALA])
+        nova_sala = list(lido_movido)
+        nova_sala[SALA] = "SALA NOVA DO SUAP"
+        self.update([header, alterado, lido, movido, nova_sala, *resto, novo])
+
+        self.assertEqual(self.patrimonio(alterado[NUMERO])[0], "DESCRIÇÃO NOVA")
+        self.assertEqual(self.patrimonio(novo[NUMERO])[1:], (alterado[SALA], alterado[SALA], 0, 0))
+        self.assertEqual(self.patrimonio(lido[NUMERO])[1:], (lido[SALA], lido[SALA], 1, 0))
+        # Não lido: acompanha a sala do SUAP
+        self.assertEqual(self.patrimonio(movido[NUMERO])[1:], (movido[SALA], movido[SALA], 0, 0))
+        # Lido: fica onde foi encontrado; a sala do SUAP passa a ser a original, mesmo sendo nova
+        self.assertEqual(self.patrimonio(nova_sala[NUMERO])[1:], (sala_lida, "SALA NOVA DO SUAP", 1, 0))
+
+        # O resumo mantido pelos gatilhos é o mesmo de um recálculo completo
+        resumo = self.resumo()
+        rebuild_salas_resumo(self.db.cursor)
+        self.assertEqual(self.resumo(), resumo)
+
+    def test_removido_que_volta_e_restaurado(self):
+        numero = self.rows[1][NUMERO]
+        self.update([self.rows[0]] + self.rows[2:])
+        self.assertEqual(self.patrimonio(numero)[4], 1)
+        self.assertIsNone(self.db.get_patrimonio(numero))
+
+        self.update(self.rows)
+        self.assertEqual(self.patrimonio(numero)[4], 0)
+        self.assertIsNotNone(self.db.get_patrimonio(numero))
+
+    def test_arquivo_igual_nao_altera_nada(self):
+        self.db.cursor.execute("SELECT id, versao FROM salas ORDER BY id")
+        versoes = self.db.cursor.fetchall()
+        self.update(self.rows)
+        self.db.cursor.execute("SELECT id, versao FROM salas ORDER BY id")
+        self.assertEqual(self.db.cursor.fetchall(), versoes)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from database import (DatabaseManager, load_data_from_file, update_data_from_file, rebuild_salas_resumo,
+                      apply_scans)
+from report_generator import ReportGenerator
+from synthetic_data import generate_suap_csv
+
+class UpdateRemovidoTest(unittest.TestCase):
+    """Itens ausentes de um CSV mais novo saem dos totais, das tabelas e dos relatórios."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tempdir.name)
+        generate_suap_csv(self.dir / "suap.csv", itens=200, salas=10, seed=1, sem_sala=0)
+        with open(self.dir / "suap.csv", newline='', encoding='utf-8') as csvfile:
+            rows = list(csv.reader(csvfile))
+        self.removido = rows[1]
+        with open(self.dir / "novo.csv", "w", newline='', encoding='utf-8') as csvfile:
+            csv.writer(csvfile).writerows([rows[0]] + rows[2:])
+        self.db = DatabaseManager(db_path=self.dir / "suap.db")
+        load_data_from_file(self.db.cursor, self.db.conn, self.dir / "suap.csv")
+
+    def tearDown(self):
+        self.db.close()
+        self.tempdir.cleanup()
+
+    def get_resumo(self):
+        self.db.cursor.execute("SELECT sala_id, total, encontrados, divergentes FROM salas_resumo ORDER BY sala_id")
+        return self.db.cursor.fetchall()
+
+    def test_removido_sai_dos_totais_e_do_relatorio(self):
+        numero = self.removido[1]
+        sala_id, _ = self.db.get_patrimonio(numero)
+        total_antes = sum(row[1] for row in self.get_resumo())
+
+        update_data_from_file(self.db.cursor, self.db.conn, self.dir / "novo.csv")
+
+        resumo = self.get_resumo()
+        self.assertEqual(sum(row[1] for row in resumo), total_antes - 1)
+        rebuild_salas_resumo(self.db.cursor)
+        self.assertEqual(self.get_resumo(), resumo)
+        self.assertIsNone(self.db.get_patrimonio(numero))
+        self.assertNotIn(numero, [row[0] for row in self.db.get_patrimonios_by_sala(sala_id)])
+
+        ReportGenerator(self.db, report_dir=self.dir / "report").generate_report(full=True)
+        with open(self.dir / "report" / "_GERAL_" / "nao_encontrados.csv", newline='', encoding='utf-8') as csvfile:
+            numeros = [row[1] for row in csv.reader(csvfile)]
+        self.assertEqual(len(numeros), total_antes)  # Cabeçalho e os itens restantes
+        self.assertNotIn(numero, numeros)
+
+    def read_report(self, nome):
+        with open(self.dir / "report" / "_GERAL_" / nome, newline='', encoding='utf-8') as csvfile:
+            return list(csv.reader(csvfile))
+
+    def test_leitura_de_removido_conta_como_nao_cadastrada(self):
+        numero = self.removido[1]
+        sala_id = self.db.get_all_salas()[0][0]
+        update_data_from_file(self.db.cursor, self.db.conn, self.dir / "novo.csv")
+
+        self.assertFalse(self.db.process_scan(numero, sala_id))
+        self.assertNotIn(numero, [row[0] for row in self.db.find_similar_numeros(numero)])
+        apply_scans(self.db.cursor, [(numero, sala_id, None)])
+        self.db.flush()
+        self.db.cursor.execute("SELECT quantidade FROM patrimonios_nao_cadastrados WHERE numero = ?", (numero,))
+        self.assertEqual(self.db.cursor.fetchall(), [(2,)])
+        self.db.cursor.execute("SELECT encontrado FROM patrimonios WHERE numero = ?", (numero,))
+        self.assertEqual(self.db.cursor.fetchall(), [(0,)])
+
+        ReportGenerator(self.db, report_dir=self.dir / "report").generate_report(full=True)
+        self.assertIn(numero, [row[1] for row in self.read_report("nao_cadastrados.csv")])
+        self.assertNotIn(numero, [row[1] for row in self.read_report("encontrados.csv")])
+
+    def test_sugestoes_acompanham_removidos(self):
+        numero = self.removido[1]
+        # Um dígito a mais: o número removido seria a sugestão
+        lido = numero + "7"
+        self.assertIn(numero, [row[0] for row in self.db.find_similar_numeros(lido)])
+        # A atualização vem de outra conexão, como na importação pela linha de comando
+        outro = DatabaseManager(db_path=self.dir / "suap.db")
+        update_data_from_file(outro.cursor, outro.conn, self.dir / "novo.csv")
+        outro.close()
+        self.assertNotIn(numero, [row[0] for row in self.db.find_similar_numeros(lido)])
+
+if __name__ == "__main__":
+    unittest.main()